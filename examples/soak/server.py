@@ -0,0 +1,139 @@
+"""
+Local stand-in for HLTV, serving generated pages with the layout expected by the parsers:
+    - /results?offset={offset}, 100 results per page, never ending
+    - /matches/{match_id}/{name}, a best of 3 with its vetoes, 2 maps played
+    - /stats/matches/economy/mapstatsid/{map_stats_id}/{name}, with the players tables
+    - /stats/matches/mapstatsid/{map_stats_id}/{name}
+
+A fraction `--error-rate` of the match pages are broken, so that the crawls also go
+through their error handling, and a fraction `--server-error-rate` of all the requests
+are answered with 503.
+
+    python examples/soak/server.py --port 8080
+
+The port is printed on the first line of stdout, which is useful with `--port 0`.
+"""
+import argparse
+import random
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pages
+
+RESULTS_PER_PAGE = 100
+FIRST_MATCH_ID = 3000000
+
+MAPS = ["Ancient", "Inferno", "Mirage", "Nuke", "Overpass", "Vertigo", "Dust2"]
+TEAMS = [(6651, "Gambit"), (5973, "Liquid"), (4608, "Natus Vincere"), (6667, "FaZe"),
+         (9565, "Vitality"), (4411, "NIP"), (7020, "Spirit")]
+
+
+def teams(match_id):
+    team_1 = TEAMS[match_id % len(TEAMS)]
+    team_2 = TEAMS[(match_id + 3) % len(TEAMS)]
+    return team_1, team_2
+
+
+def results_page(offset):
+    results = []
+    for match_id in range(FIRST_MATCH_ID - offset, FIRST_MATCH_ID - offset - RESULTS_PER_PAGE, -1):
+        (_, team_1), (_, team_2) = teams(match_id)
+        results.append(f"""
+        <div class="result-con"><a href="/matches/{match_id}/{team_1}-vs-{team_2}">
+          <div class="team1"><div class="team">{team_1}</div></div>
+          <div class="team2"><div class="team">{team_2}</div></div>
+          <td class="result-score"><span>2</span> - <span>{match_id % 2}</span></td>
+          <span class="event-name">Event {match_id % 50}</span>
+          <div class="map-text">bo3</div>{'<i class="fa-star"></i>' * (match_id % 3)}
+        </a></div>""")
+
+    return f"""<html><body><div class="allres"><div class="results-sublist">
+      <span class="standard-headline">Results for September 2nd 2021</span>{"".join(results)}
+    </div></div></body></html>"""
+
+
+def match_page(match_id, broken=False):
+    team_1, team_2 = teams(match_id)
+    maps = [MAPS[(match_id + i) % len(MAPS)] for i in range(len(MAPS))]
+    return pages.match_page(match_id, team_1, team_2, maps=maps,
+                            map_stats_ids=(match_id * 10, match_id * 10 + 1),
+                            event_id=5000 + match_id % 50, broken=broken, filler=2000)
+
+
+def players_tables(map_stats_id):
+    return "".join(
+        pages.players_table(f"Team {team}", [
+            (player_id, f"player-{player_id}") for player_id in range(1000 * team, 1000 * team + 5)
+        ])
+        for team in [1, 2]
+    )
+
+
+def economy_page(map_stats_id):
+    return pages.economy_page(24, map_stats_id, players=players_tables(map_stats_id))
+
+
+def map_stats_page(map_stats_id):
+    return f"<html><body>{players_tables(map_stats_id)}</body></html>"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    error_rate = 0.0
+    server_error_rate = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+
+        if random.random() < self.server_error_rate:
+            return self.send_page("<html><body>Service unavailable</body></html>", status=503)
+
+        if url.path.rstrip("/") == "/results":
+            offset = int(parse_qs(url.query).get("offset", ["0"])[0])
+            return self.send_page(results_page(offset))
+
+        economy = re.match(r"^/stats/matches/economy/mapstatsid/(\d+)/", url.path)
+        if economy is not None:
+            return self.send_page(economy_page(int(economy.group(1))))
+
+        map_stats = re.match(r"^/stats/matches/mapstatsid/(\d+)/", url.path)
+        if map_stats is not None:
+            return self.send_page(map_stats_page(int(map_stats.group(1))))
+
+        match = re.match(r"^/matches/(\d+)/", url.path)
+        if match is not None:
+            return self.send_page(match_page(int(match.group(1)), random.random() < self.error_rate))
+
+        self.send_page("<html><body>Not found</body></html>", status=404)
+
+    def send_page(self, page, status=200):
+        body = page.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=0, error_rate=0.0, server_error_rate=0.0):
+    """Return the stand-in server listening on `port`, not started yet."""
+    handler = type("Handler", (StandInHandler,), {"error_rate": error_rate,
+                                                   "server_error_rate": server_error_rate})
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--port", type=int, default=0)
+    arg_parser.add_argument("--error-rate", type=float, default=0.02,
+                            help="Fraction of the match pages which are broken")
+    arg_parser.add_argument("--server-error-rate", type=float, default=0.0,
+                            help="Fraction of the requests answered with 503")
+    args = arg_parser.parse_args()
+
+    server = serve(args.port, args.error_rate, args.server_error_rate)
+    print(server.server_address[1], flush=True)
+    server.serve_forever()
@@ -0,0 +1,189 @@
+"""
+Soak test of the crawls, to check that their memory stays flat over a long run.
+
+The `get_*` crawls run in turn against the local stand-in server of `server.py`
+until they have made the number of requests HLTV would answer in `--hours` at
+`--rate` requests per second. After each crawl, the harness records:
+    - the resident set size (RSS) of the process
+    - the number of objects tracked by the garbage collector, and of the most common types
+    - the memory traced by `tracemalloc`, and the lines which allocated the most since the start
+
+The samples are written to `--output` (CSV), along with the growth of the RSS per
+1000 requests after the warm-up. The exit status is 1 if the RSS grew by more than
+`--max-growth` MB after the warm-up.
+
+Log records are kept in memory, as a log shipping handler would, so that records
+holding on to exceptions (and to the pages in their tracebacks) show up as growth.
+
+    python examples/soak/soak.py --hours 1 --rate 2 --workers 4
+"""
+import argparse
+import csv
+import gc
+import logging
+import logging.handlers
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from hltv_api.api import matches, players, results, stats
+from hltv_api.client import set_default_scheduler
+from hltv_api.common import ClientConfig
+from hltv_api.scheduler import RequestScheduler
+
+CRAWLS = [
+    ("results", lambda skip, args, config: results.get_results(
+        skip=skip, limit=args.limit, config=config, workers=args.workers)),
+    ("matches", lambda skip, args, config: matches.get_matches_stats(
+        skip=skip, limit=args.limit, config=config, workers=args.workers, include_vetoes=True)),
+    ("economy", lambda skip, args, config: stats.get_matches_with_economy(
+        skip=skip, limit=args.limit, config=config, workers=args.workers)),
+    ("players", lambda skip, args, config: players.get_players_stats(
+        skip=skip, limit=args.limit, config=config, workers=args.workers, include_economy=True)),
+]
+
+SAMPLE_COLUMNS = ["elapsed", "requests", "crawl", "rows", "errors", "rss_mb", "gc_objects",
+                  "traced_mb", "top_types"]
+
+logger = logging.getLogger("soak")
+
+
+def rss_mb():
+    """Current resident set size, or the peak if /proc is not available (macOS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def start_server(args):
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(__file__), "server.py"),
+         "--error-rate", str(args.error_rate), "--server-error-rate", str(args.server_error_rate)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    port = int(server.stdout.readline())
+    return server, f"http://127.0.0.1:{port}"
+
+
+def sample(started_at, scheduler, crawl, rows, errors):
+    gc.collect()
+    objects = gc.get_objects()
+    top_types = Counter(type(o).__name__ for o in objects).most_common(5)
+
+    return {
+        "elapsed": round(time.monotonic() - started_at, 1),
+        "requests": scheduler.requests_started,
+        "crawl": crawl,
+        "rows": rows,
+        "errors": errors,
+        "rss_mb": round(rss_mb(), 1),
+        "gc_objects": len(objects),
+        "traced_mb": round(tracemalloc.get_traced_memory()[0] / 2 ** 20, 2),
+        "top_types": " ".join(f"{name}={count}" for name, count in top_types),
+    }
+
+
+def growth_per_1000_requests(samples):
+    """Slope of the RSS against the number of requests, by least squares."""
+    if len(samples) < 2:
+        return 0.0
+    xs = [s["requests"] for s in samples]
+    ys = [s["rss_mb"] for s in samples]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return 0.0
+    return 1000 * sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--hours", type=float, default=1.0,
+                            help="Hours of simulated traffic at --rate requests per second")
+    arg_parser.add_argument("--rate", type=float, default=1.0,
+                            help="Rate of requests to HLTV being simulated")
+    arg_parser.add_argument("--limit", type=int, default=50, help="Limit of each crawl")
+    arg_parser.add_argument("--workers", type=int, default=None)
+    arg_parser.add_argument("--warmup", type=int, default=4,
+                            help="Number of crawls before the samples the growth is measured on")
+    arg_parser.add_argument("--error-rate", type=float, default=0.02,
+                            help="Fraction of the match pages which are broken")
+    arg_parser.add_argument("--server-error-rate", type=float, default=0.0,
+                            help="Fraction of the requests answered with 503")
+    arg_parser.add_argument("--log-records", type=int, default=10000,
+                            help="Number of log records kept in memory")
+    arg_parser.add_argument("--max-growth", type=float, default=20.0,
+                            help="Maximum growth of the RSS in MB after the warm-up")
+    arg_parser.add_argument("--output", default="soak.csv")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    logging.getLogger("hltv_api").propagate = False
+    logging.getLogger("hltv_api").addHandler(logging.handlers.BufferingHandler(args.log_records))
+
+    server, base_url = start_server(args)
+    config = ClientConfig(base_url=base_url)
+    scheduler = RequestScheduler(max_concurrency=64)
+    set_default_scheduler(scheduler)
+
+    total_requests = int(args.hours * 3600 * args.rate)
+    logger.info(f"Simulating {args.hours} hours at {args.rate} requests/s: {total_requests} "
+                f"requests against {base_url}")
+
+    tracemalloc.start(10)
+    baseline = None
+    samples = []
+    started_at = time.monotonic()
+    skip = 0
+    errors = 0
+
+    try:
+        while scheduler.requests_started < total_requests:
+            name, crawl = CRAWLS[len(samples) % len(CRAWLS)]
+            try:
+                df = crawl(skip, args, config)
+                rows = len(df[0] if isinstance(df, tuple) else df)
+                del df
+            except Exception as e:
+                logger.info(f"{name} failed: {e!r}")
+                rows, errors = 0, errors + 1
+            skip += args.limit
+
+            samples.append(sample(started_at, scheduler, name, rows, errors))
+            logger.info(" ".join(f"{k}={v}" for k, v in samples[-1].items() if k != "top_types"))
+
+            if len(samples) == args.warmup:
+                baseline = tracemalloc.take_snapshot()
+    finally:
+        server.terminate()
+        set_default_scheduler(None)
+
+    with open(args.output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SAMPLE_COLUMNS)
+        writer.writeheader()
+        writer.writerows(samples)
+
+    measured = samples[args.warmup:]
+    growth = measured[-1]["rss_mb"] - measured[0]["rss_mb"] if len(measured) > 1 else 0.0
+    print(f"{scheduler.requests_started} requests in {samples[-1]['elapsed']}s, samples in "
+          f"{args.output}")
+    print(f"RSS after warm-up: {growth:+.1f} MB, {growth_per_1000_requests(measured):+.2f} MB "
+          f"per 1000 requests")
+
+    if baseline is not None:
+        print("Largest allocations since the warm-up:")
+        for stat in tracemalloc.take_snapshot().compare_to(baseline, "lineno")[:10]:
+            print(f"  {stat}")
+
+    return 1 if growth > args.max_growth else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
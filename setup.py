@@ -33,4 +33,7 @@ setup(
         "Programming Language :: Python :: 3.9",
     ],
     install_requires=install_requirements,
+    entry_points={
+        "console_scripts": ["hltv=hltv_api.cli:main"],
+    },
 )
@@ -1 +1 @@
-from hltv_api.api import matches, results, stats
+from hltv_api.api import events, matches, players, results, stats
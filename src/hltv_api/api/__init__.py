@@ -0,0 +1,9 @@
+"""Crawls of the HLTV pages, built on the parsers of `hltv_api.pages`.
+
+The DOM tree of a page is the largest object a crawl holds, so the functions
+fetching a page delete it as soon as it is parsed, in a `finally` block, rather
+than leave it to their frame, which a logged or raised traceback may keep alive.
+For the same reason, errors swallowed by the crawls are logged by message only:
+a log record holding the exception would keep its traceback, and the trees of
+its frames, alive as long as the record.
+"""
@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from hltv_api.api.results import ResultsCursor
+from hltv_api.api.stats import MATCH_COLUMNS, ROUNDS_COLUMNS, get_economy_by_match_id
+from hltv_api.client import HLTVClient
+from hltv_api.common import get_config
+from hltv_api.exceptions import HLTVCrawlInterrupted
+from hltv_api.frames import FrameBuilder
+from hltv_api.models import match_rows
+from hltv_api.query import HLTVQuery
+from hltv_api.workers import ordered_map, pool_size, worker_pool
+
+EVENTS_COLUMNS = ["event_id", *MATCH_COLUMNS, *ROUNDS_COLUMNS]
+
+logger = logging.getLogger(__name__)
+
+
+class EventsState:
+    """Completeness of the crawled events, persisted to a JSON file.
+
+    For each event, records the IDs of the matches listed in its results,
+    the IDs of the matches fetched, the date of its last result, whether
+    the event is complete, i.e. finished and fully fetched, and why its last
+    crawl stopped before, `None` if it did not.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.events = {}
+
+        self._lock = threading.Lock()
+
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.events = json.load(f)
+
+    def get(self, event_id):
+        with self._lock:
+            return self.events.setdefault(str(event_id), {
+                "expected": [],
+                "fetched": [],
+                "last_date": None,
+                "complete": False,
+                "stopped_at": None,
+            })
+
+    def is_complete(self, event_id):
+        return self.events.get(str(event_id), {}).get("complete", False)
+
+    def save(self):
+        if self.path is None:
+            return
+
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.events, f)
+            os.replace(tmp_path, self.path)
+
+
+def crawl_events(event_ids, state_path=None, workers=None, settle_days=2, config=None,
+                 deadline=None, match_workers=None):
+    """Fetch the results, matches and economy of the events.
+
+    Events are crawled in parallel. Only the matches which have not been fetched
+    in a previous run are requested, and complete events are skipped entirely.
+    An event is complete once all its matches are fetched and its last result is
+    older than `settle_days`, i.e. it is not live anymore.
+
+    Parameter
+    ---------
+    event_ids: List[Union[int, str]]
+        IDs of the events to be crawled.
+
+    state_path: Optional[str]
+        JSON file recording the completeness of each event across runs.
+        If not specified, every event is crawled from scratch.
+
+    workers: Optional[int]
+        Number of events crawled at the same time, at most `config.max_concurrency`.
+        If not specified, `config.max_concurrency`.
+
+    settle_days: Optional[int]
+        Number of days without new results after which an event is considered finished.
+
+    config: Optional[ClientConfig]
+        Configuration of the client, built from `HLTVConfig` if not specified.
+
+    deadline: Optional[Deadline]
+        Deadline of the crawl. Once it has passed or has been cancelled, the crawl
+        stops and returns the data collected so far.
+
+    match_workers: Optional[int]
+        Number of matches of each event fetched at the same time, at most
+        `config.max_concurrency`. If not specified, one at a time.
+
+    Return
+    ------
+    pandas.DataFrame with the economy of each map of the newly fetched matches,
+    with the columns in `EVENTS_COLUMNS`.
+
+    If the crawl is interrupted by `deadline`, `df.attrs["stopped_at"]` is a dictionary
+    with the `reason` ('deadline' or 'cancelled') and the `event_ids` not complete yet.
+    It is `None` if the crawl completed. The matches fetched are recorded in the state
+    file, so the same crawl run again resumes where it stopped.
+
+    """
+    config = get_config(config)
+    state = EventsState(state_path)
+
+    pending = [event_id for event_id in event_ids if not state.is_complete(event_id)]
+    logger.info(f"{len(event_ids) - len(pending)} events complete, crawling {len(pending)} events")
+
+    def crawl(event_id):
+        event_state = state.get(event_id)
+        rows = _crawl_event(event_id, event_state, settle_days, config, deadline, match_workers)
+        state.save()
+        return rows, event_state["stopped_at"]
+
+    workers = pool_size(workers or config.max_concurrency, config)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        events_rows = list(executor.map(crawl, pending))
+
+    frame = FrameBuilder(EVENTS_COLUMNS, config=config)
+    stopped_at = None
+    for rows, event_stopped_at in events_rows:
+        frame.append_records(rows)
+        if event_stopped_at is not None and stopped_at is None:
+            stopped_at = {**event_stopped_at,
+                          "event_ids": [event_id for event_id in pending
+                                        if not state.is_complete(event_id)]}
+
+    df = frame.to_frame()
+    df.attrs["stopped_at"] = stopped_at
+    return df
+
+
+def _crawl_event(event_id, event_state, settle_days, config, deadline=None, workers=None):
+    """Crawl the matches of an event not fetched yet, updating `event_state`."""
+    client = HLTVClient(config=config, deadline=deadline, priority="batch")
+    cursor = ResultsCursor(query=HLTVQuery(event_ids=[event_id], config=config),
+                           client=client)
+    event_state["stopped_at"] = None
+    try:
+        results = cursor.next_results()
+    except HLTVCrawlInterrupted as e:
+        event_state["stopped_at"] = {"reason": e.reason}
+        return []
+
+    event_state["expected"] = list(dict.fromkeys(
+        [*event_state["expected"], *(result["match_id"] for result in results)]
+    ))
+    if len(results) > 0:
+        event_state["last_date"] = max(result["date"] for result in results)
+
+    def fetch(match_id):
+        """Return the match ID and its rows, `None` if the match could not be fetched."""
+        try:
+            stats = get_economy_by_match_id(match_id, client=client)
+            return match_id, match_rows(stats) if len(stats) > 0 else None
+        except HLTVCrawlInterrupted:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching match {match_id} of event {event_id}: {e!r}")
+            return match_id, None
+
+    fetched = set(event_state["fetched"])
+    matches_ids = [match_id for match_id in event_state["expected"] if match_id not in fetched]
+    rows = []
+    workers = pool_size(workers, config)
+    with worker_pool(workers) as executor:
+        matches = ordered_map(fetch, matches_ids, executor,
+                              window=None if workers is None else 2 * workers)
+        try:
+            for match_id, match_records in matches:
+                if match_records is None:
+                    continue
+
+                rows.extend(match_records)
+                event_state["fetched"].append(match_id)
+                fetched.add(match_id)
+        except HLTVCrawlInterrupted as e:
+            event_state["stopped_at"] = {"reason": e.reason}
+
+    event_state["complete"] = _is_finished(event_state["last_date"], settle_days, config) and \
+        len(fetched) == len(event_state["expected"])
+
+    logger.info(f"Event {event_id}: {len(fetched)}/{len(event_state['expected'])} matches fetched")
+    return rows
+
+
+def _is_finished(last_date, settle_days, config):
+    if last_date is None:
+        return False
+
+    last_result = datetime.strptime(last_date, config.date_format)
+    return datetime.now() - last_result > timedelta(days=settle_days)
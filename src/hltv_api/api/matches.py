@@ -1,18 +1,20 @@
 import logging
-import os
-from urllib.parse import urljoin
 
-import pandas as pd
 from lxml import html
 
-from hltv_api.api.results import get_past_matches_ids
+from hltv_api.api.results import ResultsCursor, iter_ids
 from hltv_api.client import HLTVClient
-from hltv_api.common import HLTVConfig
-from hltv_api.pages.matches import parse_match_page
+from hltv_api.exceptions import HLTVCrawlInterrupted, HLTVParserDriftException
+from hltv_api.frames import FrameBuilder
+from hltv_api.models import match_rows
+from hltv_api.pages.matches import VETOES_COLUMNS, parse_match_page
 from hltv_api.query import HLTVQuery
+from hltv_api.validation import ParseMonitor, validate_match
+from hltv_api.workers import items_needed, ordered_map, pool_size, prefetch, worker_pool
 
-MATCHES_COLUMNS = ["match_id", "date", "team_1", "team_2", "team_1_id", "team_2_id",
-                   "map", "team_1_ct", "team_2_t", "team_1_t", "team_2_ct", "starting_ct"]
+MATCHES_COLUMNS = ["match_id", "date", "event_id", "team_1", "team_2", "team_1_id", "team_2_id",
+                   "map", "map_stats_id", "team_1_ct", "team_2_t", "team_1_t", "team_2_ct",
+                   "starting_ct"]
 
 ROUND_STATS_COLUMNS = [[f"{i}_team_1_value", f"{i}_team_2_value", f"{i}_winner"]
                        for i in range(1, 31)]
@@ -20,7 +22,9 @@ ROUND_STATS_COLUMNS = [[f"{i}_team_1_value", f"{i}_team_2_value", f"{i}_winner"]
 logger = logging.getLogger(__name__)
 
 
-def get_matches_stats(skip=0, limit=None, batch_size=100, query=None, **kwargs):
+def get_matches_stats(skip=0, limit=None, batch_size=100, query=None, config=None, deadline=None,
+                      monitor=None, workers=None, client=None, include_vetoes=False, cursor=None,
+                      index=None, **kwargs):
     """Hits the HLTV webpage and gets the details for the matches.
 
     Parameter
@@ -36,10 +40,10 @@ def get_matches_stats(skip=0, limit=None, batch_size=100, query=None, **kwargs):
         If NONE, return all the records found.
 
     batch_size: Optional[int]
-        Number of matches to be fetched in 1 iteration. This determines how frequent
-        data is written into the DataFrame. If {batch_size} is 1 then data is never lost
-        once it has been fetched, but slows down computation. If {batch_size == limit}
-        then 1 failed request may result in an empty DataFrame.
+        Number of match IDs buffered ahead of the matches being fetched. The next
+        /results pages are fetched in the background, while the matches of the
+        previous ones are, until the buffer is full or until there are enough
+        matches for `limit` rows at the number of maps per match seen so far.
 
     include_round_stats: Optional[bool]
         If `True`, data return will contains details on the round statistics such as
@@ -51,48 +55,132 @@ def get_matches_stats(skip=0, limit=None, batch_size=100, query=None, **kwargs):
     query: Optional[HLTVQuery]
         Query and filter for data required.
 
+    config: Optional[ClientConfig]
+        Configuration of the client, built from `HLTVConfig` if not specified.
+
+    deadline: Optional[Deadline]
+        Deadline of the crawl. Once it has passed or has been cancelled, the crawl
+        stops and returns the data collected so far.
+
+    monitor: Optional[ParseMonitor]
+        Validates the pages parsed and stops the crawl with `HLTVParserDriftException`
+        if most of them fail, e.g. after a change of the HLTV layout. The data collected
+        before is in its `partial`, and where the crawl stopped in its `stopped_at`.
+        A `ParseMonitor` with the default thresholds if not specified.
+
+    workers: Optional[int]
+        Number of matches fetched at the same time by a pool of threads sharing
+        the same client, at most `config.max_concurrency`. If not specified, one
+        at a time. The rows are returned
+        in the same order whatever the number of workers.
+
+    client: Optional[HLTVClient]
+        Client making the requests, built from `config` and `deadline` if not specified.
+
+    include_vetoes: Optional[bool]
+        If `True`, return a tuple (DataFrame, vetoes DataFrame). The vetoes are the
+        picks and bans of the matches, parsed from the same match pages, with the
+        columns in `VETOES_COLUMNS`.
+
+    cursor: Optional[ResultsCursor]
+        Cursor over the /results pages, e.g. shared by successive crawls so that
+        each page is only fetched once. If specified, the crawl starts at its
+        position instead of `skip`, with its query, and leaves it after the last
+        match processed.
+
+    index: Optional[EntityIndex]
+        Local index the teams and the event of each match parsed are added to, so
+        that their names are later resolved without a search request.
+
     Return
     ------
     pandas.DataFrame containing all matches found that matched the criterias.
 
-    """
-    query = query or HLTVQuery(**kwargs)
-
-    columns = MATCHES_COLUMNS
-    df = pd.DataFrame(columns=columns)
-
-    while (limit is None) or (len(df) < limit):
-        batch_limit = batch_size if limit is None else min(batch_size, limit - len(df))
-        matches_ids = get_past_matches_ids(
-            skip=skip,
-            limit=batch_limit,
-            query=query
-        )
-
-        # Breaks if no result found
-        if len(matches_ids) == 0:
-            break
-        # Fetches match statistics using its ID
-        matches_stats = []
-        for match_id in matches_ids:
-            try:
-                stat = get_match_stats_by_id(match_id)
-                for map_details in stat["maps"]:
-                    pivoted = {**map_details, **stat}
-                    matches_stats.append({k: v for k, v in pivoted.items() if k in columns})
-            except Exception as e:
-                logger.error(f"Error parsing result for {match_id}. Either match_id is invalid or"
-                             "HLTV service unavailable at the moment.")
-                logger.error(e)
-                continue
-
-        df = df.append(matches_stats)
-        skip += len(matches_ids)
-
-    return df
+    If the crawl is interrupted by `deadline`, `df.attrs["stopped_at"]` is a dictionary
+    with the `reason` ('deadline' or 'cancelled') and the `skip` to resume the crawl
+    from. It is `None` if the crawl completed.
 
+    `df.attrs["next_skip"]` is the `skip` of a crawl continuing after this one, i.e.
+    `skip` plus the number of results processed.
 
-def get_match_stats_by_id(match_id):
+    """
+    monitor = monitor if monitor is not None else ParseMonitor()
+    client = client if client is not None else \
+        HLTVClient(config=config, deadline=deadline, priority="batch")
+    frame = FrameBuilder(MATCHES_COLUMNS, config=client.config)
+    vetoes_frame = FrameBuilder(VETOES_COLUMNS, config=client.config)
+
+    # Shared across batches so that each /results page is only fetched once
+    if cursor is None:
+        cursor = ResultsCursor(skip=skip, query=query or HLTVQuery(config=client.config, **kwargs),
+                               client=client)
+    skip = cursor.position
+    workers = pool_size(workers, client.config)
+
+    def fetch(match_id):
+        """Return the match and its rows, converted to records by the worker."""
+        try:
+            stat = get_match_stats_by_id(match_id, monitor=monitor, client=client)
+            rows = match_rows(stat) if len(stat) > 0 else []
+            if index is not None and len(stat) > 0:
+                index.ingest_match(stat)
+            return stat, rows
+        except (HLTVCrawlInterrupted, HLTVParserDriftException):
+            raise
+        except Exception as e:
+            logger.error(f"Error parsing result for {match_id}. Either match_id is invalid or "
+                         f"HLTV service unavailable at the moment: {e!r}")
+            return {}, []
+
+    # Number of matches processed, to resume an interrupted crawl
+    processed = 0
+    stopped_at = None
+    drift = None
+
+    if limit is None or limit > 0:
+        # The next /results pages are fetched while the matches of the previous ones are,
+        # but not past the matches expected to be needed to reach `limit`
+        matches_ids = prefetch(iter_ids(cursor), batch_size,
+                               demand=lambda: items_needed(limit, len(frame), processed))
+        with worker_pool(workers) as executor:
+            # Fetches match statistics using its ID
+            stats = ordered_map(fetch, matches_ids, executor,
+                                window=None if workers is None else 2 * workers)
+            try:
+                for stat, rows in stats:
+                    frame.append_records(rows)
+                    vetoes_frame.append([{"match_id": stat["match_id"], **veto}
+                                         for veto in stat.get("vetoes", [])])
+                    processed += 1
+
+                    if limit is not None and len(frame) >= limit:
+                        break
+            except HLTVCrawlInterrupted as e:
+                stopped_at = {"reason": e.reason, "skip": skip + processed}
+            except HLTVParserDriftException as e:
+                drift = e
+                stopped_at = {"reason": "drift", "skip": skip + processed}
+            finally:
+                stats.close()
+                matches_ids.close()
+
+    # The matches read ahead but not processed are left to the next crawl
+    cursor.seek(skip + processed)
+    df = frame.to_frame()
+    vetoes_df = vetoes_frame.to_frame()
+    for result in [df, vetoes_df]:
+        result.attrs["stopped_at"] = stopped_at
+        result.attrs["next_skip"] = skip + processed
+    returned = (df, vetoes_df) if include_vetoes else df
+    if drift is not None:
+        # Raised with the data collected so far rather than losing it
+        drift.partial = returned
+        drift.stopped_at = stopped_at
+        raise drift
+    return returned
+
+
+def get_match_stats_by_id(match_id, config=None, deadline=None, monitor=None, client=None):
     """Return the JSON details for the match by its match_id.
 
     Parameter
@@ -100,28 +188,44 @@ def get_match_stats_by_id(match_id):
     match_id: Optional[Union[str, int]]
         Match identifier.
 
+    config: Optional[ClientConfig]
+        Configuration of the client, built from `HLTVConfig` if not specified.
+
+    deadline: Optional[Deadline]
+        Deadline of the crawl, `HLTVCrawlInterrupted` is raised once it has passed.
+
+    monitor: Optional[ParseMonitor]
+        If specified, the parsed pages are validated and recorded by the monitor.
+
+    client: Optional[HLTVClient]
+        Client making the requests, built from `config` and `deadline` if not specified.
+
     Return
     ------
     List of dictionary objects containing the fields specified in {columns}
 
     """
 
+    client = client if client is not None else HLTVClient(config=config, deadline=deadline)
+
     # URL requires the event name but does not matter if it is
     # not the event corresponding to the ID
-    match_id = str(match_id)
-    match_uri = os.path.join("/", HLTVConfig["matches_uri"], match_id, "foo")
-
-    client = HLTVClient()
-    match_url = urljoin(HLTVConfig["base_url"], match_uri)
-    response = client.get(match_url)
+    match_url = client.config.url("matches_uri", match_id, "foo")
+    text = client.get(match_url).text
 
     # HTMLElement
-    tree = html.fromstring(response.text)
+    tree = html.fromstring(text)
 
     try:
-        return parse_match_page(tree)
+        match_details = parse_match_page(tree, config=client.config)
+        problems = validate_match(match_details)
     except Exception as e:
-        logger.error(f"Error parsing result for {match_id}. Either match_id is invalid or"
-                     "HLTV service unavailable at the moment.")
-        logger.error(e)
-        return {}
+        logger.error(f"Error parsing result for {match_id}. Either match_id is invalid or "
+                     f"HLTV service unavailable at the moment: {e!r}")
+        match_details, problems = {}, [f"parse_match_page failed: {e!r}"]
+    finally:
+        del tree
+
+    if monitor is not None:
+        monitor.observe("match", problems, url=match_url, text=text)
+    return match_details
@@ -0,0 +1,274 @@
+import logging
+
+from lxml import html
+
+from hltv_api.api.results import ResultsCursor, iter_ids
+from hltv_api.api.stats import MATCH_COLUMNS, ROUNDS_COLUMNS
+from hltv_api.client import HLTVClient
+from hltv_api.exceptions import HLTVCrawlInterrupted, HLTVParserDriftException
+from hltv_api.frames import FrameBuilder
+from hltv_api.models import match_rows
+from hltv_api.pages.matches import parse_match_page
+from hltv_api.pages.players import PLAYERS_COLUMNS, parse_map_stat_players_page
+from hltv_api.pages.stats import parse_map_stat_economy_page
+from hltv_api.query import HLTVQuery
+from hltv_api.validation import ParseMonitor, validate_economy, validate_match, validate_players
+from hltv_api.workers import ordered_map, pool_size, prefetch, worker_pool
+
+PLAYER_STATS_COLUMNS = ["match_id", "map_stats_id", "map", *PLAYERS_COLUMNS]
+
+logger = logging.getLogger(__name__)
+
+
+def get_players_stats(skip=0, limit=None, batch_size=100, query=None, include_economy=False,
+                      config=None, deadline=None, monitor=None, workers=None, client=None,
+                      cursor=None, index=None, **kwargs):
+    """Return a DataFrame with the statistics of each player on each map played.
+
+    The economy and the players tables are read from the same map statistics page,
+    so `include_economy` does not add any request.
+
+    Parameter
+    ---------
+    skip: Optional[int]
+        The number of results to be skipped from being returned.
+        If not specified, do not skip any records.
+
+    limit: Optional[int]
+        The maximum number of matches to be returned.
+        If NONE, return all the records found.
+
+    batch_size: Optional[int]
+        Number of match IDs buffered ahead of the matches being fetched. The next
+        /results pages are fetched in the background, while the matches of the
+        previous ones are, until the buffer is full or there are `limit` matches.
+
+    query: Optional[HLTVQuery]
+        Queries and filters for the data.
+
+    include_economy: Optional[bool]
+        If `True`, also return the DataFrame of `get_matches_with_economy`.
+
+    config: Optional[ClientConfig]
+        Configuration of the client, built from `HLTVConfig` if not specified.
+
+    deadline: Optional[Deadline]
+        Deadline of the crawl. Once it has passed or has been cancelled, the crawl
+        stops and returns the data collected so far.
+
+    monitor: Optional[ParseMonitor]
+        Validates the pages parsed and stops the crawl with `HLTVParserDriftException`
+        if most of them fail, e.g. after a change of the HLTV layout. The data collected
+        before is in its `partial`, and where the crawl stopped in its `stopped_at`.
+        A `ParseMonitor` with the default thresholds if not specified.
+
+    workers: Optional[int]
+        Number of matches fetched at the same time by a pool of threads sharing
+        the same client, at most `config.max_concurrency`. If not specified, one
+        at a time. The rows are returned
+        in the same order whatever the number of workers.
+
+    client: Optional[HLTVClient]
+        Client making the requests, built from `config` and `deadline` if not specified.
+
+    cursor: Optional[ResultsCursor]
+        Cursor over the /results pages, e.g. shared by successive crawls so that
+        each page is only fetched once. If specified, the crawl starts at its
+        position instead of `skip`, with its query, and leaves it after the last
+        match processed.
+
+    index: Optional[EntityIndex]
+        Local index the teams and the event of each match parsed are added to, so
+        that their names are later resolved without a search request.
+
+    kwargs:
+        Arguments to `HLTVQuery` if `query` is `None`.
+
+    Return
+    ------
+    pandas.DataFrame of the players statistics, or a tuple
+    (players DataFrame, economy DataFrame) if `include_economy` is `True`.
+
+    If the crawl is interrupted by `deadline`, the `stopped_at` entry of the `attrs`
+    of the DataFrames is a dictionary with the `reason` ('deadline' or 'cancelled')
+    and the `skip` to resume the crawl from. It is `None` if the crawl completed.
+
+    Their `next_skip` entry is the `skip` of a crawl continuing after this one, i.e.
+    `skip` plus the number of results processed.
+
+    """
+    monitor = monitor if monitor is not None else ParseMonitor()
+    client = client if client is not None else \
+        HLTVClient(config=config, deadline=deadline, priority="batch")
+
+    players_frame = FrameBuilder(PLAYER_STATS_COLUMNS, config=client.config)
+    economy_frame = FrameBuilder(MATCH_COLUMNS + ROUNDS_COLUMNS, config=client.config)
+
+    if cursor is None:
+        cursor = ResultsCursor(skip=skip, query=query or HLTVQuery(config=client.config, **kwargs),
+                               client=client)
+    skip = cursor.position
+    workers = pool_size(workers, client.config)
+
+    def fetch(match_id):
+        """Return the match and its economy rows, converted to records by the worker."""
+        try:
+            stats = get_economy_and_players_by_match_id(match_id, monitor=monitor, client=client)
+            rows = match_rows(stats) if len(stats) > 0 else []
+            if index is not None and len(stats) > 0:
+                index.ingest_match(stats)
+            return stats, rows
+        except (HLTVCrawlInterrupted, HLTVParserDriftException):
+            raise
+        except Exception as e:
+            logger.error(f"Error parsing players statistics for {match_id}. Either match_id is "
+                         f"invalid or HLTV service unavailable at the moment: {e!r}")
+            return {}, []
+
+    # Number of matches processed, to resume an interrupted crawl
+    processed = 0
+    stopped_at = None
+    drift = None
+
+    if limit is None or limit > 0:
+        # The next /results pages are fetched while the matches of the previous ones are
+        matches_ids = prefetch(iter_ids(cursor), batch_size, demand=lambda: limit)
+        with worker_pool(workers) as executor:
+            matches_stats = ordered_map(fetch, matches_ids, executor,
+                                        window=None if workers is None else 2 * workers)
+            try:
+                for stats, rows in matches_stats:
+                    processed += 1
+
+                    if len(stats) > 0:
+                        players_frame.append({"match_id": stats["match_id"],
+                                              "map": map_details["map"],
+                                              "map_stats_id": map_details["map_stats_id"],
+                                              **player}
+                                             for map_details in stats["maps"]
+                                             for player in map_details["players"])
+                        economy_frame.append_records(rows)
+
+                    if limit is not None and processed >= limit:
+                        break
+            except HLTVCrawlInterrupted as e:
+                stopped_at = {"reason": e.reason, "skip": skip + processed}
+            except HLTVParserDriftException as e:
+                drift = e
+                stopped_at = {"reason": "drift", "skip": skip + processed}
+            finally:
+                matches_stats.close()
+                matches_ids.close()
+
+    # The matches read ahead but not processed are left to the next crawl
+    cursor.seek(skip + processed)
+    players_df = players_frame.to_frame()
+    economy_df = economy_frame.to_frame()
+    for result in [players_df, economy_df]:
+        result.attrs["stopped_at"] = stopped_at
+        result.attrs["next_skip"] = skip + processed
+    returned = (players_df, economy_df) if include_economy else players_df
+    if drift is not None:
+        # Raised with the data collected so far rather than losing it
+        drift.partial = returned
+        drift.stopped_at = stopped_at
+        raise drift
+    return returned
+
+
+def get_economy_and_players_by_match_id(match_id, config=None, deadline=None, monitor=None,
+                                        client=None):
+    """Return the details of the match, with the economy and the players statistics of each map.
+
+    Each map has the fields of `parse_map_stat_economy_page`, and a list of
+    players with the fields of `parse_map_stat_players_page` under "players".
+    """
+    client = client if client is not None else HLTVClient(config=config, deadline=deadline)
+
+    # URL requires the event name but does not matter if it is
+    # not the event corresponding to the ID
+    match_url = client.config.url("matches_uri", match_id, "foo")
+    text = client.get(match_url).text
+
+    match_page = html.fromstring(text)
+    try:
+        match_details = parse_match_page(match_page, config=client.config)
+    except Exception as e:
+        logger.error(f"Error parsing result for {match_id}. Either match_id is invalid or "
+                     f"HLTV service unavailable at the moment: {e!r}")
+        if monitor is not None:
+            monitor.observe("match", [f"parse_match_page failed: {e!r}"], url=match_url,
+                            text=text)
+        return {}
+    finally:
+        del match_page
+
+    if monitor is not None:
+        monitor.observe("match", validate_match(match_details), url=match_url, text=text)
+    # Not kept while the pages of the maps are fetched
+    del text
+
+    match_details["maps"] = [{
+        **map_played,
+        **get_map_stats_by_map_stats_id(map_played["map_stats_id"], monitor=monitor,
+                                        client=client)
+    } for map_played in match_details["maps"]]
+
+    return match_details
+
+
+def _parse_players(tree, url, text, monitor=None):
+    """Return the players tables of the page `tree`, reporting a failure to `monitor`."""
+    try:
+        return parse_map_stat_players_page(tree)
+    except Exception as e:
+        if monitor is not None:
+            monitor.observe("players", [f"parse_map_stat_players_page failed: {e!r}"],
+                            url=url, text=text)
+        raise
+
+
+def get_map_stats_by_map_stats_id(map_stats_id, config=None, deadline=None, monitor=None,
+                                  client=None):
+    """Return the economy and the players statistics of a map.
+
+    Both are parsed from the economy page. The overview page of the map statistics
+    is only requested if the economy page does not contain the players tables.
+    """
+    client = client if client is not None else HLTVClient(config=config, deadline=deadline)
+
+    map_stats_url = client.config.url("economy_uri", map_stats_id, "foo")
+    text = client.get(map_stats_url).text
+
+    tree = html.fromstring(text)
+    try:
+        economy = parse_map_stat_economy_page(tree)
+    except Exception as e:
+        if monitor is not None:
+            monitor.observe("economy", [f"parse_map_stat_economy_page failed: {e!r}"],
+                            url=map_stats_url, text=text)
+        raise
+    else:
+        players = _parse_players(tree, map_stats_url, text, monitor)
+    finally:
+        del tree
+
+    if monitor is not None:
+        monitor.observe("economy", validate_economy(economy), url=map_stats_url, text=text)
+
+    if len(players) == 0:
+        overview_url = client.config.url("map_stats_uri", map_stats_id, "foo")
+        overview_text = client.get(overview_url).text
+        overview_tree = html.fromstring(overview_text)
+        try:
+            players = _parse_players(overview_tree, overview_url, overview_text, monitor)
+        finally:
+            del overview_tree
+
+        if monitor is not None:
+            monitor.observe("players", validate_players(players), url=overview_url,
+                            text=overview_text)
+    elif monitor is not None:
+        monitor.observe("players", validate_players(players), url=map_stats_url, text=text)
+
+    return {**economy, "players": players}
@@ -1,15 +1,19 @@
-from urllib.parse import urljoin
-
-import pandas as pd
 from lxml import html
 
 from hltv_api.client import HLTVClient
-from hltv_api.common import HLTVConfig
+from hltv_api.exceptions import HLTVCrawlInterrupted
+from hltv_api.frames import FrameBuilder
+from hltv_api.models import ResultRow
 from hltv_api.pages.results import RESULTS_COLUMNS, parse_result_page
 from hltv_api.query import HLTVQuery
+from hltv_api.workers import ordered_map, pool_size, worker_pool
+
+# Number of results listed on each /results page
+RESULTS_PAGE_SIZE = 100
 
 
-def get_results(skip=0, limit=None, query=None, **kwargs):
+def get_results(skip=0, limit=None, query=None, config=None, deadline=None, workers=None,
+                client=None, cursor=None, **kwargs):
     """Fetches data for the results filtered by `query`.
 
     Parameter
@@ -27,40 +31,70 @@ def get_results(skip=0, limit=None, query=None, **kwargs):
     query: Optional[HLTVQuery]
         Query and filter for data required.
 
+    config: Optional[ClientConfig]
+        Configuration of the client, built from `HLTVConfig` if not specified.
+
+    deadline: Optional[Deadline]
+        Deadline of the crawl. Once it has passed or has been cancelled, the crawl
+        stops and returns the data collected so far.
+
+    workers: Optional[int]
+        Number of /results pages fetched at the same time, at most `config.max_concurrency`.
+        If not specified, one at a time.
+
+    client: Optional[HLTVClient]
+        Client making the requests, built from `config` and `deadline` if not specified.
+
+    cursor: Optional[ResultsCursor]
+        Cursor over the /results pages, e.g. shared by successive crawls so that
+        each page is only fetched once. If specified, the crawl starts at its
+        position instead of `skip`, with its query, and leaves it after the last
+        result processed.
+
     kwargs:
         Arguments to pass to HLTVQuery if `query` is `None`.
 
     Return
     ------
     pandas.DataFrame
-    """
 
-    query = query or HLTVQuery(**kwargs)
-    url = urljoin(HLTVConfig["base_url"], HLTVConfig["results_uri"])
+    If the crawl is interrupted by `deadline`, `df.attrs["stopped_at"]` is a dictionary
+    with the `reason` ('deadline' or 'cancelled') and the `skip` to resume the crawl
+    from. It is `None` if the crawl completed.
 
-    df = pd.DataFrame(columns=RESULTS_COLUMNS)
+    `df.attrs["next_skip"]` is the `skip` of a crawl continuing after this one, i.e.
+    `skip` plus the number of results processed.
+    """
 
-    client = HLTVClient()
-    while (limit is None) or (len(df) < limit):
-        response = client.get(url, params={
-            "offset": skip, **query.to_params()
-        })
-        tree = html.fromstring(response.text)
+    stopped_at = None
+
+    if cursor is None:
+        cursor = ResultsCursor(skip=skip, query=query, config=config, deadline=deadline,
+                               workers=workers, client=client, **kwargs)
+    skip = cursor.position
+    frame = FrameBuilder(RESULTS_COLUMNS, config=cursor.config)
+    while (limit is None) or (len(frame) < limit):
+        batch_limit = RESULTS_PAGE_SIZE if limit is None else min(RESULTS_PAGE_SIZE, limit - len(frame))
+        try:
+            results = cursor.next_results(batch_limit)
+        except HLTVCrawlInterrupted as e:
+            stopped_at = {"reason": e.reason, "skip": skip + len(frame)}
+            break
 
-        results = parse_result_page(tree)
         if len(results) == 0:
             break
 
-        batch_limit = len(results) if limit is None else min(len(results), limit - len(df))
-
-        df = df.append(results[:batch_limit])
-
-        skip += len(df)
+        frame.append_records(ResultRow.from_dict(result) for result in results)
 
+    cursor.seek(skip + len(frame))
+    df = frame.to_frame()
+    df.attrs["stopped_at"] = stopped_at
+    df.attrs["next_skip"] = skip + len(frame)
     return df
 
 
-def get_past_matches_ids(skip=0, limit=100, query=None, **kwargs):
+def get_past_matches_ids(skip=0, limit=100, query=None, config=None, deadline=None, workers=None,
+                         client=None, **kwargs):
     """Return the IDs of matches in /results page.
 
     First, hits HLTV page /results?offset={skip}&startDate={start_date}&endDate={end_date}.
@@ -84,35 +118,217 @@ def get_past_matches_ids(skip=0, limit=100, query=None, **kwargs):
     query: Optional[HLTVQuery]
         Queries and filters for the data.
 
+    config: Optional[ClientConfig]
+        Configuration of the client, built from `HLTVConfig` if not specified.
+
+    deadline: Optional[Deadline]
+        Deadline of the crawl. Once it has passed or has been cancelled, the IDs
+        collected so far are returned.
+
+    workers: Optional[int]
+        Number of /results pages fetched at the same time, at most `config.max_concurrency`.
+        If not specified, one at a time.
+
+    client: Optional[HLTVClient]
+        Client making the requests, built from `config` and `deadline` if not specified.
+
     kwargs:
         Arguments to `HLTVQuery` if `query` is `None`.
 
+    Return
+    ------
+    MatchIds
+
+    A list of match IDs. As with the `attrs` of the frames of the other crawls,
+    `ids.stopped_at` is a dictionary with the `reason` and the `skip` to resume
+    the crawl from if it was interrupted by `deadline`, `None` otherwise, and
+    `ids.next_skip` is the `skip` of a crawl continuing after this one.
     """
-    results_url = urljoin(HLTVConfig["base_url"], HLTVConfig["results_uri"])
-    client = HLTVClient()
+    cursor = ResultsCursor(skip=skip, query=query, config=config, deadline=deadline,
+                           workers=workers, client=client, **kwargs)
+
+    matches_ids = MatchIds()
+    while (limit is None) or (len(matches_ids) < limit):
+        batch_limit = RESULTS_PAGE_SIZE if limit is None else min(RESULTS_PAGE_SIZE, limit - len(matches_ids))
+        try:
+            batch = cursor.next_ids(batch_limit)
+        except HLTVCrawlInterrupted as e:
+            matches_ids.stopped_at = {"reason": e.reason, "skip": skip + len(matches_ids)}
+            break
 
-    # Accumulator for all match ids
-    all_matches_ids = []
+        if len(batch) == 0:
+            break
+        matches_ids += batch
 
-    query = query or HLTVQuery(**kwargs)
+    matches_ids.next_skip = skip + len(matches_ids)
+    return matches_ids
 
-    while (limit is None) or (len(all_matches_ids) < limit):
-        response = client.get(results_url, params={
-            "offset": skip, **query.to_params()
-        })
 
-        tree = html.fromstring(response.text)
+class MatchIds(list):
+    """List of the match IDs returned by `get_past_matches_ids`, with where the crawl stopped."""
 
-        results = parse_result_page(tree)
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.stopped_at = None
+        self.next_skip = None
 
-        # No more results
-        if len(results) == 0:
-            break
 
-        # Set the offset for the next request
-        skip += len(results)
+def iter_ids(cursor):
+    """Iterate over the match IDs of the results of `cursor`, a /results page at a time."""
+    while True:
+        # What is left of the pages fetched first, so that the next page is only
+        # fetched once it is needed
+        matches_ids = cursor.next_ids(cursor.buffered or RESULTS_PAGE_SIZE)
+        if len(matches_ids) == 0:
+            return
+        yield from matches_ids
 
-        # Adds to the accumulator
-        all_matches_ids += [result["match_id"] for result in results]
 
-    return all_matches_ids[:limit]
\ No newline at end of file
+class ResultsCursor:
+    """Stateful iterator over the results listed on the /results pages.
+
+    Pages that have been downloaded but not fully consumed are buffered, so
+    callers that pull IDs in batches (e.g. `get_matches_stats`) fetch each
+    /results page exactly once per crawl, whatever the batch size.
+
+    Attribute
+    ---------
+    skip: int
+        Offset of the next /results page to be requested.
+
+    exhausted: bool
+        `True` once HLTV returned an empty page, i.e. there are no more results.
+
+    """
+
+    def __init__(self, skip=0, query=None, params=None, config=None, deadline=None, workers=None,
+                 client=None, rewindable=False, **kwargs):
+        """
+        Parameter
+        ---------
+        skip: Optional[int]
+            The number of results to be skipped.
+
+        query: Optional[HLTVQuery]
+            Queries and filters for the data.
+
+        params: Optional[dict]
+            Query parameters already resolved with `HLTVQuery.to_params`.
+            If specified, `query` and `kwargs` are ignored.
+
+        config: Optional[ClientConfig]
+            Configuration of the client, built from `HLTVConfig` if not specified.
+
+        deadline: Optional[Deadline]
+            Deadline of the crawl, `HLTVCrawlInterrupted` is raised once it has passed.
+
+        workers: Optional[int]
+            Number of /results pages fetched at the same time, at most
+            `config.max_concurrency`. If not specified, one at a time.
+
+        client: Optional[HLTVClient]
+            Client making the requests, built from `config` and `deadline` if not specified.
+
+        rewindable: Optional[bool]
+            If `True`, the results returned since the last `seek` are kept, so that
+            the cursor can be moved back to the results a crawl read ahead but did
+            not process without fetching them again.
+
+        kwargs:
+            Arguments to `HLTVQuery` if `query` and `params` are `None`.
+
+        """
+        self.skip = skip
+        self.exhausted = False
+        self.rewindable = rewindable
+
+        self._client = client if client is not None else \
+            HLTVClient(config=config, deadline=deadline, priority="batch")
+        self._query = query or \
+            (HLTVQuery(config=self._client.config, **kwargs) if params is None else None)
+        self._params = params
+        self._buffer = []
+        # Results returned since the last `seek`, only kept if `rewindable`
+        self._returned = []
+        self.workers = pool_size(workers, self._client.config) or 1
+        self._url = self._client.config.url("results_uri")
+
+    @property
+    def config(self):
+        return self._client.config
+
+    @property
+    def buffered(self):
+        """Number of results fetched but not returned yet."""
+        return len(self._buffer)
+
+    @property
+    def position(self):
+        """Offset of the next result returned by this cursor."""
+        return self.skip - len(self._buffer)
+
+    def seek(self, position):
+        """Move the cursor to the result at offset `position`.
+
+        The results buffered, and those returned since the last `seek` if the cursor
+        is `rewindable`, are not fetched again if `position` is among them.
+        """
+        start = self.position - len(self._returned)
+        if start <= position <= self.skip:
+            self._buffer = (self._returned + self._buffer)[position - start:]
+        else:
+            self.skip = position
+            self._buffer = []
+            self.exhausted = False
+        self._returned = []
+
+    def _get_page(self, offset):
+        text = self._client.get(self._url, params={"offset": offset, **self._params}).text
+        tree = html.fromstring(text)
+        try:
+            return parse_result_page(tree, config=self._client.config)
+        finally:
+            del tree
+
+    def _fetch_page(self):
+        # Names in the query are resolved with a search request each, so only do it once
+        if self._params is None:
+            self._params = self._query.to_params(client=self._client)
+
+        # With several workers, the next pages are fetched at the same time,
+        # assuming all the pages but the last one are full
+        offsets = [self.skip + i * RESULTS_PAGE_SIZE for i in range(self.workers)]
+        with worker_pool(self.workers) as executor:
+            for results in ordered_map(self._get_page, offsets, executor):
+                # No more results
+                if len(results) == 0:
+                    self.exhausted = True
+                    return
+
+                # Set the offset for the next request
+                self.skip += len(results)
+                self._buffer += results
+
+                if len(results) < RESULTS_PAGE_SIZE and self.workers > 1:
+                    self.exhausted = True
+                    return
+
+    def next_results(self, limit=None):
+        """Return up to `limit` results not yet returned by this cursor.
+
+        If `limit` is None, return every remaining result.
+        """
+        while not self.exhausted and (limit is None or len(self._buffer) < limit):
+            self._fetch_page()
+
+        if limit is None:
+            limit = len(self._buffer)
+
+        results, self._buffer = self._buffer[:limit], self._buffer[limit:]
+        if self.rewindable:
+            self._returned += results
+        return results
+
+    def next_ids(self, limit=None):
+        """Return the match IDs of up to `limit` results not yet returned by this cursor."""
+        return [result["match_id"] for result in self.next_results(limit)]
@@ -1,23 +1,29 @@
-import os
-from urllib.parse import urljoin
+import logging
 
-import pandas as pd
 from lxml import html
 
-from hltv_api.api.results import get_past_matches_ids
+from hltv_api.api.results import ResultsCursor, iter_ids
 from hltv_api.client import HLTVClient
-from hltv_api.common import HLTVConfig
-from hltv_api.pages.matches import parse_match_page
-from hltv_api.pages.stats import parse_map_stat_economy_page
+from hltv_api.exceptions import HLTVCrawlInterrupted, HLTVParserDriftException
+from hltv_api.frames import FrameBuilder
+from hltv_api.models import match_rows
+from hltv_api.pages.matches import VETOES_COLUMNS, parse_match_page
+from hltv_api.pages.stats import parse_map_stat_economy_html
 from hltv_api.query import HLTVQuery
+from hltv_api.validation import ParseMonitor, validate_economy, validate_match
+from hltv_api.workers import items_needed, ordered_map, pool_size, prefetch, worker_pool
 
 MATCH_COLUMNS = ["match_id", "map", "team_1_id", "team_2_id", "starting_ct"]
 ROUNDS_COLUMNS = [col
                   for i in range(1, 31)
                   for col in [f"{i}_team_1_value", f"{i}_team_2_value", f"{i}_winner"]]
 
+logger = logging.getLogger(__name__)
 
-def get_matches_with_economy(skip=0, limit=None, batch_size=100, query=None, **kwargs):
+
+def get_matches_with_economy(skip=0, limit=None, batch_size=100, query=None, config=None,
+                             deadline=None, monitor=None, workers=None, client=None,
+                             include_vetoes=False, cursor=None, index=None, **kwargs):
     """Return a DataFrame containing
 
     Parameter
@@ -32,76 +38,192 @@ def get_matches_with_economy(skip=0, limit=None, batch_size=100, query=None, **k
         of matches displayed per page on HLTV.
         If NONE, return all the records found.
 
+    batch_size: Optional[int]
+        Number of match IDs buffered ahead of the matches being fetched. The next
+        /results pages are fetched in the background, while the matches of the
+        previous ones are, until the buffer is full or until there are enough
+        matches for `limit` rows at the number of maps per match seen so far.
+
     query: Optional[HLTVQuery]
         Queries and filters for the data.
 
-    kwargs:
-        Arguments to `HLTVQuery` if `query` is `None`.
+    config: Optional[ClientConfig]
+        Configuration of the client, built from `HLTVConfig` if not specified.
 
-    """
-    query = query or HLTVQuery(**kwargs)
+    deadline: Optional[Deadline]
+        Deadline of the crawl. Once it has passed or has been cancelled, the crawl
+        stops and returns the data collected so far.
 
-    columns = MATCH_COLUMNS + ROUNDS_COLUMNS
-    df = pd.DataFrame(columns=columns)
+    monitor: Optional[ParseMonitor]
+        Validates the pages parsed and stops the crawl with `HLTVParserDriftException`
+        if most of them fail, e.g. after a change of the HLTV layout. The data collected
+        before is in its `partial`, and where the crawl stopped in its `stopped_at`.
+        A `ParseMonitor` with the default thresholds if not specified.
 
-    while (limit is None) or (len(df) < limit):
-        batch_limit = batch_size if limit is None else min(batch_size, limit - len(df))
-        matches_ids = get_past_matches_ids(
-            skip=skip,
-            limit=batch_limit,
-            query=query
-        )
+    workers: Optional[int]
+        Number of matches fetched at the same time by a pool of threads sharing
+        the same client, at most `config.max_concurrency`. If not specified, one
+        at a time. The rows are returned
+        in the same order whatever the number of workers.
 
-        # Breaks if no result found
-        if len(matches_ids) == 0:
-            break
+    client: Optional[HLTVClient]
+        Client making the requests, built from `config` and `deadline` if not specified.
 
-        # Fetches match statistics using its ID
-        matches_stats = []
-        for match_id in matches_ids:
-            stats = get_economy_by_match_id(match_id)
+    include_vetoes: Optional[bool]
+        If `True`, return a tuple (DataFrame, vetoes DataFrame). The vetoes are the
+        picks and bans of the matches, parsed from the same match pages, with the
+        columns in `VETOES_COLUMNS`.
 
-            if len(stats) == 0:
-                continue
+    cursor: Optional[ResultsCursor]
+        Cursor over the /results pages, e.g. shared by successive crawls so that
+        each page is only fetched once. If specified, the crawl starts at its
+        position instead of `skip`, with its query, and leaves it after the last
+        match processed.
 
-            for map_details in stats["maps"]:
-                pivoted = {**map_details, **stats}
-                matches_stats.append({k: v for k, v in pivoted.items() if k in columns})
+    index: Optional[EntityIndex]
+        Local index the teams and the event of each match parsed are added to, so
+        that their names are later resolved without a search request.
 
-        df = df.append(matches_stats)
-        skip += len(matches_ids)
+    kwargs:
+        Arguments to `HLTVQuery` if `query` is `None`.
 
-    return df
+    If the crawl is interrupted by `deadline`, `df.attrs["stopped_at"]` is a dictionary
+    with the `reason` ('deadline' or 'cancelled') and the `skip` to resume the crawl
+    from. It is `None` if the crawl completed.
 
+    `df.attrs["next_skip"]` is the `skip` of a crawl continuing after this one, i.e.
+    `skip` plus the number of results processed.
 
-def get_economy_by_match_id(match_id):
-    client = HLTVClient()
+    """
+    monitor = monitor if monitor is not None else ParseMonitor()
+    client = client if client is not None else \
+        HLTVClient(config=config, deadline=deadline, priority="batch")
+    frame = FrameBuilder(MATCH_COLUMNS + ROUNDS_COLUMNS, config=client.config)
+    vetoes_frame = FrameBuilder(VETOES_COLUMNS, config=client.config)
+
+    # Shared across batches so that each /results page is only fetched once
+    if cursor is None:
+        cursor = ResultsCursor(skip=skip, query=query or HLTVQuery(config=client.config, **kwargs),
+                               client=client)
+    skip = cursor.position
+    workers = pool_size(workers, client.config)
+
+    def fetch(match_id):
+        """Return the match and its rows, converted to records by the worker."""
+        try:
+            stats = get_economy_by_match_id(match_id, monitor=monitor, client=client)
+            rows = match_rows(stats) if len(stats) > 0 else []
+            if index is not None and len(stats) > 0:
+                index.ingest_match(stats)
+            return stats, rows
+        except (HLTVCrawlInterrupted, HLTVParserDriftException):
+            raise
+        except Exception as e:
+            logger.error(f"Error parsing economy for {match_id}. Either match_id is invalid or "
+                         f"HLTV service unavailable at the moment: {e!r}")
+            return {}, []
+
+    # Number of matches processed, to resume an interrupted crawl
+    processed = 0
+    stopped_at = None
+    drift = None
+
+    if limit is None or limit > 0:
+        # The next /results pages are fetched while the matches of the previous ones are,
+        # but not past the matches expected to be needed to reach `limit`
+        matches_ids = prefetch(iter_ids(cursor), batch_size,
+                               demand=lambda: items_needed(limit, len(frame), processed))
+        with worker_pool(workers) as executor:
+            # Fetches match statistics using its ID
+            economies = ordered_map(fetch, matches_ids, executor,
+                                    window=None if workers is None else 2 * workers)
+            try:
+                for stats, rows in economies:
+                    processed += 1
+
+                    if len(stats) == 0:
+                        continue
+
+                    frame.append_records(rows)
+                    vetoes_frame.append([{"match_id": stats["match_id"], **veto}
+                                         for veto in stats.get("vetoes", [])])
+
+                    if limit is not None and len(frame) >= limit:
+                        break
+            except HLTVCrawlInterrupted as e:
+                stopped_at = {"reason": e.reason, "skip": skip + processed}
+            except HLTVParserDriftException as e:
+                drift = e
+                stopped_at = {"reason": "drift", "skip": skip + processed}
+            finally:
+                economies.close()
+                matches_ids.close()
+
+    # The matches read ahead but not processed are left to the next crawl
+    cursor.seek(skip + processed)
+    df = frame.to_frame()
+    vetoes_df = vetoes_frame.to_frame()
+    for result in [df, vetoes_df]:
+        result.attrs["stopped_at"] = stopped_at
+        result.attrs["next_skip"] = skip + processed
+    returned = (df, vetoes_df) if include_vetoes else df
+    if drift is not None:
+        # Raised with the data collected so far rather than losing it
+        drift.partial = returned
+        drift.stopped_at = stopped_at
+        raise drift
+    return returned
+
+
+def get_economy_by_match_id(match_id, config=None, deadline=None, monitor=None, client=None):
+    client = client if client is not None else HLTVClient(config=config, deadline=deadline)
 
     # URL requires the event name but does not matter if it is
     # not the event corresponding to the ID
-    match_id = str(match_id)
-    match_uri = os.path.join(HLTVConfig["matches_uri"], match_id, "foo")
-    match_url = urljoin(HLTVConfig["base_url"], match_uri)
-    response = client.get(match_url)
-
-    match_page = html.fromstring(response.text)
-    match_details = parse_match_page(match_page)
+    match_url = client.config.url("matches_uri", match_id, "foo")
+    text = client.get(match_url).text
+
+    match_page = html.fromstring(text)
+    try:
+        match_details = parse_match_page(match_page, config=client.config)
+    except Exception as e:
+        if monitor is not None:
+            monitor.observe("match", [f"parse_match_page failed: {e!r}"], url=match_url,
+                            text=text)
+        raise
+    finally:
+        del match_page
+
+    if monitor is not None:
+        monitor.observe("match", validate_match(match_details), url=match_url, text=text)
+    # Not kept while the economy pages are fetched
+    del text
 
     if match_details != {}:
         match_details["maps"] = [{
             **map_played,
-            **get_economy_by_map_stats_id(map_played["map_stats_id"])
+            **get_economy_by_map_stats_id(map_played["map_stats_id"], monitor=monitor,
+                                          client=client)
         } for map_played in match_details["maps"]]
 
     return match_details
 
 
-def get_economy_by_map_stats_id(map_stats_id):
-    client = HLTVClient()
+def get_economy_by_map_stats_id(map_stats_id, config=None, deadline=None, monitor=None,
+                                client=None):
+    client = client if client is not None else HLTVClient(config=config, deadline=deadline)
+
+    map_stats_url = client.config.url("economy_uri", map_stats_id, "foo")
+    text = client.get(map_stats_url).text
 
-    map_stats_uri = os.path.join(HLTVConfig["economy_uri"], str(map_stats_id), "foo")
-    map_stats_url = urljoin(HLTVConfig["base_url"], map_stats_uri)
-    map_stat_response = client.get(map_stats_url)
+    try:
+        economy = parse_map_stat_economy_html(text)
+    except Exception as e:
+        if monitor is not None:
+            monitor.observe("economy", [f"parse_map_stat_economy_html failed: {e!r}"],
+                            url=map_stats_url, text=text)
+        raise
 
-    tree = html.fromstring(map_stat_response.text)
-    return parse_map_stat_economy_page(tree)
+    if monitor is not None:
+        monitor.observe("economy", validate_economy(economy), url=map_stats_url, text=text)
+    return economy
@@ -0,0 +1,345 @@
+"""Compressed archive of the raw pages fetched from HLTV.
+
+Pages are kept so that they can be parsed again when the layout of HLTV changes,
+without fetching them again. They are appended, compressed one by one, to a few
+large segment files instead of one file per page:
+
+    <path>/segment-00000.bin
+    <path>/segment-00001.bin
+    <path>/index.jsonl
+
+Each record of a segment is a header, the URL of the page and its compressed HTML,
+so segments can be read sequentially without the index. The index maps the URL of
+each page, and its kind with the ID found in the URL (match ID, map statistics ID),
+to the position of the record, for random access through memory-mapped segments.
+
+Pages are compressed with zstd if `zstandard` is installed, otherwise with zlib.
+The codec is recorded per page, so both can be mixed in the same archive.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from urllib.parse import urlparse
+
+from lxml import html
+
+from hltv_api.common import get_config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Magic, codec, length of the URL, length of the compressed page
+_HEADER = struct.Struct("<4sBII")
+_MAGIC = b"HLTV"
+
+CODECS = {"zlib": 0, "zstd": 1}
+
+INDEX_FILE = "index.jsonl"
+SEGMENT_FILE = "segment-{:05d}.bin"
+
+PAGE_KINDS = ("results", "match", "economy", "map_stats", "search", "other")
+
+
+def _compress(codec, data):
+    if codec == CODECS["zstd"]:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(codec, data):
+    if codec == CODECS["zstd"]:
+        if zstandard is None:
+            raise ImportError("zstandard is required to read pages compressed with zstd, "
+                              "install it with `pip install zstandard`")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def page_kind(url, config=None):
+    """Return the kind of the page at `url`, one of `PAGE_KINDS`.
+
+    Unlike `sessions.endpoint_class`, the economy and the overview pages of the
+    map statistics are different kinds, as they share their ID.
+    """
+    config = get_config(config)
+    path = urlparse(url).path.strip("/")
+
+    kinds = [("economy", [config.economy_uri]), ("map_stats", [config.map_stats_uri]),
+             ("results", [config.results_uri]), ("match", [config.matches_uri]),
+             ("search", [config.search_teams_uri, config.search_players_uri,
+                         config.search_events_uri])]
+    for kind, uris in kinds:
+        if any(path == uri or path.startswith(f"{uri}/") for uri in uris):
+            return kind
+    return "other"
+
+
+def page_id(url, config=None):
+    """Return the ID in the path of `url`, e.g. the match ID of a match page, or `None`."""
+    config = get_config(config)
+    path = urlparse(url).path.strip("/")
+
+    for uri in [config.economy_uri, config.map_stats_uri, config.matches_uri]:
+        if path.startswith(f"{uri}/"):
+            segment = path[len(uri) + 1:].split("/")[0]
+            return int(segment) if segment.isdigit() else None
+    return None
+
+
+class PageArchive:
+    """Append-only archive of raw HTML pages.
+
+    Parameter
+    ---------
+    path: str
+        Directory of the archive. Created if it does not exist.
+
+    compression: Optional[str]
+        'zstd' or 'zlib'. If not specified, zstd if `zstandard` is installed, zlib otherwise.
+
+    segment_size: Optional[int]
+        Size in bytes after which a new segment file is started.
+
+    config: Optional[ClientConfig]
+        Configuration used to find the kind and the ID of the pages from their URL.
+
+    """
+
+    def __init__(self, path, compression=None, segment_size=256 * 1024 * 1024, config=None):
+        if compression is None:
+            compression = "zlib" if zstandard is None else "zstd"
+        if compression not in CODECS:
+            raise KeyError(f"{compression} is not a valid compression, expected one of {list(CODECS)}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstandard is required for zstd compression, "
+                              "install it with `pip install zstandard`")
+
+        self.path = path
+        self.codec = CODECS[compression]
+        self.segment_size = segment_size
+        self.config = get_config(config)
+
+        self._lock = threading.Lock()
+        # URL -> index entry of the latest record of the page
+        self._entries = {}
+        # (page kind, ID) -> URL
+        self._ids = {}
+        # Segment number -> mmap
+        self._maps = {}
+
+        os.makedirs(path, exist_ok=True)
+        self._load_index()
+
+        segments = self.segments()
+        self._segment = segments[-1] if len(segments) > 0 else 0
+        # Never append after a record that cannot be read
+        if len(segments) > 0 and not self._truncate_segment(self._segment):
+            self._segment += 1
+        self._writer = None
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return url in self._entries
+
+    def _segment_path(self, segment):
+        return os.path.join(self.path, SEGMENT_FILE.format(segment))
+
+    def segments(self):
+        """Return the numbers of the segment files, in order."""
+        return sorted(int(name[len("segment-"):-len(".bin")])
+                      for name in os.listdir(self.path)
+                      if name.startswith("segment-") and name.endswith(".bin"))
+
+    def _load_index(self):
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+
+        with open(index_path, "rb") as f:
+            data = f.read()
+
+        # The last line is truncated if the writer was killed, drop it so that
+        # the next entry is not appended to it
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            with open(index_path, "r+b") as f:
+                f.truncate(end)
+
+        for line in data[:end].decode().splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            # Entries written before the page kinds have the endpoint class instead
+            entry["kind"] = page_kind(entry["url"], self.config)
+            self._add_entry(entry)
+
+    def _truncate_segment(self, segment):
+        """Drop the record at the end of `segment` truncated by a writer killed
+        mid-write, so that the records appended after it can be read.
+
+        Return `False`, leaving the segment as is, if it holds a corrupted record.
+        """
+        path = self._segment_path(segment)
+        size = os.path.getsize(path)
+
+        with open(path, "r+b") as f:
+            offset = 0
+            while offset + _HEADER.size <= size:
+                f.seek(offset)
+                magic, _, url_length, length = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC:
+                    return False
+                end = offset + _HEADER.size + url_length + length
+                if end > size:
+                    break
+                offset = end
+
+            if offset < size:
+                f.truncate(offset)
+        return True
+
+    def _add_entry(self, entry):
+        self._entries[entry["url"]] = entry
+        if entry["id"] is not None:
+            self._ids[(entry["kind"], entry["id"])] = entry["url"]
+
+    def put(self, url, text):
+        """Append the HTML `text` of the page at `url` to the archive."""
+        url_bytes = url.encode()
+        payload = _compress(self.codec, text.encode())
+        record = _HEADER.pack(_MAGIC, self.codec, len(url_bytes), len(payload)) + url_bytes + payload
+
+        with self._lock:
+            if self._writer is None:
+                self._writer = open(self._segment_path(self._segment), "ab")
+                self._index = open(os.path.join(self.path, INDEX_FILE), "a")
+            elif self._writer.tell() >= self.segment_size:
+                self._writer.close()
+                self._segment += 1
+                self._writer = open(self._segment_path(self._segment), "ab")
+
+            offset = self._writer.tell()
+            self._writer.write(record)
+            self._writer.flush()
+
+            entry = {
+                "url": url,
+                "kind": page_kind(url, self.config),
+                "id": page_id(url, self.config),
+                "segment": self._segment,
+                "offset": offset,
+                "length": len(record),
+            }
+            self._index.write(json.dumps(entry) + "\n")
+            self._index.flush()
+            self._add_entry(entry)
+
+    def _map(self, segment, end):
+        """Return the mmap of `segment`, remapped if it does not cover `end` yet."""
+        with self._lock:
+            segment_map = self._maps.get(segment)
+            # The previous map is left to be garbage collected, it may still be read
+            if segment_map is None or len(segment_map) < end:
+                with open(self._segment_path(segment), "rb") as f:
+                    segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = segment_map
+            return segment_map
+
+    @staticmethod
+    def _read_record(buffer, offset):
+        """Return the URL, the page and the offset of the next record."""
+        magic, codec, url_length, length = _HEADER.unpack_from(buffer, offset)
+        if magic != _MAGIC:
+            raise ValueError(f"Corrupted archive record at offset {offset}")
+
+        start = offset + _HEADER.size
+        url = bytes(buffer[start:start + url_length]).decode()
+        payload = buffer[start + url_length:start + url_length + length]
+        text = _decompress(codec, payload).decode()
+        return url, text, start + url_length + length
+
+    def get(self, url):
+        """Return the HTML of the page at `url`, `None` if it is not in the archive."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+
+        segment_map = self._map(entry["segment"], entry["offset"] + entry["length"])
+        _, text, _ = self._read_record(segment_map, entry["offset"])
+        return text
+
+    def get_by_id(self, kind, entity_id):
+        """Return the HTML of a page by its kind (see `PAGE_KINDS`) and its ID, e.g.
+        `get_by_id("match", 2350368)`. `None` if it is not in the archive."""
+        url = self._ids.get((kind, int(entity_id)))
+        return None if url is None else self.get(url)
+
+    def iter_pages(self, kind=None):
+        """Iterate over the `(url, html)` of every page, reading the segments sequentially.
+
+        Pages fetched several times are returned every time they were stored.
+
+        Parameter
+        ---------
+        kind: Optional[str]
+            Only return the pages of this kind, one of `PAGE_KINDS`.
+
+        """
+        for segment in self.segments():
+            path = self._segment_path(segment)
+            if os.path.getsize(path) == 0:
+                continue
+
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                offset = 0
+                while offset + _HEADER.size <= len(buffer):
+                    magic, _, url_length, length = _HEADER.unpack_from(buffer, offset)
+                    if magic != _MAGIC:
+                        raise ValueError(f"Corrupted archive record at offset {offset} of {path}")
+                    end = offset + _HEADER.size + url_length + length
+                    # Record truncated by a writer killed mid-write
+                    if end > len(buffer):
+                        break
+
+                    if kind is None:
+                        url, text, offset = self._read_record(buffer, offset)
+                        yield url, text
+                        continue
+
+                    start = offset + _HEADER.size
+                    url = bytes(buffer[start:start + url_length]).decode()
+                    if page_kind(url, self.config) == kind:
+                        _, text, _ = self._read_record(buffer, offset)
+                        yield url, text
+                    offset = end
+
+    def iter_trees(self, kind=None):
+        """Same as `iter_pages`, with the pages parsed to be given to the `pages.*` parsers."""
+        for url, text in self.iter_pages(kind):
+            yield url, html.fromstring(text)
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._index.close()
+                self._writer = self._index = None
+
+            for segment_map in self._maps.values():
+                segment_map.close()
+            self._maps = {}
@@ -0,0 +1,438 @@
+"""Command line interface of the crawls, installed as the `hltv` console script.
+
+    hltv results --start-date 2021-09-01 --team "Natus Vincere" --output results.csv
+    hltv matches --limit 5000 --workers 4 --checkpoint matches.json --output matches.csv
+    hltv economy --stars 1 --cache-dir cache/ --format jsonl --output economy.jsonl
+    hltv resolve team "Natus Vincere" Gambit
+
+Crawls run in chunks of `--chunk-size` rows, sharing the same cursor over the /results
+pages. After each chunk, its rows are appended to the output and the `skip` of the next
+chunk is written to the checkpoint file with the size of the output, so a crawl stopped
+by `--max-time`, SIGTERM or SIGINT, or killed, is resumed by running the same command
+again. Rows written after the last checkpoint are dropped from the output on resume.
+
+`--cache-dir` is a directory of pages reused across runs: the pages of matches and map
+statistics found in it are not fetched again, and those fetched are added to it. The
+/results pages, which change as matches are played, are always fetched.
+
+`--archive` keeps every raw page fetched, e.g. to parse them again later. Pages are
+never read from it, and pages read from the cache are not added to it.
+
+The throughput (requests/s, rows/s and the ETA if `--limit` is given) is reported on
+stderr every `--progress-interval` seconds.
+
+Exit status is 0 once the crawl is complete, 1 on errors, 2 on invalid arguments and
+3 if the crawl was stopped before the end.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from hltv_api.api import matches, results, stats
+from hltv_api.api.results import ResultsCursor
+from hltv_api.archive import PageArchive
+from hltv_api.client import HLTVClient, set_default_archive, set_default_scheduler
+from hltv_api.common import ClientConfig
+from hltv_api.deadline import Deadline
+from hltv_api.exceptions import HLTVApiException, HLTVParserDriftException
+from hltv_api.index import KINDS, EntityIndex
+from hltv_api.query import HLTVQuery
+from hltv_api.scheduler import DEFAULT_CLASSES, RequestScheduler
+
+CRAWLS = {
+    "results": results.get_results,
+    "matches": matches.get_matches_stats,
+    "economy": stats.get_matches_with_economy,
+}
+
+FORMATS = ("csv", "jsonl")
+
+RESOLVE_COLUMNS = ["kind", "name", "id", "entity_name"]
+
+# Options of the crawls defining their query, recorded in the checkpoint
+QUERY_OPTIONS = ["start_date", "end_date", "match_type", "map", "team", "player", "event", "stars",
+                 "require_all_teams", "require_all_players"]
+
+EXIT_INTERRUPTED = 3
+
+logger = logging.getLogger(__name__)
+
+
+def _duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class Progress:
+    """Reports the throughput of a crawl on `stream`, every `interval` seconds from
+    a background thread, and once more when the context exits.
+
+    Parameter
+    ---------
+    scheduler: RequestScheduler
+        Scheduler of the requests of the crawl, which counts the requests started.
+
+    total: Optional[int]
+        Number of rows expected, to estimate the remaining time.
+
+    interval: Optional[float]
+        Seconds between 2 reports. If 0, nothing is reported.
+
+    stream: Optional[file]
+        Where the reports are written, stderr if not specified.
+
+    """
+
+    def __init__(self, scheduler, total=None, interval=5.0, stream=None):
+        self.scheduler = scheduler
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.rows = 0
+
+        self._started_at = time.monotonic()
+        self._requests_before = scheduler.requests_started
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add_rows(self, rows):
+        self.rows += rows
+
+    def line(self):
+        elapsed = max(time.monotonic() - self._started_at, 1e-6)
+        requests = self.scheduler.requests_started - self._requests_before
+
+        line = f"{requests} requests ({requests / elapsed:.1f}/s), " \
+               f"{self.rows} rows ({self.rows / elapsed:.1f}/s), elapsed {_duration(elapsed)}"
+        if self.total is not None and self.rows > 0:
+            eta = max(self.total - self.rows, 0) / (self.rows / elapsed)
+            line += f", ETA {_duration(eta)}"
+        return line
+
+    def report(self):
+        print(self.line(), file=self.stream, flush=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.report()
+
+    def __enter__(self):
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.report()
+
+
+def load_checkpoint(path, command, query_options):
+    """Return the checkpoint of the crawl at `path`, `None` if there is none.
+
+    Raise `ValueError` if the checkpoint is of another command or query.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        checkpoint = json.load(f)
+
+    if checkpoint["command"] != command or checkpoint["query"] != query_options:
+        raise ValueError(f"Checkpoint {path} is of another crawl: {checkpoint['command']} "
+                         f"with {checkpoint['query']}")
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    """Write the checkpoint to `path`, replacing the file atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def write_frame(df, output, format="csv", append=False):
+    """Write `df` to the file `output`, or stdout if it is '-'.
+
+    If `append`, the rows are added at the end of the file, without a CSV header.
+    The file is synced to disk before returning, so that a checkpoint saved
+    afterwards never refers to rows that were lost.
+    """
+    if format == "csv":
+        text = df.to_csv(index=False, header=not append)
+    else:
+        text = df.to_json(orient="records", lines=True, date_format="iso") if len(df) > 0 else ""
+        if len(text) > 0 and not text.endswith("\n"):
+            text += "\n"
+
+    if output == "-":
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        return
+
+    with open(output, "a" if append else "w", newline="") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def output_size(output):
+    """Return the size in bytes of the file `output`, `None` for stdout."""
+    return None if output == "-" else os.path.getsize(output)
+
+
+def truncate_output(output, size):
+    """Drop what was written to `output` after it was `size` bytes long, i.e. the rows
+    of a chunk written by a crawl killed before its checkpoint was saved."""
+    if output == "-" or size is None or not os.path.exists(output):
+        return
+    if os.path.getsize(output) > size:
+        logger.warning(f"Dropping the rows of {output} written after the checkpoint")
+        with open(output, "r+b") as f:
+            f.truncate(size)
+
+
+def _ids_and_names(values):
+    """Split the values of a --team, --player or --event option into IDs and names."""
+    values = values or []
+    return [v for v in values if v.isdigit()], [v for v in values if not v.isdigit()]
+
+
+def build_query(args, index=None, config=None):
+    team_ids, team_names = _ids_and_names(args.team)
+    player_ids, player_names = _ids_and_names(args.player)
+    event_ids, event_names = _ids_and_names(args.event)
+
+    return HLTVQuery(
+        match_type=args.match_type,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        maps=args.map or [],
+        event_ids=event_ids,
+        event_names=event_names,
+        player_ids=player_ids,
+        player_names=player_names,
+        team_ids=team_ids,
+        team_names=team_names,
+        stars=args.stars,
+        require_all_teams=args.require_all_teams,
+        require_all_players=args.require_all_players,
+        index=index,
+        config=config,
+    )
+
+
+def run_crawl(args, config, scheduler, index=None):
+    """Run the crawl of `args.command` chunk by chunk, return the exit status."""
+    crawl = CRAWLS[args.command]
+    query_options = {option: getattr(args, option) for option in QUERY_OPTIONS}
+
+    checkpoint = load_checkpoint(args.checkpoint, args.command, query_options)
+    if checkpoint is None:
+        checkpoint = {"command": args.command, "query": query_options, "skip": args.skip,
+                      "rows": 0, "output_size": None, "complete": False}
+    elif checkpoint["complete"]:
+        logger.warning(f"Crawl of {args.checkpoint} is already complete")
+        return 0
+    else:
+        logger.info(f"Resuming from {args.checkpoint} at skip={checkpoint['skip']}")
+        truncate_output(args.output, checkpoint.get("output_size"))
+
+    # A resumed crawl appends to the output of the previous runs
+    append = checkpoint["rows"] > 0 and args.output != "-"
+
+    deadline = Deadline(args.max_time)
+    query = build_query(args, index=index, config=config)
+    remaining = None if args.limit is None else args.limit - checkpoint["rows"]
+
+    # A single cursor for all the chunks, so that each /results page is fetched once.
+    # `--workers` is the number of /results pages fetched at the same time for the
+    # results crawl, and the number of matches for the others
+    client = HLTVClient(config=config, deadline=deadline, priority="batch")
+    cursor = ResultsCursor(skip=checkpoint["skip"], query=query, client=client, rewindable=True,
+                           workers=args.workers if args.command == "results" else None)
+
+    # The match crawls add the teams and events of the matches to the index
+    crawl_options = {"index": index} if index is not None and args.command != "results" else {}
+
+    previous_handlers = {signum: signal.signal(signum, lambda *_: deadline.cancel())
+                         for signum in [signal.SIGINT, signal.SIGTERM]}
+    try:
+        with Progress(scheduler, total=remaining, interval=args.progress_interval) as progress:
+            while args.limit is None or checkpoint["rows"] < args.limit:
+                chunk_size = args.chunk_size if args.limit is None else \
+                    min(args.chunk_size, args.limit - checkpoint["rows"])
+
+                drift = None
+                try:
+                    df = crawl(limit=chunk_size, config=config, deadline=deadline,
+                               workers=args.workers, client=client, cursor=cursor, **crawl_options)
+                except HLTVParserDriftException as e:
+                    # The rows of the chunk before the drift are kept and checkpointed
+                    drift, df = e, e.partial
+
+                write_frame(df, args.output, args.format, append=append)
+                append = True
+                progress.add_rows(len(df))
+
+                stopped_at = df.attrs["stopped_at"]
+                checkpoint["skip"] = df.attrs["next_skip"]
+                checkpoint["rows"] += len(df)
+                checkpoint["output_size"] = output_size(args.output)
+                # A chunk that is not full without being stopped is the last one
+                checkpoint["complete"] = stopped_at is None and len(df) < chunk_size
+                if args.checkpoint is not None:
+                    save_checkpoint(args.checkpoint, checkpoint)
+                if "index" in crawl_options and index.path is not None:
+                    index.save()
+
+                if drift is not None:
+                    raise drift
+                if stopped_at is not None:
+                    logger.warning(f"Crawl stopped ({stopped_at['reason']}) at "
+                                   f"skip={stopped_at['skip']}, run the same command to resume")
+                    return EXIT_INTERRUPTED
+
+                if checkpoint["complete"]:
+                    break
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
+    if args.checkpoint is not None and not checkpoint["complete"]:
+        # Stopped by --limit
+        checkpoint["complete"] = True
+        save_checkpoint(args.checkpoint, checkpoint)
+    return 0
+
+
+def run_resolve(args, config, index):
+    """Write the IDs of the entities named `args.names`, return the exit status."""
+    rows = [{"kind": args.kind, "name": name, "id": entity_id,
+             "entity_name": index.name(args.kind, entity_id)}
+            for name in args.names
+            for entity_id in index.resolve(args.kind, name)]
+
+    write_frame(pd.DataFrame(rows, columns=RESOLVE_COLUMNS), args.output, args.format)
+    return 0
+
+
+def load_config(path=None):
+    """Return the configuration of the file `path`, overridden by the `HLTV_*` variables."""
+    base = ClientConfig.from_file(path) if path is not None else None
+    return ClientConfig.from_env(base=base)
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", help="JSON file of the client configuration, "
+                                         "overridden by the HLTV_* environment variables")
+    common.add_argument("--index", help="JSON file of the local index of teams, players and events")
+    common.add_argument("--rate", type=float, help="Maximum number of requests per second")
+    common.add_argument("--workers", type=int, default=None,
+                        help="Number of requests made at the same time")
+    common.add_argument("--cache-dir", help="Directory of the pages of matches and map statistics "
+                                            "reused across runs. Pages found in it are not "
+                                            "fetched again, pages fetched are added to it")
+    common.add_argument("--archive", help="Directory where every raw page fetched is archived. "
+                                          "Never read by the crawls, see --cache-dir")
+    common.add_argument("--output", "-o", default="-", help="Output file, stdout if not specified")
+    common.add_argument("--format", choices=FORMATS, default="csv", help="Format of the output")
+    common.add_argument("--verbose", "-v", action="store_true", help="Log the progress of the crawl")
+
+    crawl = argparse.ArgumentParser(add_help=False)
+    crawl.add_argument("--start-date", help="Date of the first result, e.g. 2021-09-01")
+    crawl.add_argument("--end-date", help="Date of the last result")
+    crawl.add_argument("--match-type", choices=["lan", "online"])
+    crawl.add_argument("--map", action="append", choices=sorted(HLTVQuery.MAPS),
+                       help="Map played, can be repeated")
+    crawl.add_argument("--team", action="append", help="Team ID or name, can be repeated")
+    crawl.add_argument("--player", action="append", help="Player ID or name, can be repeated")
+    crawl.add_argument("--event", action="append", help="Event ID or name, can be repeated")
+    crawl.add_argument("--stars", type=int, choices=HLTVQuery.STARS)
+    crawl.add_argument("--require-all-teams", action="store_true")
+    crawl.add_argument("--require-all-players", action="store_true")
+    crawl.add_argument("--skip", type=int, default=0, help="Number of results skipped")
+    crawl.add_argument("--limit", type=int,
+                       help="Number of rows to crawl, all if not specified. The maps of the "
+                            "last match may exceed it for the matches and economy crawls")
+    crawl.add_argument("--chunk-size", type=int, default=100,
+                       help="Number of rows written to the output between 2 checkpoints")
+    crawl.add_argument("--checkpoint", help="JSON file where the progress of the crawl is saved, "
+                                            "the crawl resumes from it if it exists")
+    crawl.add_argument("--max-time", type=float, help="Seconds after which the crawl is stopped")
+    crawl.add_argument("--progress-interval", type=float, default=5.0,
+                       help="Seconds between 2 reports of the throughput on stderr, 0 to disable")
+
+    parser = argparse.ArgumentParser(prog="hltv", description="Crawl historical data from HLTV")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("results", parents=[common, crawl], help="Results of the matches")
+    subparsers.add_parser("matches", parents=[common, crawl], help="Maps played by match")
+    subparsers.add_parser("economy", parents=[common, crawl],
+                          help="Maps played by match with the equipment values of each round")
+
+    resolve = subparsers.add_parser("resolve", parents=[common],
+                                    help="IDs of teams, players or events by name")
+    resolve.add_argument("kind", choices=KINDS)
+    resolve.add_argument("names", nargs="+")
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(message)s")
+
+    workers = args.workers or 1
+    scheduler = RequestScheduler(
+        rate=args.rate,
+        max_concurrency=workers,
+        classes={name: c._replace(max_concurrency=workers) for name, c in DEFAULT_CLASSES.items()},
+    )
+    archive = None
+    try:
+        config = load_config(args.config)
+        # The workers of the crawls are capped to `max_concurrency`
+        if args.workers is not None:
+            config = config.replace(max_concurrency=args.workers)
+        if args.cache_dir is not None:
+            config = config.replace(cache_dir=args.cache_dir)
+        if config.cache_dir and args.archive is not None and \
+                os.path.realpath(config.cache_dir) == os.path.realpath(args.archive):
+            raise ValueError("--archive and --cache-dir must be different directories")
+        set_default_scheduler(scheduler)
+        if args.archive is not None:
+            archive = PageArchive(args.archive, config=config)
+            set_default_archive(archive)
+
+        index = None
+        if args.index is not None or args.command == "resolve":
+            index = EntityIndex(path=args.index, client=HLTVClient(config=config))
+
+        if args.command == "resolve":
+            return run_resolve(args, config, index)
+        return run_crawl(args, config, scheduler, index=index)
+    except (HLTVApiException, OSError, ValueError) as e:
+        logger.error(f"{type(e).__name__}: {getattr(e, 'message', e)}")
+        return 1
+    finally:
+        set_default_scheduler(None)
+        set_default_archive(None)
+        if archive is not None:
+            archive.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,236 @@
+import json
+import os
+import threading
 import time
+from contextlib import contextmanager
 from urllib.parse import urljoin
 
 import botasaurus as bt
+import requests
 from botasaurus import Browser
 
-from hltv_api.common import HLTVConfig
-from hltv_api.exceptions import HLTVRequestException
+from hltv_api.archive import PageArchive, page_kind
+from hltv_api.common import get_config
+from hltv_api.exceptions import HLTVCrawlInterrupted, HLTVRequestException
+from hltv_api.sessions import HLTVSession, SessionPool, endpoint_class
 from urllib.parse import urljoin
 
 from botasaurus.request import request, Request
 
+# Shared by all clients created without a session pool, so that cookies
+# and rate budget are per process (and per target) rather than per client
+_default_session_pool = None
+_session_pools = {}
+_session_pools_lock = threading.Lock()
+
+# Archive of the clients created without an explicit one
+_default_archive = None
+
+# Page caches shared by the clients with the same `cache_dir`
+_page_caches = {}
+_page_caches_lock = threading.Lock()
+
+# Kinds of the pages which do not change once the match is played, and can be cached
+CACHED_PAGE_KINDS = frozenset(["match", "economy", "map_stats"])
+
+# Scheduler of the clients created without an explicit one
+_default_scheduler = None
+
+
+def get_default_session_pool(config=None):
+    """Return the session pool shared by the clients with the same base URL."""
+    if _default_session_pool is not None:
+        return _default_session_pool
+
+    config = get_config(config)
+    key = (config.base_url, config.min_request_interval)
+
+    with _session_pools_lock:
+        if key not in _session_pools:
+            _session_pools[key] = SessionPool([HLTVSession(min_interval=config.min_request_interval)])
+        return _session_pools[key]
+
+
+def get_page_cache(config=None):
+    """Return the page cache in `config.cache_dir`, shared by the clients of the process
+    with the same directory, or `None` if the cache is disabled."""
+    config = get_config(config)
+    if not config.cache_dir:
+        return None
+
+    key = os.path.realpath(config.cache_dir)
+    with _page_caches_lock:
+        if key not in _page_caches:
+            _page_caches[key] = PageArchive(config.cache_dir, config=config)
+        return _page_caches[key]
+
+
+def set_default_session_pool(session_pool):
+    """Use `session_pool` for every client created without an explicit pool."""
+    global _default_session_pool
+
+    _default_session_pool = session_pool
+
+
+def set_default_scheduler(scheduler):
+    """Schedule the requests of every client created without an explicit scheduler
+    with `scheduler`, so that all the clients of the process share its rate budget."""
+    global _default_scheduler
+
+    _default_scheduler = scheduler
+
+
+def set_default_archive(archive):
+    """Store the pages fetched by every client created without an explicit archive
+    in `archive`, e.g. to keep the raw pages of the crawls of `hltv_api.api`."""
+    global _default_archive
+
+    _default_archive = archive
+
 
 class HLTVClient:
-    def __init__(self, max_retry=3):
-        self.max_retry = max_retry
+    def __init__(self, max_retry=None, session_pool=None, config=None, deadline=None,
+                 archive=None, scheduler=None, priority="interactive"):
+        """
+        Parameter
+        ---------
+        max_retry: Optional[int]
+            Number of attempts for each request, `config.max_retry` if not specified.
+
+        session_pool: Optional[SessionPool]
+            Sessions used for the requests, shared by all clients if not specified.
+
+        config: Optional[ClientConfig]
+            Configuration of the client, built from `HLTVConfig` if not specified.
+
+        deadline: Optional[Deadline]
+            Deadline of the crawl using the client. Requests are not made once
+            it has passed, and their timeouts are shortened to end before it.
+
+        archive: Optional[PageArchive]
+            Archive where the HTML of every page fetched is stored,
+            the one given to `set_default_archive` if not specified.
+
+        scheduler: Optional[RequestScheduler]
+            Scheduler admitting the requests of the client, the one given to
+            `set_default_scheduler` if not specified. If there is none, requests
+            are made straight away.
+
+        priority: Optional[str]
+            Priority class of the requests of the client in the scheduler,
+            'interactive' by default. The crawls of `hltv_api.api` use 'batch'.
+
+        """
+        self.config = get_config(config)
+        self.max_retry = max_retry if max_retry is not None else self.config.max_retry
+        self.session_pool = session_pool
+        self.deadline = deadline
+        self.archive = archive if archive is not None else _default_archive
+        self.scheduler = scheduler if scheduler is not None else _default_scheduler
+        self.priority = priority
 
     @request(max_retry=3)
-    def _make_request(self, request: Request, url, params=None):
-        response = request.get(url, params=params)
+    def _make_request(self, request: Request, url, params=None, timeout=None):
+        response = request.get(url, params=params, timeout=timeout)
         response.raise_for_status()
-        return response.json()
+        return response.text
+
+    def get(self, url, params=None):
+        """GET `url` with the healthiest session of the pool and return the response.
+
+        Pages of `CACHED_PAGE_KINDS` are read from the page cache of `config.cache_dir`
+        if they are in it, and stored in it otherwise.
+        """
+        timeout = (self.config.connect_timeout, self.config.read_timeout)
+        if self.deadline is not None:
+            self.deadline.check()
+
+        cache = get_page_cache(self.config) \
+            if params is None and page_kind(url, self.config) in CACHED_PAGE_KINDS else None
+        if cache is not None:
+            text = cache.get(url)
+            if text is not None:
+                return _cached_response(url, text)
+
+        session_pool = self.session_pool or get_default_session_pool(self.config)
+        try:
+            with self._slot():
+                # The pool shortens the timeout of each attempt to end before the deadline
+                response = session_pool.get(url, params=params, max_retry=self.max_retry,
+                                            endpoint=endpoint_class(url, self.config),
+                                            deadline=self.deadline, timeout=timeout)
+        except HLTVRequestException:
+            # Most likely timed out because of the deadline
+            if self.deadline is not None:
+                self.deadline.check()
+            raise
+
+        self._archive(url, params, response.text)
+        if cache is not None:
+            cache.put(url, response.text)
+        return response
+
+    def _archive(self, url, params, text):
+        if self.archive is not None:
+            self.archive.put(requests.Request("GET", url, params=params).prepare().url, text)
+
+    @contextmanager
+    def _slot(self):
+        """Wait for the scheduler to admit a request, at most until the deadline."""
+        if self.scheduler is None:
+            yield
+            return
+
+        wait = None if self.deadline is None else self.deadline.remaining()
+        if not self.scheduler.acquire(self.priority, wait):
+            raise HLTVCrawlInterrupted(message="Crawl deadline exceeded", reason="deadline")
+        try:
+            yield
+        finally:
+            self.scheduler.release(self.priority)
+
+    def _search(self, uri_key, search_term):
+        url = self.config.url(uri_key)
+
+        params = {"term": search_term}
+
+        # Explicit pools are used for every endpoint, including search
+        if self.session_pool is not None:
+            return self.get(url, params=params).json()
+
+        # Made by botasaurus, with the same deadline, timeouts and scheduling as `get`
+        timeout = (self.config.connect_timeout, self.config.read_timeout)
+        if self.deadline is not None:
+            self.deadline.check()
+            timeout = self.deadline.clamp(timeout)
+
+        try:
+            with self._slot():
+                text = self._make_request(url, params=params, timeout=timeout)
+        except Exception:
+            # Most likely timed out because of the deadline
+            if self.deadline is not None:
+                self.deadline.check()
+            raise
+
+        self._archive(url, params, text)
+        return json.loads(text)
 
     def search_team(self, search_term):
-        url = urljoin(HLTVConfig["base_url"], HLTVConfig["search_teams_uri"])
-        return self._make_request(url, params={"term": search_term})
+        return self._search("search_teams_uri", search_term)
 
     def search_player(self, search_term):
-        url = urljoin(HLTVConfig["base_url"], HLTVConfig["search_players_uri"])
-        return self._make_request(url, params={"term": search_term})
+        return self._search("search_players_uri", search_term)
 
     def search_event(self, search_term):
-        url = urljoin(HLTVConfig["base_url"], HLTVConfig["search_events_uri"])
-        return self._make_request(url, params={"term": search_term})
+        return self._search("search_events_uri", search_term)
+
+
+def _cached_response(url, text):
+    """Return a successful response to `url` with the cached page `text`."""
+    response = requests.Response()
+    response._content = text.encode("utf-8")
+    response.encoding = "utf-8"
+    response.status_code = 200
+    response.url = url
+    return response
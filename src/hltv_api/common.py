@@ -1,3 +1,8 @@
+import json
+import os
+from dataclasses import dataclass, fields, replace
+from urllib.parse import urljoin
+
 HLTVConfig = {
     "base_url": "https://www.hltv.org",
 
@@ -8,6 +13,7 @@ HLTVConfig = {
     "stats_uri": "stats",
 
     "economy_uri": "stats/matches/economy/mapstatsid",
+    "map_stats_uri": "stats/matches/mapstatsid",
 
     "search_teams_uri": "searchTeam",
     "search_players_uri": "searchPlayer",
@@ -24,3 +30,124 @@ def basic_hltv_config(key, value):
         raise KeyError(f"{key} is not a valid field in HLTV config")
 
     HLTVConfig[key] = value
+
+
+@dataclass(frozen=True)
+class ClientConfig:
+    """Immutable configuration of an `HLTVClient` and of the crawls using it.
+
+    Unlike the global `HLTVConfig`, each client can have its own configuration,
+    so crawls against different targets (e.g. a local mirror and HLTV) can run
+    in the same process. Configurations are built from `HLTVConfig`, a JSON file
+    or environment variables, so a pool of workers can all start with the same one.
+
+    Attribute
+    ---------
+    base_url, *_uri, date_format:
+        Same as the fields of `HLTVConfig`.
+
+    max_retry: int
+        Number of attempts for each request.
+
+    connect_timeout, read_timeout: float
+        Timeouts in seconds to connect to HLTV and to receive each response.
+
+    max_concurrency: int
+        Maximum number of requests made at the same time by a crawl: the `workers`
+        of the crawls of `hltv_api.api` are capped to it, and it is the number of
+        events crawled at the same time by `crawl_events` if not specified.
+
+    min_request_interval: float
+        Minimum number of seconds between 2 requests of a session of the client.
+
+    cache_dir: str
+        Directory of the pages cached across runs. Pages of matches and map statistics,
+        which do not change once the match is played, are read from it instead of being
+        fetched again. Empty, the default, to disable the cache.
+
+    """
+    base_url: str = "https://www.hltv.org"
+
+    matches_uri: str = "matches"
+    results_uri: str = "results"
+    teams_uri: str = "teams"
+    players_uri: str = "players"
+    stats_uri: str = "stats"
+
+    economy_uri: str = "stats/matches/economy/mapstatsid"
+    map_stats_uri: str = "stats/matches/mapstatsid"
+
+    search_teams_uri: str = "searchTeam"
+    search_players_uri: str = "searchPlayer"
+    search_events_uri: str = "searchEvent"
+
+    date_format: str = "%Y-%m-%d"
+
+    max_retry: int = 3
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    max_concurrency: int = 4
+    min_request_interval: float = 0.0
+    cache_dir: str = ""
+
+    def __getitem__(self, key):
+        # Allows a configuration to be used wherever `HLTVConfig` is
+        if key not in _config_fields():
+            raise KeyError(f"{key} is not a valid field in HLTV config")
+        return getattr(self, key)
+
+    def url(self, uri_key, *path):
+        """Return the absolute URL of the URI `uri_key`, followed by `path`."""
+        uri = "/".join([self[uri_key], *(str(part) for part in path)])
+        return urljoin(self.base_url, uri)
+
+    def replace(self, **changes):
+        """Return a copy of the configuration with `changes` applied."""
+        return replace(self, **changes)
+
+    @classmethod
+    def from_dict(cls, values):
+        """Build a configuration from a dictionary, unknown keys are rejected."""
+        return cls(**_cast_config_values(values))
+
+    @classmethod
+    def from_file(cls, path):
+        """Build a configuration from a JSON file, missing keys take the default values."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_env(cls, prefix="HLTV_", base=None):
+        """Build a configuration from the environment variables, e.g. `HLTV_BASE_URL`.
+
+        Variables which are not set take their value from `base`, the current
+        `HLTVConfig` if not specified.
+        """
+        base = base or default_config()
+        changes = {key: os.environ[f"{prefix}{key.upper()}"]
+                   for key in _config_fields() if f"{prefix}{key.upper()}" in os.environ}
+        return base.replace(**_cast_config_values(changes))
+
+
+def _config_fields():
+    """Return the type of each field of `ClientConfig`, by name."""
+    return {f.name: f.type for f in fields(ClientConfig)}
+
+
+def _cast_config_values(values):
+    fields_types = _config_fields()
+    for key in values:
+        if key not in fields_types:
+            raise KeyError(f"{key} is not a valid field in HLTV config")
+
+    return {key: fields_types[key](value) for key, value in values.items()}
+
+
+def default_config():
+    """Return a `ClientConfig` with the current values of `HLTVConfig`."""
+    return ClientConfig.from_dict(HLTVConfig)
+
+
+def get_config(config=None):
+    """Return `config`, or the default configuration if it is `None`."""
+    return config if config is not None else default_config()
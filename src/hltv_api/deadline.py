@@ -0,0 +1,54 @@
+import threading
+import time
+
+from hltv_api.exceptions import HLTVCrawlInterrupted
+
+
+class Deadline:
+    """Overall time budget of a crawl, which can also be cancelled from another thread.
+
+    Crawls check their deadline before each request and stop cooperatively once it
+    has passed or has been cancelled, returning the data collected so far.
+
+    Parameter
+    ---------
+    seconds: Optional[float]
+        Time allowed for the crawl from now. If not specified, the crawl can only
+        be stopped with `cancel`.
+
+    """
+
+    def __init__(self, seconds=None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop the crawls using this deadline before their next request."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def remaining(self):
+        """Number of seconds left, `None` if there is no time limit."""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self):
+        return self.cancelled or self.remaining() == 0.0
+
+    def check(self):
+        """Raise `HLTVCrawlInterrupted` if the deadline has passed or has been cancelled."""
+        if self.cancelled:
+            raise HLTVCrawlInterrupted(message="Crawl cancelled", reason="cancelled")
+        if self.remaining() == 0.0:
+            raise HLTVCrawlInterrupted(message="Crawl deadline exceeded", reason="deadline")
+
+    def clamp(self, timeout):
+        """Shorten the `(connect, read)` timeout of a request so it ends before the deadline."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return tuple(min(t, remaining) for t in timeout)
@@ -0,0 +1,424 @@
+"""Coordinator/worker mode for spreading a crawl across several processes.
+
+One process (the coordinator) walks the /results pages and puts the match IDs
+into a shared work queue. Any number of workers, possibly on other machines,
+lease IDs from the queue, fetch and parse the pages and write the results back.
+
+Leases expire after `lease_seconds`, so work held by a dead worker is handed out
+again. An expired lease counts as a failed attempt, like a released one. A result is only accepted from the worker holding the current lease, hence
+every item is completed at most once.
+"""
+import abc
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from hltv_api.api.matches import get_match_stats_by_id
+from hltv_api.api.results import ResultsCursor
+from hltv_api.api.stats import get_economy_by_match_id
+from hltv_api.client import HLTVClient
+
+logger = logging.getLogger(__name__)
+
+# Functions run by the workers, by the kind of the work item
+TASKS = {
+    "match": get_match_stats_by_id,
+    "economy": get_economy_by_match_id,
+}
+
+Lease = namedtuple("Lease", ["kind", "item_id", "token"])
+
+
+class WorkQueue(abc.ABC):
+    """Interface of the queues shared by the coordinator and the workers."""
+
+    @abc.abstractmethod
+    def put(self, kind, item_ids):
+        """Add work items, ignoring the ones already queued. Return the number added."""
+
+    @abc.abstractmethod
+    def lease(self, lease_seconds=300):
+        """Return a `Lease` on a pending or expired item, `None` if there is none.
+
+        Items whose lease expired are counted as attempted once more, and are no longer
+        handed out once they reach `max_attempts`.
+        """
+
+    @abc.abstractmethod
+    def complete(self, lease, result):
+        """Store `result` for the leased item. Return `False` if the lease was lost."""
+
+    @abc.abstractmethod
+    def release(self, lease, error=None):
+        """Give up a lease so that the item can be picked up again."""
+
+    @abc.abstractmethod
+    def remaining(self):
+        """Number of items which have not been completed yet."""
+
+    @abc.abstractmethod
+    def results(self, kind=None):
+        """Iterate over `(kind, item_id, result)` of the completed items."""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Work queue stored in a SQLite database file.
+
+    Suitable for workers on the same machine or on a shared file system.
+
+    Parameter
+    ---------
+    path: str
+        Path to the database file. Created if it does not exist.
+
+    max_attempts: Optional[int]
+        Items released, or whose lease expired, this many times are no longer handed out.
+
+    """
+
+    def __init__(self, path, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS work (
+                kind TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                token TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                PRIMARY KEY (kind, item_id)
+            )
+        """)
+
+    def put(self, kind, item_ids):
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO work (kind, item_id) VALUES (?, ?)",
+                [(kind, str(item_id)) for item_id in item_ids]
+            )
+            return self._conn.total_changes - before
+
+    def lease(self, lease_seconds=300):
+        now = time.time()
+        token = uuid.uuid4().hex
+
+        with self._lock:
+            # Locks the database so that 2 workers cannot lease the same item
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # The holders of expired leases are assumed dead, as if they had released them
+                self._conn.execute("""
+                    UPDATE work SET status = 'pending', token = NULL, attempts = attempts + 1,
+                                    error = 'Lease expired'
+                    WHERE status = 'leased' AND lease_expires < ?
+                """, (now,))
+                row = self._conn.execute("""
+                    SELECT kind, item_id FROM work
+                    WHERE attempts < ? AND status = 'pending'
+                    LIMIT 1
+                """, (self.max_attempts,)).fetchone()
+
+                if row is not None:
+                    self._conn.execute("""
+                        UPDATE work SET status = 'leased', token = ?, lease_expires = ?
+                        WHERE kind = ? AND item_id = ?
+                    """, (token, now + lease_seconds, *row))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return None if row is None else Lease(row[0], row[1], token)
+
+    def complete(self, lease, result):
+        with self._lock:
+            cursor = self._conn.execute("""
+                UPDATE work SET status = 'done', result = ?, token = NULL
+                WHERE kind = ? AND item_id = ? AND token = ? AND status = 'leased'
+            """, (json.dumps(result), lease.kind, lease.item_id, lease.token))
+            return cursor.rowcount == 1
+
+    def release(self, lease, error=None):
+        with self._lock:
+            self._conn.execute("""
+                UPDATE work SET status = 'pending', token = NULL, attempts = attempts + 1,
+                                error = ?
+                WHERE kind = ? AND item_id = ? AND token = ? AND status = 'leased'
+            """, (None if error is None else str(error), lease.kind, lease.item_id, lease.token))
+
+    def remaining(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM work WHERE status != 'done' AND attempts < ?",
+                (self.max_attempts,)
+            ).fetchone()[0]
+
+    def results(self, kind=None):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, item_id, result FROM work "
+                "WHERE status = 'done' AND (? IS NULL OR kind = ?) ORDER BY rowid",
+                (kind, kind)
+            ).fetchall()
+        for row_kind, item_id, result in rows:
+            yield row_kind, item_id, json.loads(result)
+
+
+class RedisWorkQueue(WorkQueue):
+    """Work queue stored in a Redis (or Redis-compatible) server.
+
+    Parameter
+    ---------
+    redis: redis.Redis
+        Connected client. Any object with the redis-py interface works,
+        `redis` is not a dependency of this package.
+
+    name: Optional[str]
+        Prefix of the keys used by this queue, so several crawls can share a server.
+
+    max_attempts: Optional[int]
+        Items released, or whose lease expired, this many times are no longer handed out.
+
+    """
+
+    # Queues the items not seen yet, in a single step so that no item is seen but not queued
+    _PUT_SCRIPT = """
+        local added = 0
+        for _, item in ipairs(ARGV) do
+            if redis.call('SADD', KEYS[1], item) == 1 then
+                redis.call('RPUSH', KEYS[2], item)
+                added = added + 1
+            end
+        end
+        return added
+    """
+
+    # Moves expired leases back to pending, unless they reached the maximum number of
+    # attempts, then leases the first pending item
+    _LEASE_SCRIPT = """
+        local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+        for _, item in ipairs(expired) do
+            redis.call('ZREM', KEYS[2], item)
+            redis.call('HDEL', KEYS[3], item)
+            if redis.call('HINCRBY', KEYS[4], item, 1) < tonumber(ARGV[4]) then
+                redis.call('RPUSH', KEYS[1], item)
+            end
+        end
+        local item = redis.call('LPOP', KEYS[1])
+        if not item then
+            return false
+        end
+        redis.call('ZADD', KEYS[2], ARGV[2], item)
+        redis.call('HSET', KEYS[3], item, ARGV[3])
+        return item
+    """
+
+    # Only the holder of the current lease may complete or release an item
+    _COMPLETE_SCRIPT = """
+        if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+            return 0
+        end
+        redis.call('ZREM', KEYS[1], ARGV[1])
+        redis.call('HDEL', KEYS[2], ARGV[1])
+        redis.call('HSET', KEYS[3], ARGV[1], ARGV[3])
+        return 1
+    """
+
+    _RELEASE_SCRIPT = """
+        if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+            return 0
+        end
+        redis.call('ZREM', KEYS[1], ARGV[1])
+        redis.call('HDEL', KEYS[2], ARGV[1])
+        if redis.call('HINCRBY', KEYS[4], ARGV[1], 1) < tonumber(ARGV[3]) then
+            redis.call('RPUSH', KEYS[3], ARGV[1])
+        end
+        return 1
+    """
+
+    def __init__(self, redis, name="hltv", max_attempts=3):
+        self.redis = redis
+        self.max_attempts = max_attempts
+
+        self._keys = {key: f"{name}:{key}"
+                      for key in ["seen", "pending", "leases", "tokens", "results", "attempts"]}
+        self._put = redis.register_script(self._PUT_SCRIPT)
+        self._lease = redis.register_script(self._LEASE_SCRIPT)
+        self._complete = redis.register_script(self._COMPLETE_SCRIPT)
+        self._release = redis.register_script(self._RELEASE_SCRIPT)
+
+    @staticmethod
+    def _encode(kind, item_id):
+        return f"{kind}:{item_id}"
+
+    @staticmethod
+    def _decode(item):
+        if isinstance(item, bytes):
+            item = item.decode()
+        return item.split(":", 1)
+
+    def put(self, kind, item_ids):
+        items = [self._encode(kind, item_id) for item_id in item_ids]
+        if len(items) == 0:
+            return 0
+        return int(self._put(keys=[self._keys["seen"], self._keys["pending"]], args=items))
+
+    def lease(self, lease_seconds=300):
+        now = time.time()
+        token = uuid.uuid4().hex
+        item = self._lease(keys=[self._keys["pending"], self._keys["leases"], self._keys["tokens"],
+                                 self._keys["attempts"]],
+                           args=[now, now + lease_seconds, token, self.max_attempts])
+        if not item:
+            return None
+        return Lease(*self._decode(item), token)
+
+    def complete(self, lease, result):
+        return bool(self._complete(
+            keys=[self._keys["leases"], self._keys["tokens"], self._keys["results"]],
+            args=[self._encode(lease.kind, lease.item_id), lease.token, json.dumps(result)]
+        ))
+
+    def release(self, lease, error=None):
+        self._release(
+            keys=[self._keys["leases"], self._keys["tokens"], self._keys["pending"],
+                  self._keys["attempts"]],
+            args=[self._encode(lease.kind, lease.item_id), lease.token, self.max_attempts]
+        )
+
+    def remaining(self):
+        return self.redis.llen(self._keys["pending"]) + self.redis.zcard(self._keys["leases"])
+
+    def results(self, kind=None):
+        for item, result in self.redis.hscan_iter(self._keys["results"]):
+            item_kind, item_id = self._decode(item)
+            if kind is None or item_kind == kind:
+                yield item_kind, item_id, json.loads(result)
+
+
+def enqueue_matches(work_queue, kind="match", skip=0, limit=None, batch_size=100,
+                    query=None, config=None, **kwargs):
+    """Coordinator: crawl /results and put the match IDs found in `work_queue`.
+
+    Parameter
+    ---------
+    work_queue: WorkQueue
+        Queue shared with the workers.
+
+    kind: Optional[str]
+        Work to be done for each match, one of the keys of `TASKS`.
+
+    skip: Optional[int]
+        The number of results to be skipped from being returned.
+
+    limit: Optional[int]
+        The maximum number of matches to be queued. If NONE, queue all the matches found.
+
+    batch_size: Optional[int]
+        Number of match IDs put in the queue at once, so workers can start early.
+
+    query: Optional[HLTVQuery]
+        Queries and filters for the data.
+
+    config: Optional[ClientConfig]
+        Configuration of the client, built from `HLTVConfig` if not specified.
+
+    kwargs:
+        Arguments to `HLTVQuery` if `query` is `None`.
+
+    Return
+    ------
+    Number of new items added to the queue.
+
+    """
+    if kind not in TASKS:
+        raise KeyError(f"{kind} is not a valid task, expected one of {list(TASKS)}")
+
+    cursor = ResultsCursor(skip=skip, query=query, config=config, **kwargs)
+
+    queued = added = 0
+    while (limit is None) or (queued < limit):
+        batch_limit = batch_size if limit is None else min(batch_size, limit - queued)
+        matches_ids = cursor.next_ids(batch_limit)
+
+        if len(matches_ids) == 0:
+            break
+
+        added += work_queue.put(kind, matches_ids)
+        queued += len(matches_ids)
+
+    return added
+
+
+def run_worker(work_queue, lease_seconds=300, max_items=None, poll_interval=5, config=None):
+    """Worker: lease items from `work_queue`, fetch them and write the results back.
+
+    Returns once nothing is left to do, i.e. when every item is either completed
+    or failed too many times.
+
+    Parameter
+    ---------
+    work_queue: WorkQueue
+        Queue shared with the coordinator.
+
+    lease_seconds: Optional[int]
+        Time given to the worker to process an item before it is handed to another one.
+
+    max_items: Optional[int]
+        Stop after processing this many items. If NONE, run until the queue is drained.
+
+    poll_interval: Optional[float]
+        Seconds to wait when all remaining items are leased by other workers.
+
+    config: Optional[ClientConfig]
+        Configuration of the clients of the worker, built from `HLTVConfig` if not specified.
+
+    Return
+    ------
+    Number of items completed by this worker.
+
+    """
+    completed = processed = 0
+    client = HLTVClient(config=config, priority="batch")
+
+    while (max_items is None) or (processed < max_items):
+        lease = work_queue.lease(lease_seconds)
+
+        if lease is None:
+            if work_queue.remaining() == 0:
+                break
+            # Other workers hold the remaining items, wait in case their lease expires
+            time.sleep(poll_interval)
+            continue
+
+        processed += 1
+        try:
+            result = TASKS[lease.kind](lease.item_id, client=client)
+        except Exception as e:
+            logger.error(f"Error fetching {lease.kind} {lease.item_id}: {e}")
+            work_queue.release(lease, error=e)
+            continue
+
+        if not result:
+            # The task logged why the page could not be parsed and returned nothing
+            work_queue.release(lease, error=f"No result for {lease.kind} {lease.item_id}")
+            continue
+
+        if work_queue.complete(lease, result):
+            completed += 1
+        else:
+            logger.warning(f"Lease on {lease.kind} {lease.item_id} expired, result discarded")
+
+    return completed
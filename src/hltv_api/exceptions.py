@@ -18,3 +18,24 @@ class HLTVInvalidInputException(HLTVApiException):
     def __init__(self, message, expected):
         self.message = message
         self.expected = expected
+
+class HLTVCrawlInterrupted(HLTVApiException):
+    """Exception raised when a crawl runs past its deadline or is cancelled."""
+
+    def __init__(self, message, reason):
+        self.message = message
+        self.reason = reason
+
+class HLTVParserDriftException(HLTVApiException):
+    """Exception raised when too many pages fail to parse, most likely because
+    the layout of HLTV has changed."""
+
+    def __init__(self, message, kind, failure_rate, samples):
+        self.message = message
+        self.kind = kind
+        self.failure_rate = failure_rate
+        self.samples = samples
+        # Set by the crawls: the data collected before the drift, as they would have
+        # returned it, and where they stopped, as in their `attrs["stopped_at"]`
+        self.partial = None
+        self.stopped_at = None
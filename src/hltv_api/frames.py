@@ -0,0 +1,121 @@
+"""Assembly of the DataFrames returned by the crawls.
+
+Rows are collected column by column and converted once at the end, with compact
+dtypes: categories for the names of the teams, events, maps and players, nullable
+integers for the IDs, scores and equipment values, and datetime64 for the dates.
+"""
+import re
+
+import pandas as pd
+
+from hltv_api.common import get_config
+
+CATEGORY_COLUMNS = {"team_1", "team_2", "event", "map", "player", "action"}
+DATE_COLUMNS = {"date"}
+FLOAT_COLUMNS = {"kast", "adr", "rating"}
+BOOLEAN_COLUMNS = {"played"}
+INT_COLUMNS = {"score_1", "score_2", "stars", "team_1_ct", "team_1_t", "team_2_ct", "team_2_t",
+               "starting_ct", "team", "kills", "headshots", "assists", "flash_assists", "deaths",
+               "kd_diff", "fk_diff", "step"}
+
+# IDs and the equipment values and winner of each round
+_INT_COLUMN_REGEX = re.compile(r"_id$|^\d+_(team_[12]_value|winner)$")
+
+
+def column_dtype(column):
+    """Return the dtype of `column` in the frames built by `FrameBuilder`."""
+    if column in CATEGORY_COLUMNS:
+        return "category"
+    if column in DATE_COLUMNS:
+        return "datetime64[ns]"
+    if column in FLOAT_COLUMNS:
+        return "Float64"
+    if column in BOOLEAN_COLUMNS:
+        return "boolean"
+    if column in INT_COLUMNS or _INT_COLUMN_REGEX.search(column):
+        return "Int64"
+    return "object"
+
+
+def _number(value, cast):
+    return None if value is None or pd.isna(value) else cast(value)
+
+
+class FrameBuilder:
+    """Collects rows in a buffer per column and builds the DataFrame once.
+
+    Parameter
+    ---------
+    columns: List[str]
+        Columns of the DataFrame. Fields of the rows not in `columns` are ignored.
+
+    config: Optional[ClientConfig]
+        Configuration giving the format of the dates of the rows.
+
+    """
+
+    def __init__(self, columns, config=None):
+        self.columns = list(columns)
+        self.config = get_config(config)
+
+        self._buffers = {column: [] for column in self.columns}
+        self._length = 0
+        # Types of the records of a row -> (record, position) of the value of each column
+        self._getters = {}
+
+    def __len__(self):
+        return self._length
+
+    def append(self, rows):
+        """Add the rows, dictionaries of column to value, at the end of the frame."""
+        for row in rows:
+            for column, buffer in self._buffers.items():
+                buffer.append(row.get(column))
+            self._length += 1
+
+    def append_records(self, rows):
+        """Add rows of records of `hltv_api.models` at the end of the frame.
+
+        Each row is a record, or a tuple of records joined into one row, e.g. a
+        `MatchDetail` and one of its `MapResult`. A column takes its value from the
+        first record of the row which has it, `None` if none has.
+        """
+        for row in rows:
+            if not isinstance(row, tuple):
+                row = (row,)
+
+            getters = self._record_getters(tuple(type(record) for record in row))
+            values = [record.to_row() for record in row]
+            for buffer, (index, position) in zip(self._buffers.values(), getters):
+                buffer.append(None if index is None else values[index][position])
+            self._length += 1
+
+    def _record_getters(self, types):
+        if types not in self._getters:
+            getters = []
+            for column in self.columns:
+                owner = next((i for i, t in enumerate(types) if column in t.COLUMNS), None)
+                getters.append((None, None) if owner is None else
+                               (owner, types[owner].COLUMNS.index(column)))
+            self._getters[types] = getters
+        return self._getters[types]
+
+    def _convert(self, column, values):
+        dtype = column_dtype(column)
+
+        if dtype == "category":
+            return pd.Categorical(values)
+        if dtype == "datetime64[ns]":
+            return pd.to_datetime(pd.Series(values, dtype="object"), format=self.config.date_format)
+        if dtype == "Int64":
+            return pd.array([_number(value, int) for value in values], dtype="Int64")
+        if dtype == "Float64":
+            return pd.array([_number(value, float) for value in values], dtype="Float64")
+        if dtype == "boolean":
+            return pd.array(values, dtype="boolean")
+        return pd.Series(values, dtype="object")
+
+    def to_frame(self):
+        """Return the DataFrame of the rows added so far."""
+        data = {column: self._convert(column, values) for column, values in self._buffers.items()}
+        return pd.DataFrame(data, columns=self.columns)
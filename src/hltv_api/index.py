@@ -0,0 +1,177 @@
+"""Local index of the teams, players and events of HLTV.
+
+Names are resolved to IDs locally, with exact, prefix and fuzzy lookups. The HLTV
+search endpoints are only hit for names which are not in the index, and the
+entities found are added to the index. The index is persisted to a JSON file.
+
+`EntityIndex` has the same `search_team`, `search_player` and `search_event` methods
+as `HLTVClient`, so it can be given to `HLTVQuery` to resolve names.
+"""
+import difflib
+import json
+import os
+import threading
+from bisect import bisect_left
+
+from hltv_api.client import HLTVClient
+
+KINDS = ("team", "player", "event")
+
+
+def _normalize(name):
+    return " ".join(name.casefold().split())
+
+
+def _search_result_name(result):
+    # Players are returned with their nickname
+    return result.get("name") or result.get("nickName")
+
+
+class EntityIndex:
+    """Local index of entity names to IDs.
+
+    Parameter
+    ---------
+    path: Optional[str]
+        JSON file where the index is persisted. If not specified, the index only
+        lives in memory.
+
+    client: Optional[HLTVClient]
+        Client used for the search requests when a name is not in the index.
+
+    """
+
+    def __init__(self, path=None, client=None):
+        self.path = path
+        self.client = client
+
+        self._lock = threading.RLock()
+        # kind -> {id: name}
+        self._names = {kind: {} for kind in KINDS}
+        # kind -> sorted list of (normalized name, id), rebuilt lazily
+        self._sorted = {kind: None for kind in KINDS}
+        # kind -> {normalized name: [id]} for the fuzzy lookups, rebuilt lazily
+        self._ids_by_name = {kind: None for kind in KINDS}
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return sum(len(names) for names in self._names.values())
+
+    def load(self):
+        with open(self.path) as f:
+            data = json.load(f)
+
+        with self._lock:
+            for kind in KINDS:
+                for entity_id, name in data.get(kind, {}).items():
+                    self.add(kind, entity_id, name)
+
+    def save(self):
+        """Write the index to `path`, replacing the file atomically."""
+        with self._lock:
+            data = {kind: {str(entity_id): name for entity_id, name in names.items()}
+                    for kind, names in self._names.items()}
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, kind, entity_id, name):
+        if kind not in KINDS:
+            raise KeyError(f"{kind} is not a valid kind, expected one of {KINDS}")
+
+        with self._lock:
+            if self._names[kind].get(int(entity_id)) == name:
+                return
+            self._names[kind][int(entity_id)] = name
+            self._sorted[kind] = self._ids_by_name[kind] = None
+
+    def ingest_match(self, match):
+        """Add the teams and the event of a match returned by `parse_match_page` to the index."""
+        self.add("team", match["team_1_id"], match["team_1"])
+        self.add("team", match["team_2_id"], match["team_2"])
+        if match.get("event"):
+            self.add("event", match["event_id"], match["event"])
+
+    def name(self, kind, entity_id):
+        return self._names[kind].get(int(entity_id))
+
+    def _sorted_names(self, kind):
+        with self._lock:
+            if self._sorted[kind] is None:
+                self._sorted[kind] = sorted((_normalize(name), entity_id)
+                                            for entity_id, name in self._names[kind].items())
+            return self._sorted[kind]
+
+    def exact(self, kind, name):
+        """Return the IDs of the entities named exactly `name`, ignoring the case."""
+        return [entity_id for _, entity_id in self.prefix(kind, name, exact=True)]
+
+    def prefix(self, kind, prefix, limit=None, exact=False):
+        """Return `(name, id)` of the entities whose name starts with `prefix`, by name."""
+        key = _normalize(prefix)
+        names = self._sorted_names(kind)
+
+        matches = []
+        for i in range(bisect_left(names, (key,)), len(names)):
+            normalized, entity_id = names[i]
+            if not normalized.startswith(key) or (exact and normalized != key):
+                break
+            matches.append((self._names[kind][entity_id], entity_id))
+            if limit is not None and len(matches) == limit:
+                break
+
+        return matches
+
+    def _names_ids(self, kind):
+        with self._lock:
+            if self._ids_by_name[kind] is None:
+                ids_by_name = {}
+                for normalized, entity_id in self._sorted_names(kind):
+                    ids_by_name.setdefault(normalized, []).append(entity_id)
+                self._ids_by_name[kind] = ids_by_name
+            return self._ids_by_name[kind]
+
+    def fuzzy(self, kind, name, limit=5, cutoff=0.8):
+        """Return `(name, id)` of the entities whose name is close to `name`, closest first."""
+        ids_by_name = self._names_ids(kind)
+        close_names = difflib.get_close_matches(_normalize(name), ids_by_name.keys(),
+                                                n=limit, cutoff=cutoff)
+        return [(self._names[kind][entity_id], entity_id)
+                for close_name in close_names
+                for entity_id in ids_by_name[close_name]]
+
+    def resolve(self, kind, name):
+        """Return the IDs for `name`.
+
+        If an entity is named exactly `name`, only its ID is returned. Otherwise,
+        HLTV is searched, the entities found are added to the index, and the exact
+        matches among them are returned, or all of them if there is none.
+        """
+        ids = self.exact(kind, name)
+        if len(ids) > 0:
+            return ids
+
+        client = self.client or HLTVClient()
+        results = getattr(client, f"search_{kind}")(name)
+        for result in results:
+            if _search_result_name(result):
+                self.add(kind, result["id"], _search_result_name(result))
+
+        if self.path is not None and len(results) > 0:
+            self.save()
+
+        ids = self.exact(kind, name)
+        return ids if len(ids) > 0 else [result["id"] for result in results]
+
+    def search_team(self, search_term):
+        return [{"id": team_id} for team_id in self.resolve("team", search_term)]
+
+    def search_player(self, search_term):
+        return [{"id": player_id} for player_id in self.resolve("player", search_term)]
+
+    def search_event(self, search_term):
+        return [{"id": event_id} for event_id in self.resolve("event", search_term)]
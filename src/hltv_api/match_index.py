@@ -0,0 +1,212 @@
+"""Local index of the maps played, for date range and head-to-head queries.
+
+Maps already collected (by `get_matches_stats` or `parse_match_page`) are kept
+sorted by date, with secondary indexes on the pair of teams, each team, the event
+and the map. Queries find the range of dates with a binary search in the most
+selective index, so they do not need any request to HLTV.
+
+The index is updated incrementally with `ingest_match` and `ingest_frame`, and can
+be persisted to a JSON file.
+"""
+import json
+import math
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+import pandas as pd
+
+from hltv_api.common import get_config
+
+MATCH_INDEX_COLUMNS = ["match_id", "date", "event_id", "team_1", "team_1_id", "team_2", "team_2_id",
+                       "map", "map_stats_id", "team_1_ct", "team_1_t", "team_2_ct", "team_2_t",
+                       "starting_ct"]
+
+_INT_COLUMNS = ["match_id", "event_id", "team_1_id", "team_2_id", "map_stats_id",
+                "team_1_ct", "team_1_t", "team_2_ct", "team_2_t", "starting_ct"]
+
+
+def _int(value):
+    return None if value is None or pd.isna(value) else int(value)
+
+
+class MatchIndex:
+    """In-memory index of maps played, sorted by date.
+
+    Parameter
+    ---------
+    path: Optional[str]
+        JSON file where the index is persisted. If not specified, the index only
+        lives in memory.
+
+    config: Optional[ClientConfig]
+        Configuration giving the format of the dates of the records.
+
+    """
+
+    def __init__(self, path=None, config=None):
+        self.path = path
+        self.config = get_config(config)
+
+        self._lock = threading.RLock()
+        # (date, match_id, map) -> row
+        self._rows = {}
+        # Sorted lists of keys
+        self._by_date = []
+        self._by_pair = {}
+        self._by_team = {}
+        self._by_event = {}
+        self._by_map = {}
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def load(self):
+        with open(self.path) as f:
+            rows = json.load(f)
+
+        self._add(rows)
+
+    def save(self):
+        """Write the index to `path`, replacing the file atomically."""
+        with self._lock:
+            rows = [self._rows[key] for key in self._by_date]
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(rows, f)
+        os.replace(tmp_path, self.path)
+
+    def _iso_date(self, value):
+        """Return `value` as 'YYYY-MM-DD', which sorts in the order of the dates."""
+        if isinstance(value, (date, datetime)):
+            return value.strftime("%Y-%m-%d")
+        return datetime.strptime(value, self.config.date_format).strftime("%Y-%m-%d")
+
+    def _row(self, row):
+        """Return the key and the row to be indexed for a record."""
+        row = {column: row.get(column) for column in MATCH_INDEX_COLUMNS}
+        for column in _INT_COLUMNS:
+            row[column] = _int(row[column])
+        if isinstance(row["date"], (date, datetime)):
+            row["date"] = row["date"].strftime(self.config.date_format)
+
+        return (self._iso_date(row["date"]), row["match_id"], row["map"]), row
+
+    def _add(self, rows):
+        """Add `rows`, sorting their keys once and merging them into each index."""
+        rows = [self._row(row) for row in rows]
+
+        with self._lock:
+            new = {}
+            for key, row in rows:
+                if key not in self._rows:
+                    new[key] = row
+                self._rows[key] = row
+
+            new_keys = sorted(new)
+
+            # Keys to be added to each secondary index, in order
+            added = {}
+            for key in new_keys:
+                row = new[key]
+                entries = [(self._by_pair, self._pair(row["team_1_id"], row["team_2_id"])),
+                           (self._by_team, row["team_1_id"]), (self._by_team, row["team_2_id"]),
+                           (self._by_map, row["map"])]
+                if row["event_id"] is not None:
+                    entries.append((self._by_event, row["event_id"]))
+                for index, value in entries:
+                    added.setdefault((id(index), value), (index, value, []))[2].append(key)
+
+            # Sorting 2 sorted runs merges them in linear time
+            self._by_date.extend(new_keys)
+            self._by_date.sort()
+            for index, value, keys in added.values():
+                keys_of_value = index.setdefault(value, [])
+                keys_of_value.extend(keys)
+                keys_of_value.sort()
+
+    @staticmethod
+    def _pair(team_id, opponent_id):
+        return tuple(sorted([int(team_id), int(opponent_id)]))
+
+    def ingest_match(self, match):
+        """Add the maps of a match returned by `parse_match_page`."""
+        details = {k: v for k, v in match.items() if k != "maps"}
+        self._add({**map_played, **details} for map_played in match["maps"])
+
+    def ingest_frame(self, df):
+        """Add the rows of a DataFrame with one row per map, e.g. of `get_matches_stats`.
+
+        Raise `ValueError` if the columns `event_id` or `map_stats_id` are missing,
+        as the rows could not be found by event.
+        """
+        missing = [column for column in ["event_id", "map_stats_id"] if column not in df.columns]
+        if len(missing) > 0:
+            raise ValueError(f"Cannot index a frame without the columns {missing}")
+        self._add(df.to_dict("records"))
+
+    def find(self, start_date=None, end_date=None, team_id=None, opponent_id=None, event_id=None,
+             map=None):
+        """Return the maps played between `start_date` and `end_date` included, by date.
+
+        Parameter
+        ---------
+        start_date, end_date: Optional[Union[str, datetime.date]]
+            Bounds of the dates, in the format of the configuration if strings.
+            If not specified, the range is not bounded.
+
+        team_id: Optional[int]
+            Only return the maps played by this team.
+
+        opponent_id: Optional[int]
+            Only return the maps played against this team, requires `team_id`.
+
+        event_id: Optional[int]
+            Only return the maps played at this event.
+
+        map: Optional[str]
+            Only return the maps with this name, e.g. 'inferno'.
+
+        Return
+        ------
+        pandas.DataFrame with the columns in `MATCH_INDEX_COLUMNS`.
+
+        """
+        if opponent_id is not None and team_id is None:
+            raise ValueError("opponent_id requires team_id")
+
+        with self._lock:
+            # The most selective index available
+            if opponent_id is not None:
+                keys = self._by_pair.get(self._pair(team_id, opponent_id), [])
+            elif team_id is not None:
+                keys = self._by_team.get(int(team_id), [])
+            elif event_id is not None:
+                keys = self._by_event.get(int(event_id), [])
+            elif map is not None:
+                keys = self._by_map.get(map, [])
+            else:
+                keys = self._by_date
+
+            start = 0 if start_date is None else bisect_left(keys, (self._iso_date(start_date),))
+            end = len(keys) if end_date is None else \
+                bisect_right(keys, (self._iso_date(end_date), math.inf))
+
+            rows = [self._rows[key] for key in keys[start:end]]
+
+        if event_id is not None:
+            rows = [row for row in rows if row["event_id"] == int(event_id)]
+        if map is not None:
+            rows = [row for row in rows if row["map"] == map]
+
+        return pd.DataFrame(rows, columns=MATCH_INDEX_COLUMNS)
+
+    def head_to_head(self, team_id, opponent_id, start_date=None, end_date=None, map=None):
+        """Return the maps played between 2 teams, by date. See `find`."""
+        return self.find(start_date=start_date, end_date=end_date, team_id=team_id,
+                         opponent_id=opponent_id, map=map)
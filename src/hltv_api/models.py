@@ -0,0 +1,222 @@
+"""Typed records for the data parsed from HLTV pages.
+
+The parsers in `hltv_api.pages` return dictionaries, with IDs as strings taken
+from the URLs. These records hold the same data with a fixed set of fields,
+`__slots__` instead of a `__dict__` per record, and every ID as an `int`.
+
+The crawls convert the parsed pages to records and build their frames from them
+with `FrameBuilder.append_records`. Lists of records are converted the same way to
+a `pandas.DataFrame` with `records_to_frame`, or to a `pyarrow.Table` with
+`records_to_arrow`.
+"""
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Optional, Tuple
+
+from hltv_api.frames import FrameBuilder
+
+ROUNDS = 30
+
+
+class _Record:
+    """Base class of the records, providing pickling and tabular conversion."""
+    __slots__ = ()
+
+    # Columns of the record once converted to a table
+    COLUMNS = ()
+
+    def __getstate__(self):
+        return tuple(getattr(self, f.name) for f in fields(self))
+
+    def __setstate__(self, state):
+        # Frozen dataclasses do not allow `setattr`
+        for f, value in zip(fields(self), state):
+            object.__setattr__(self, f.name, value)
+
+    def to_row(self):
+        """Return the values of `COLUMNS` as a tuple."""
+        return attrgetter(*self.COLUMNS)(self)
+
+    def to_dict(self):
+        return dict(zip(self.COLUMNS, self.to_row()))
+
+
+def _int(value):
+    return None if value is None else int(value)
+
+
+@dataclass(frozen=True)
+class ResultRow(_Record):
+    """A match listed on a /results page, see `parse_result_con_div`."""
+    __slots__ = ("match_id", "date", "event", "team_1", "team_2", "map", "score_1", "score_2",
+                 "stars")
+
+    match_id: int
+    date: str
+    event: str
+    team_1: str
+    team_2: str
+    map: str
+    score_1: int
+    score_2: int
+    stars: int
+
+    COLUMNS = __slots__
+
+    @classmethod
+    def from_dict(cls, result):
+        return cls(
+            match_id=int(result["match_id"]),
+            date=result["date"],
+            event=result["event"],
+            team_1=result["team_1"],
+            team_2=result["team_2"],
+            map=result["map"],
+            score_1=int(result["score_1"]),
+            score_2=int(result["score_2"]),
+            stars=int(result["stars"]),
+        )
+
+
+@dataclass(frozen=True)
+class MapResult(_Record):
+    """Score of a map of a match, see `parse_mapholder_div`."""
+    __slots__ = ("match_id", "map", "map_stats_id", "team_1_ct", "team_1_t", "team_2_ct",
+                 "team_2_t", "starting_ct")
+
+    match_id: int
+    map: str
+    map_stats_id: int
+    team_1_ct: int
+    team_1_t: int
+    team_2_ct: int
+    team_2_t: int
+    starting_ct: int
+
+    COLUMNS = __slots__
+
+    @classmethod
+    def from_dict(cls, map_played, match_id):
+        return cls(
+            match_id=int(match_id),
+            map=map_played["map"],
+            map_stats_id=int(map_played["map_stats_id"]),
+            team_1_ct=int(map_played["team_1_ct"]),
+            team_1_t=int(map_played["team_1_t"]),
+            team_2_ct=int(map_played["team_2_ct"]),
+            team_2_t=int(map_played["team_2_t"]),
+            starting_ct=int(map_played["starting_ct"]),
+        )
+
+
+@dataclass(frozen=True)
+class MatchDetail(_Record):
+    """Overview of a match, see `parse_match_page`.
+
+    The maps are not part of the columns, convert them with `records_to_frame(detail.maps)`.
+    """
+    __slots__ = ("match_id", "date", "event_id", "team_1", "team_1_id", "team_2", "team_2_id",
+                 "maps")
+
+    match_id: int
+    date: str
+    event_id: int
+    team_1: str
+    team_1_id: int
+    team_2: str
+    team_2_id: int
+    maps: Tuple[MapResult, ...]
+
+    COLUMNS = __slots__[:-1]
+
+    @classmethod
+    def from_dict(cls, match):
+        return cls(
+            match_id=int(match["match_id"]),
+            date=match["date"],
+            event_id=int(match["event_id"]),
+            team_1=match["team_1"],
+            team_1_id=int(match["team_1_id"]),
+            team_2=match["team_2"],
+            team_2_id=int(match["team_2_id"]),
+            maps=tuple(MapResult.from_dict(map_played, match["match_id"])
+                       for map_played in match["maps"]),
+        )
+
+
+@dataclass(frozen=True)
+class MapEconomy(_Record):
+    """Equipment value of both teams and winner of each round of a map,
+    see `parse_map_stat_economy_page`.
+
+    Rounds which have not been played are `None`.
+    """
+    __slots__ = ("map_stats_id", "team_1_values", "team_2_values", "winners")
+
+    map_stats_id: int
+    team_1_values: Tuple[Optional[int], ...]
+    team_2_values: Tuple[Optional[int], ...]
+    winners: Tuple[Optional[int], ...]
+
+    # Same columns as `parse_map_stat_economy_page`
+    COLUMNS = ("map_stats_id",) + tuple(col
+                                        for i in range(1, ROUNDS + 1)
+                                        for col in [f"{i}_team_1_value", f"{i}_team_2_value",
+                                                    f"{i}_winner"])
+
+    @classmethod
+    def from_dict(cls, economy, map_stats_id):
+        return cls(
+            map_stats_id=int(map_stats_id),
+            team_1_values=tuple(_int(economy[f"{i}_team_1_value"]) for i in range(1, ROUNDS + 1)),
+            team_2_values=tuple(_int(economy[f"{i}_team_2_value"]) for i in range(1, ROUNDS + 1)),
+            winners=tuple(_int(economy[f"{i}_winner"]) for i in range(1, ROUNDS + 1)),
+        )
+
+    def to_row(self):
+        rounds = zip(self.team_1_values, self.team_2_values, self.winners)
+        return (self.map_stats_id, *(value for round_values in rounds for value in round_values))
+
+
+def match_rows(match):
+    """Return the rows of the frames of the crawls for a match, one per map played.
+
+    `match` is a dictionary returned by `parse_match_page`. Each row is a tuple
+    `(MatchDetail, MapResult)`, or `(MatchDetail, MapResult, MapEconomy)` if the maps
+    also have the fields of `parse_map_stat_economy_page`.
+    """
+    detail = MatchDetail.from_dict(match)
+    rows = []
+    for map_result, map_played in zip(detail.maps, match["maps"]):
+        if "1_team_1_value" in map_played:
+            rows.append((detail, map_result,
+                         MapEconomy.from_dict(map_played, map_result.map_stats_id)))
+        else:
+            rows.append((detail, map_result))
+    return rows
+
+
+def records_to_frame(records, config=None):
+    """Convert a list of records of the same type to a `pandas.DataFrame`, with
+    the dtypes of the frames of the crawls (see `FrameBuilder`)."""
+    records = list(records)
+    if len(records) == 0:
+        return FrameBuilder([]).to_frame()
+
+    frame = FrameBuilder(type(records[0]).COLUMNS, config=config)
+    frame.append_records(records)
+    return frame.to_frame()
+
+
+def records_to_arrow(records, config=None):
+    """Convert a list of records of the same type to a `pyarrow.Table`.
+
+    Requires `pyarrow`, which is not a dependency of this package.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("pyarrow is required to convert records to Arrow, "
+                          "install it with `pip install pyarrow`") from e
+
+    return pa.Table.from_pandas(records_to_frame(records, config=config), preserve_index=False)
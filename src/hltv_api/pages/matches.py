@@ -1,13 +1,21 @@
 import logging
+import re
 
 from dateutil import parser
 
-from hltv_api.common import HLTVConfig
+from hltv_api.common import get_config
 
 logger = logging.getLogger(__name__)
 
+VETOES_COLUMNS = ["match_id", "step", "team", "action", "map", "played"]
 
-def parse_match_page(tree):
+# e.g. '3. Gambit picked Inferno', team names can contain spaces
+_VETO_REGEX = re.compile(r"^(\d+)\. (.+) (removed|picked) (\S+)$")
+# e.g. '7. Ancient was left over'
+_LEFT_OVER_REGEX = re.compile(r"^(\d+)\. (\S+) was left over$")
+
+
+def parse_match_page(tree, config=None):
     """Parses overview page for a match.
     Usually, endpoint is of the form:
         /matches/{id}/{team-1-vs-team-2-event-name}
@@ -17,6 +25,9 @@ def parse_match_page(tree):
     tree: lxml.html.HtmlElement
         HTML of the webpage
 
+    config: Optional[ClientConfig]
+        Configuration giving the format of the dates returned.
+
     Return
     ------
     Dictionary containing all extractable information.
@@ -25,11 +36,12 @@ def parse_match_page(tree):
     # Date
     date_obj = tree.find_class("date")[0].text_content()
     date_str = parser.parse(date_obj)
-    date = date_str.strftime(HLTVConfig["date_format"])
+    date = date_str.strftime(get_config(config).date_format)
 
     # Event
-    event_uri = tree.find_class("event")[0].xpath(".//a")[0].get("href")
-    event_id = event_uri.split("/")[2]
+    event_link = tree.find_class("event")[0].xpath(".//a")[0]
+    event = event_link.text_content().strip()
+    event_id = event_link.get("href").split("/")[2]
 
     # Match URL
     match_url = tree.xpath(".//head/link[contains(@rel, 'canonical')]")[0].get("href")
@@ -50,18 +62,75 @@ def parse_match_page(tree):
     maps = [parse_mapholder_div(map_pick)
             for map_pick in map_picks if len(map_pick.find_class("results-stats")) > 0]
 
+    # Picks and bans, in the same pass over the page
+    vetoes = parse_veto_box(tree, team_one, team_two,
+                            maps_played=[map_played["map"] for map_played in maps])
+
     return {
         "date": date,
         "match_id": match_id,
+        "event": event,
         "event_id": event_id,
         "team_1": team_one,
         "team_1_id": team_one_id,
         "team_2": team_two,
         "team_2_id": team_two_id,
-        "maps": maps
+        "maps": maps,
+        "vetoes": vetoes
     }
 
 
+def parse_veto_box(tree, team_1, team_2, maps_played=()):
+    """Parses the picks and bans listed in the 'veto-box' classes of a match page.
+
+    Parameter
+    ---------
+    tree: lxml.html.HtmlElement
+        HTML of the match page.
+
+    team_1, team_2: str
+        Names of the teams, as on the page.
+
+    maps_played: Optional[List[str]]
+        Names of the maps played, in lower case.
+
+    Return
+    ------
+    List of dictionary objects, one per step of the veto, with the fields
+    `step`, `team` (1 or 2, `None` for the map left over), `action` ('ban', 'pick'
+    or 'decider'), `map` and `played`. Empty if the page has no veto.
+
+    """
+    teams = {team_1.strip(): 1, team_2.strip(): 2}
+
+    vetoes = []
+    for veto_box in tree.find_class("veto-box"):
+        for line in veto_box.xpath(".//div[contains(@class, 'padding')]/div"):
+            text = " ".join(line.text_content().split())
+
+            veto = _VETO_REGEX.match(text)
+            left_over = _LEFT_OVER_REGEX.match(text)
+            if veto is not None:
+                step, team, action, map_name = veto.groups()
+                team = teams.get(team)
+                action = "ban" if action == "removed" else "pick"
+            elif left_over is not None:
+                step, map_name = left_over.groups()
+                team, action = None, "decider"
+            else:
+                continue
+
+            vetoes.append({
+                "step": int(step),
+                "team": team,
+                "action": action,
+                "map": map_name.lower(),
+                "played": map_name.lower() in maps_played,
+            })
+
+    return vetoes
+
+
 def parse_mapholder_div(tree):
     """Parses the HTML for a 'mapholder' class.
 
@@ -0,0 +1,66 @@
+import re
+
+PLAYERS_COLUMNS = ["player_id", "player", "team", "kills", "headshots", "assists", "flash_assists",
+                   "deaths", "kast", "kd_diff", "adr", "fk_diff", "rating"]
+
+
+def _number(text, cast=int):
+    """Extract the first number of a table cell, e.g. '+10', '75.0%' or '25 (10)'."""
+    match = re.search(r"[-+]?\d+(\.\d+)?", text)
+    return None if match is None else cast(match.group(0))
+
+
+def _bracketed(text):
+    """Extract the number in brackets of a table cell, e.g. '25 (10)'."""
+    match = re.search(r"\((\d+)\)", text)
+    return None if match is None else int(match.group(1))
+
+
+def parse_map_stat_players_page(tree):
+    """Parses the players tables of /stats/matches/mapstatsid/{id}/{name}.
+
+    Parameter
+    ---------
+    tree: lxml.html.HtmlElement
+        HTML of the webpage
+
+    Return
+    ------
+    List of dictionaries with the fields in `PLAYERS_COLUMNS`, one per player.
+    Players of the 1st table are in team 1 and players of the 2nd table in team 2.
+
+    """
+    # The CT and T side breakdowns are also 'stats-table', only keep the totals
+    tables = [table for table in tree.find_class("stats-table")
+              if "totalstats" in table.get("class", "").split()]
+
+    players = []
+    for team, table in enumerate(tables[:2], start=1):
+        for row in table.xpath(".//tbody/tr"):
+            players.append({"team": team, **parse_players_row(row)})
+
+    return players
+
+
+def parse_players_row(tree):
+    """Extract the statistics of a player from a row of the `stats-table`."""
+    player = tree.find_class("st-player")[0].xpath(".//a")[0]
+    player_id = player.get("href").split(sep="/")[3]
+
+    kills = tree.find_class("st-kills")[0].text_content()
+    assists = tree.find_class("st-assists")[0].text_content()
+
+    return {
+        "player_id": int(player_id),
+        "player": player.text_content().strip(),
+        "kills": _number(kills),
+        "headshots": _bracketed(kills),
+        "assists": _number(assists),
+        "flash_assists": _bracketed(assists),
+        "deaths": _number(tree.find_class("st-deaths")[0].text_content()),
+        "kast": _number(tree.find_class("st-kdratio")[0].text_content(), float),
+        "kd_diff": _number(tree.find_class("st-kddiff")[0].text_content()),
+        "adr": _number(tree.find_class("st-adr")[0].text_content(), float),
+        "fk_diff": _number(tree.find_class("st-fkdiff")[0].text_content()),
+        "rating": _number(tree.find_class("st-rating")[0].text_content(), float),
+    }
@@ -2,15 +2,16 @@ import logging
 
 from dateutil import parser
 
-from hltv_api.common import HLTVConfig
+from hltv_api.common import get_config
 
 logger = logging.getLogger(__name__)
 
 RESULTS_COLUMNS = ["match_id", "date", "event", "team_1", "team_2", "map", "score_1", "score_2", "stars"]
 
 
-def parse_result_page(tree):
+def parse_result_page(tree, config=None):
     """Parse and extract results from a `/results` page"""
+    date_format = get_config(config).date_format
 
     all_matches = []
 
@@ -34,7 +35,7 @@ def parse_result_page(tree):
         # store it in the pd.DataFrame
         sublist_matches = [
             {
-                "date": datetime.strftime(HLTVConfig["date_format"]),
+                "date": datetime.strftime(date_format),
                 **parse_result_con_div(match)
             } for match in matches
         ]
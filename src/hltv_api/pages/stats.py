@@ -1,13 +1,76 @@
 import logging
+import re
+
+from lxml import html
 
 logger = logging.getLogger(__name__)
 
+# Opening tags with one of the classes used in the economy page
+_ECONOMY_TAG_REGEX = re.compile(
+    r'<[a-zA-Z][^>]*?\sclass="(?P<class>[^"]*\b(?:team-categories|equipment-category-td|lost)\b[^"]*)"[^>]*>'
+)
+_TITLE_REGEX = re.compile(r'\stitle="([^"]*)"')
+
 
 def parse_map_stat_economy_page(tree):
     """Parses /stats/matches/mapstatsid/{id}/{name}. """
-    history = [half.find_class("equipment-category-td")
+    history = [[(td.get("title"), len(td.find_class("lost")) > 0)
+                for td in half.find_class("equipment-category-td")]
                for half in tree.find_class("team-categories")]
 
+    return _parse_economy_history(history)
+
+
+def parse_map_stat_economy_html(text):
+    """Parses /stats/matches/mapstatsid/{id}/{name} from its HTML source.
+
+    Faster than `parse_map_stat_economy_page`: instead of building the DOM of the
+    whole page, only the tags with the classes of interest are scanned. Falls back
+    to `parse_map_stat_economy_page` if the layout of the page is not the one expected.
+    """
+    history = _scan_economy_history(text)
+    if _is_valid_history(history):
+        return _parse_economy_history(history)
+
+    logger.debug("Unexpected economy page layout, falling back to the DOM parser")
+    return parse_map_stat_economy_page(html.fromstring(text))
+
+
+def _scan_economy_history(text):
+    """Return the (title, lost) of the equipment cells of each 'team-categories'."""
+    history = []
+    cell_end = -1
+
+    for tag in _ECONOMY_TAG_REGEX.finditer(text):
+        classes = tag.group("class").split()
+
+        if "team-categories" in classes:
+            history.append([])
+
+        if "equipment-category-td" in classes:
+            if len(history) == 0:
+                return []
+
+            title = _TITLE_REGEX.search(tag.group(0))
+            history[-1].append([None if title is None else title.group(1), "lost" in classes])
+            cell_end = text.find("</td>", tag.end())
+
+        # Loss marker nested in the last equipment cell
+        elif "lost" in classes and tag.start() < cell_end:
+            history[-1][-1][1] = True
+
+    return [[tuple(cell) for cell in half] for half in history]
+
+
+def _is_valid_history(history):
+    return (len(history) >= 4
+            and len(history[0]) == len(history[1])
+            and len(history[2]) == len(history[3])
+            and all(title is not None for half in history for title, _ in half))
+
+
+def _parse_economy_history(history):
+    """Build the economy fields from the (title, lost) of the cells of each half."""
     team_1_rounds = [*history[0], *history[2]]
     team_2_rounds = [*history[1], *history[3]]
 
@@ -15,13 +78,13 @@ def parse_map_stat_economy_page(tree):
     for i in range(0, 30):
         team_1_value = team_2_value = winner = None
         if i < len(team_1_rounds):
-            team_1_equipment = team_1_rounds[i].get("title")
+            team_1_equipment = team_1_rounds[i][0]
             team_1_value = int(team_1_equipment.strip("Equipment value: "))
 
-            team_2_equipment = team_2_rounds[i].get("title").strip("Equipment value: ")
+            team_2_equipment = team_2_rounds[i][0].strip("Equipment value: ")
             team_2_value = int(team_2_equipment.strip("Equipment value: "))
 
-            winner = 1 if len(team_2_rounds[i].find_class("lost")) > 0 else 2
+            winner = 1 if team_2_rounds[i][1] else 2
 
         results[f"{i + 1}_team_1_value"] = team_1_value
         results[f"{i + 1}_team_2_value"] = team_2_value
@@ -0,0 +1,222 @@
+"""Plans the crawl of many `HLTVQuery` at once.
+
+Queries are resolved together, so every team, player and event name is only
+searched once. Queries with the same filters and overlapping date ranges are merged
+into a single /results crawl over the union of their dates, and every match found is
+fetched once, then routed back to each query it satisfies.
+
+Queries with different team or event filters are not merged: the /results pages do
+not give the IDs of the teams and events, so the matches of a crawl on the union of
+the filters could only be told apart after fetching them, at a cost of more match
+pages than the /results pages saved.
+"""
+import logging
+from datetime import date as date_type
+
+from hltv_api.api.matches import get_match_stats_by_id
+from hltv_api.api.results import ResultsCursor
+from hltv_api.client import HLTVClient
+
+logger = logging.getLogger(__name__)
+
+
+class CachedSearchClient:
+    """Wraps the search methods of an `HLTVClient` so each name is only searched once."""
+
+    def __init__(self, client=None):
+        # `client` may also be an `EntityIndex`, which is falsy when empty
+        self.client = client if client is not None else HLTVClient()
+        self._cache = {}
+
+    def _search(self, search, kind, search_term):
+        key = (kind, search_term.lower())
+        if key not in self._cache:
+            self._cache[key] = search(search_term)
+        return self._cache[key]
+
+    def search_team(self, search_term):
+        return self._search(self.client.search_team, "team", search_term)
+
+    def search_player(self, search_term):
+        return self._search(self.client.search_player, "player", search_term)
+
+    def search_event(self, search_term):
+        return self._search(self.client.search_event, "event", search_term)
+
+
+class PlannedCrawl:
+    """A single /results crawl serving one or more of the planned queries.
+
+    Attribute
+    ---------
+    params: dict
+        Parameters of the /results requests, on the union of the dates of the members.
+
+    members: List[int]
+        Indices of the queries served by this crawl.
+
+    """
+
+    def __init__(self, params, members, member_params):
+        self.params = params
+        self.members = members
+        self._member_params = member_params
+
+    def __repr__(self):
+        return f"PlannedCrawl(members={self.members}, params={self.params})"
+
+    def route(self, match):
+        """Return the indices of the member queries satisfied by `match`.
+
+        `match` is a dictionary returned by `parse_match_page`.
+        """
+        teams = {int(match["team_1_id"]), int(match["team_2_id"])}
+        event = int(match["event_id"])
+
+        return [index for index, params in zip(self.members, self._member_params)
+                if _in_date_range(match["date"], params)
+                and (len(params["team"]) == 0 or not teams.isdisjoint(params["team"]))
+                and (len(params["event"]) == 0 or event in params["event"])]
+
+
+def _in_date_range(date, params):
+    return ((params["startDate"] is None or params["startDate"] <= date)
+            and (params["endDate"] is None or date <= params["endDate"]))
+
+
+def _merge_key(params):
+    """Queries with the same key can be crawled together."""
+    return (
+        params["matchType"],
+        tuple(sorted(params["map"])),
+        tuple(sorted(params["player"])),
+        params["stars"],
+        params["requireAllTeams"],
+        params["requireAllPlayers"],
+        tuple(sorted(params["team"])),
+        tuple(sorted(params["event"])),
+    )
+
+
+def _merge_date_ranges(members):
+    """Group `(index, params)` into lists whose date ranges overlap."""
+    lowest, highest = date_type.min.isoformat(), date_type.max.isoformat()
+
+    members = sorted(members, key=lambda m: m[1]["startDate"] or lowest)
+
+    groups = []
+    group_end = None
+    for index, params in members:
+        start = params["startDate"] or lowest
+        end = params["endDate"] or highest
+
+        if len(groups) > 0 and start <= group_end:
+            groups[-1].append((index, params))
+            group_end = max(group_end, end)
+        else:
+            groups.append([(index, params)])
+            group_end = end
+
+    return groups
+
+
+def _union(lists):
+    return list(dict.fromkeys(item for items in lists for item in items))
+
+
+class BatchQueryPlanner:
+    """Merges many queries into as few /results crawls as possible.
+
+    Parameter
+    ---------
+    queries: List[HLTVQuery]
+        Queries to be planned.
+
+    client: Optional[HLTVClient]
+        Client used to resolve the names in the queries.
+
+    config: Optional[ClientConfig]
+        Configuration of the clients crawling /results.
+
+    """
+
+    def __init__(self, queries, client=None, config=None):
+        self.queries = list(queries)
+        self.config = config
+
+        search_client = CachedSearchClient(client if client is not None
+                                           else HLTVClient(config=config))
+        self.params = [query.to_params(client=search_client) for query in self.queries]
+        self.crawls = self._plan()
+
+        self._crawled = None
+
+    def _plan(self):
+        groups = {}
+        for index, params in enumerate(self.params):
+            groups.setdefault(_merge_key(params), []).append((index, params))
+
+        crawls = []
+        for members in groups.values():
+            for group in _merge_date_ranges(members):
+                member_params = [params for _, params in group]
+                starts = [params["startDate"] for params in member_params]
+                ends = [params["endDate"] for params in member_params]
+
+                crawls.append(PlannedCrawl(
+                    params={
+                        **member_params[0],
+                        "startDate": None if None in starts else min(starts),
+                        "endDate": None if None in ends else max(ends),
+                    },
+                    members=[index for index, _ in group],
+                    member_params=member_params
+                ))
+
+        return crawls
+
+    def _crawl(self):
+        """Return the IDs found by each crawl, crawling /results only once."""
+        if self._crawled is None:
+            self._crawled = [ResultsCursor(params=crawl.params, config=self.config).next_ids()
+                             for crawl in self.crawls]
+        return self._crawled
+
+    def match_ids(self):
+        """Return the deduplicated IDs of the matches found by all crawls."""
+        matches_ids = _union(self._crawl())
+        logger.info(f"{len(self.queries)} queries planned into {len(self.crawls)} crawls, "
+                    f"{len(matches_ids)} matches found")
+        return matches_ids
+
+    def fetch(self, fetch=get_match_stats_by_id):
+        """Fetch every match found once and route it to the queries it satisfies.
+
+        Parameter
+        ---------
+        fetch: Optional[Callable]
+            Function fetching a match by its ID and returning a dictionary with
+            at least the fields of `parse_match_page`, e.g. `get_economy_by_match_id`.
+
+        Return
+        ------
+        List, in the order of the queries, of lists of the dictionaries returned by `fetch`.
+
+        """
+        crawls_by_match = {}
+        for crawl, matches_ids in zip(self.crawls, self._crawl()):
+            for match_id in matches_ids:
+                crawls_by_match.setdefault(match_id, []).append(crawl)
+
+        routed = [[] for _ in self.queries]
+        for match_id, crawls in crawls_by_match.items():
+            match = fetch(match_id)
+
+            # Failed to fetch or parse the match
+            if len(match) == 0:
+                continue
+
+            for index in sorted({index for crawl in crawls for index in crawl.route(match)}):
+                routed[index].append(match)
+
+        return routed
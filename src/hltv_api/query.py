@@ -4,7 +4,7 @@ from typing import Union, Optional, List
 from dateutil import parser
 
 from hltv_api.client import HLTVClient
-from hltv_api.common import HLTVConfig
+from hltv_api.common import get_config
 from hltv_api.exceptions import HLTVInvalidInputException
 
 
@@ -45,8 +45,16 @@ class HLTVQuery():
     require_all_players: Optional[bool]
         Only return matches where all `players` are in the line-up.
 
+    index: Optional[EntityIndex]
+        Local index used to resolve team, player and event names. If not specified,
+        names are searched on HLTV and every entity returned is used.
+
+    config: Optional[ClientConfig]
+        Configuration whose `date_format` the dates are formatted with, built from
+        `HLTVConfig` if not specified.
+
     """
-    MATCH_TYPES = frozenset(["lan, online"])
+    MATCH_TYPES = frozenset(["lan", "online"])
     STARS = range(1, 6)
     MAPS = frozenset(["cache", "season", "dust2", "mirage", "inferno", "nuke",
                       "train", "cobblestone", "overpass", "tuscan",
@@ -66,7 +74,9 @@ class HLTVQuery():
             team_names: Optional[List[str]] = [],
             stars: Optional[int] = None,
             require_all_teams: Optional[bool] = None,
-            require_all_players: Optional[bool] = None
+            require_all_players: Optional[bool] = None,
+            index=None,
+            config=None
     ):
         # Validate match_type
         if match_type is not None and match_type.lower() not in HLTVQuery.MATCH_TYPES:
@@ -74,11 +84,12 @@ class HLTVQuery():
                 message=f"Invalid match_type: {match_type}",
                 expected=f"One of {HLTVQuery.MATCH_TYPES}",
             )
-        self.match_type = match_type
+        self.match_type = match_type.lower() if match_type is not None else None
 
         # Validate dates
-        self.start_date = self._parse_date(start_date)
-        self.end_date = self._parse_date(end_date)
+        config = get_config(config)
+        self.start_date = self._parse_date(start_date, config)
+        self.end_date = self._parse_date(end_date, config)
 
         # Validate maps
         if all(elem in HLTVQuery.MAPS for elem in maps):
@@ -115,44 +126,58 @@ class HLTVQuery():
         self.require_all_teams = require_all_teams or None
         self.require_all_players = require_all_players or None
 
-    def _parse_date(self, date):
+        self.index = index
+
+    def _parse_date(self, date, config):
         if date is None:
             return None
 
         if type(date) == str:
-            return parser.parse(date).strftime(HLTVConfig["date_format"])
+            return parser.parse(date).strftime(config["date_format"])
 
-        return date.strftime(HLTVConfig["date_format"])
+        return date.strftime(config["date_format"])
 
-    def _aggregate_events(self):
-        client = HLTVClient()
+    def _search_client(self, client=None):
+        # The local index takes precedence over the search endpoints
+        if self.index is not None:
+            return self.index
+        return client or HLTVClient()
+
+    def _aggregate_events(self, client=None):
+        client = self._search_client(client)
         event_ids_from_names = [matching_event["id"]
                                 for event_name in self.event_names
                                 for matching_event in client.search_event(event_name)]
         return list(dict.fromkeys([*self.event_ids, *event_ids_from_names]))
 
-    def _aggregate_players(self):
-        client = HLTVClient()
+    def _aggregate_players(self, client=None):
+        client = self._search_client(client)
         player_ids_from_names = [matching_player["id"]
                                  for player_name in self.player_names
                                  for matching_player in client.search_player(player_name)]
         return list(dict.fromkeys([*self.player_ids, *player_ids_from_names]))
 
-    def _aggregate_teams(self):
-        client = HLTVClient()
+    def _aggregate_teams(self, client=None):
+        client = self._search_client(client)
         team_ids_from_names = [matching_team["id"]
                                for team_name in self.team_names
                                for matching_team in client.search_team(team_name)]
         return list(dict.fromkeys([*self.team_ids, *team_ids_from_names]))
 
-    def to_params(self):
+    def to_params(self, client=None):
+        """Return the parameters of the /results request for this query.
+
+        Team, player and event names are resolved to IDs using `index` if specified,
+        otherwise the search endpoints of `client` or of a new `HLTVClient`.
+        """
         return {
+            "matchType": self.match_type.capitalize() if self.match_type is not None else None,
             "startDate": self.start_date,
             "endDate": self.end_date,
             "map": self.maps,
-            "event": self._aggregate_events(),
-            "player": self._aggregate_players(),
-            "team": self._aggregate_teams(),
+            "event": self._aggregate_events(client),
+            "player": self._aggregate_players(client),
+            "team": self._aggregate_teams(client),
             "stars": self.stars,
             "requireAllTeams": self.require_all_teams,
             "requireAllPlayers": self.require_all_players
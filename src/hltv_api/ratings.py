@@ -0,0 +1,285 @@
+"""Elo ratings and form of the teams, updated incrementally from the crawled results.
+
+Ratings are updated from DataFrames in the format returned by the crawls:
+    - `get_results`, one row per match: the winner of the series is the team with
+      the most maps (`score_1`, `score_2`), teams are identified by their names.
+    - `get_matches_stats`, one row per map: the winner of the map is the team with
+      the most rounds (`team_1_ct` + `team_1_t` against `team_2_ct` + `team_2_t`),
+      teams are identified by their IDs. With `by_map=True`, each team has a rating
+      per map.
+
+Games must be given in date order, batch after batch, so the ratings after each
+crawl are those a recompute from scratch would give. Games already rated, by match
+ID, are skipped, so that overlapping crawls can be given again. Dates have no time,
+so games of the last day rated may still come in a later batch. Within a batch, the
+games are split into layers in which each team plays at most once, and each layer is updated
+at once with numpy, so that large batches only cost a few vectorized operations per
+game of the busiest team.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+RATINGS_COLUMNS = ["team", "map", "rating", "games", "form"]
+UPDATE_COLUMNS = ["rating_1", "rating_2", "expected_1"]
+
+
+def _key(team, map_name=None):
+    return team if map_name is None else (team, map_name)
+
+
+def _layers(index_1, index_2):
+    """Return the layer of each game: 1 + the last layer of the games of both teams."""
+    last_layer = {}
+    layers = []
+    for team_1, team_2 in zip(index_1, index_2):
+        layer = max(last_layer.get(team_1, -1), last_layer.get(team_2, -1)) + 1
+        last_layer[team_1] = last_layer[team_2] = layer
+        layers.append(layer)
+    return np.array(layers, dtype=np.int64)
+
+
+class TeamRatings:
+    """Elo ratings and recent form of the teams.
+
+    Parameter
+    ---------
+    k: Optional[float]
+        Maximum change of rating after a game.
+
+    initial: Optional[float]
+        Rating of the teams before their first game.
+
+    by_map: Optional[bool]
+        If `True`, rate each team on each map separately. Requires the `map` column.
+
+    form_window: Optional[int]
+        Number of last games the form of a team is computed on.
+
+    path: Optional[str]
+        JSON file where the ratings are persisted. If not specified, the ratings only
+        live in memory.
+
+    """
+
+    def __init__(self, k=32.0, initial=1500.0, by_map=False, form_window=10, path=None):
+        self.k = k
+        self.initial = initial
+        self.by_map = by_map
+        self.form_window = form_window
+        self.path = path
+
+        # Date of the last game, later batches cannot start before it
+        self.last_date = None
+        # IDs of the matches rated, skipped when given again
+        self._rated = set()
+
+        # key -> index in the arrays, keys are the teams or the (team, map)
+        self._index = {}
+        self._keys = []
+        self._ratings = np.empty(0)
+        self._games = np.empty(0, dtype=np.int64)
+        # Outcome of the last `form_window` games of each key, as a ring buffer
+        self._outcomes = np.empty((0, form_window))
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _indices(self, keys):
+        """Return the index of each key, adding the keys not rated yet."""
+        indices = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            index = self._index.get(key)
+            if index is None:
+                index = self._index[key] = len(self._keys)
+                self._keys.append(key)
+            indices[i] = index
+
+        new = len(self._keys) - len(self._ratings)
+        if new > 0:
+            self._ratings = np.concatenate([self._ratings, np.full(new, float(self.initial))])
+            self._games = np.concatenate([self._games, np.zeros(new, dtype=np.int64)])
+            self._outcomes = np.concatenate([self._outcomes, np.zeros((new, self.form_window))])
+        return indices
+
+    @staticmethod
+    def _games_of(df):
+        """Return the teams and the outcome for team 1 (1, 0.5 or 0) of each row."""
+        if "team_1_id" in df.columns:
+            teams_1, teams_2 = df["team_1_id"], df["team_2_id"]
+        else:
+            teams_1, teams_2 = df["team_1"], df["team_2"]
+        # Categories of both columns differ, so compare the values
+        teams_1, teams_2 = teams_1.astype(object), teams_2.astype(object)
+
+        if "score_1" in df.columns:
+            score_1, score_2 = df["score_1"], df["score_2"]
+        else:
+            score_1 = df["team_1_ct"] + df["team_1_t"]
+            score_2 = df["team_2_ct"] + df["team_2_t"]
+
+        score_1 = pd.to_numeric(score_1).astype("float64")
+        score_2 = pd.to_numeric(score_2).astype("float64")
+        outcomes = np.sign(score_1 - score_2) / 2 + 0.5
+        return teams_1, teams_2, outcomes
+
+    def update(self, df):
+        """Update the ratings with the games of `df`, later than those already rated.
+
+        Games of matches already rated are skipped. Other games must not be older
+        than the last game rated, or `ValueError` is raised.
+
+        Parameter
+        ---------
+        df: pandas.DataFrame
+            Games returned by `get_results` or `get_matches_stats`, in any order.
+            Rows with a missing team or score are ignored.
+
+        Return
+        ------
+        pandas.DataFrame with the index of `df` and the columns in `UPDATE_COLUMNS`:
+        the ratings of both teams before the game, and the expected outcome for team 1.
+
+        """
+        teams_1, teams_2, outcomes = self._games_of(df)
+        dates = pd.to_datetime(df["date"])
+
+        valid = (teams_1.notna() & teams_2.notna() & outcomes.notna() & dates.notna()
+                 & (teams_1 != teams_2)).to_numpy(dtype=bool)
+        result = pd.DataFrame(np.nan, index=df.index, columns=UPDATE_COLUMNS)
+        if not valid.any():
+            return result
+
+        rows = np.flatnonzero(valid)
+        match_ids = pd.to_numeric(df["match_id"]).astype("float64").to_numpy()[rows] \
+            if "match_id" in df.columns else np.zeros(len(rows))
+        if "match_id" in df.columns and self._rated:
+            new = ~np.isin(match_ids, np.fromiter(self._rated, dtype="float64"))
+            rows, match_ids = rows[new], match_ids[new]
+            if len(rows) == 0:
+                return result
+
+        row_dates = dates.to_numpy()[rows]
+        if self.last_date is not None:
+            # HLTV match IDs are given when the matches are announced, so games of the
+            # same day may come in any order of ID
+            before = row_dates < self.last_date.to_datetime64()
+            if before.any():
+                raise ValueError(f"Games must be given in date order, got "
+                                 f"{pd.Timestamp(row_dates[before].min()).date()} "
+                                 f"after {self.last_date.date()}")
+
+        # Positions of the games in chronological order, by match ID within a day
+        order = np.lexsort((match_ids, row_dates))
+        rows, match_ids = rows[order], match_ids[order]
+
+        maps = df["map"].astype(object).to_numpy()[rows] if self.by_map else [None] * len(rows)
+        index_1 = self._indices([_key(team, m) for team, m in zip(teams_1.to_numpy()[rows], maps)])
+        index_2 = self._indices([_key(team, m) for team, m in zip(teams_2.to_numpy()[rows], maps)])
+        outcome = outcomes.to_numpy()[rows]
+
+        rating_1 = np.empty(len(rows))
+        rating_2 = np.empty(len(rows))
+        expected = np.empty(len(rows))
+
+        layers = _layers(index_1.tolist(), index_2.tolist())
+        by_layer = np.argsort(layers, kind="stable")
+        bounds = np.flatnonzero(np.diff(layers[by_layer])) + 1
+        for games in np.split(by_layer, bounds):
+            # Each team plays at most once in a layer, so fancy indexing does not collide
+            a, b, s = index_1[games], index_2[games], outcome[games]
+            r_a, r_b = self._ratings[a], self._ratings[b]
+            e = 1.0 / (1.0 + 10.0 ** ((r_b - r_a) / 400.0))
+
+            rating_1[games], rating_2[games], expected[games] = r_a, r_b, e
+
+            delta = self.k * (s - e)
+            self._ratings[a] = r_a + delta
+            self._ratings[b] = r_b - delta
+
+            self._outcomes[a, self._games[a] % self.form_window] = s
+            self._outcomes[b, self._games[b] % self.form_window] = 1.0 - s
+            self._games[a] += 1
+            self._games[b] += 1
+
+        self.last_date = dates.iloc[rows[-1]]
+        if "match_id" in df.columns:
+            self._rated.update(match_ids.astype(np.int64).tolist())
+
+        result.iloc[rows] = np.column_stack([rating_1, rating_2, expected])
+        return result
+
+    def _form(self, indices):
+        counts = np.minimum(self._games[indices], self.form_window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, self._outcomes[indices].sum(axis=1) / counts, np.nan)
+
+    def rating(self, team, map=None):
+        """Return the rating of `team` (on `map` if `by_map`), `initial` if it has not played."""
+        index = self._index.get(_key(team, map if self.by_map else None))
+        return float(self.initial) if index is None else float(self._ratings[index])
+
+    def form(self, team, map=None):
+        """Return the share of the last `form_window` games won by `team`, `NaN` if none."""
+        index = self._index.get(_key(team, map if self.by_map else None))
+        return np.nan if index is None else float(self._form(np.array([index]))[0])
+
+    def to_frame(self):
+        """Return the ratings, best first, with the columns in `RATINGS_COLUMNS`."""
+        indices = np.arange(len(self._keys))
+        df = pd.DataFrame({
+            "team": [key[0] if self.by_map else key for key in self._keys],
+            "map": [key[1] if self.by_map else None for key in self._keys],
+            "rating": self._ratings,
+            "games": self._games,
+            "form": self._form(indices),
+        }, columns=RATINGS_COLUMNS)
+        return df.sort_values("rating", ascending=False, kind="stable").reset_index(drop=True)
+
+    def load(self):
+        with open(self.path) as f:
+            data = json.load(f)
+
+        self.k, self.initial = data["k"], data["initial"]
+        self.by_map, self.form_window = data["by_map"], data["form_window"]
+        self.last_date = None if data["last_date"] is None else pd.Timestamp(data["last_date"])
+        self._rated = set(data.get("rated", []))
+
+        keys = [tuple(key) if self.by_map else key for key in data["keys"]]
+        self._index = {key: i for i, key in enumerate(keys)}
+        self._keys = keys
+        self._ratings = np.array(data["ratings"], dtype=float)
+        self._games = np.array(data["games"], dtype=np.int64)
+        self._outcomes = np.array(data["outcomes"], dtype=float).reshape(len(keys), self.form_window)
+
+    def save(self):
+        """Write the ratings to `path`, replacing the file atomically."""
+        data = {
+            "k": self.k,
+            "initial": self.initial,
+            "by_map": self.by_map,
+            "form_window": self.form_window,
+            "last_date": None if self.last_date is None else self.last_date.isoformat(),
+            "rated": sorted(self._rated),
+            "keys": [_json_key(key) for key in self._keys],
+            "ratings": self._ratings.tolist(),
+            "games": self._games.tolist(),
+            "outcomes": self._outcomes.tolist(),
+        }
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+def _json_key(key):
+    """Return `key` with numpy scalars converted, so that it can be written as JSON."""
+    if isinstance(key, tuple):
+        return [_json_key(part) for part in key]
+    return key.item() if isinstance(key, np.generic) else key
@@ -0,0 +1,150 @@
+"""Scheduling of the requests of the clients sharing the same HLTV rate budget.
+
+Requests belong to priority classes, e.g. 'interactive' lookups for a dashboard
+and 'batch' backfills. When several requests are waiting, the class with the
+highest priority goes first, so interactive requests do not queue behind a backfill.
+
+Each class has its own concurrency limit and a share of the rate. A class is only
+held to its share while other classes are waiting, otherwise it can use the whole
+rate, so a backfill running alone is not slowed down.
+"""
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# Requests of the classes with a lower `priority` are started first. `rate_share`
+# is the fraction of the rate guaranteed to the class when other classes are waiting.
+PriorityClass = namedtuple("PriorityClass", ["priority", "max_concurrency", "rate_share"])
+
+DEFAULT_CLASSES = {
+    "interactive": PriorityClass(priority=0, max_concurrency=4, rate_share=0.7),
+    "batch": PriorityClass(priority=1, max_concurrency=4, rate_share=0.3),
+}
+
+
+class _ClassState:
+    def __init__(self, priority_class):
+        self.priority_class = priority_class
+        self.in_flight = 0
+        # Earliest time of the next request when the class is held to its share
+        self.next_request_at = 0.0
+
+
+class RequestScheduler:
+    """Admits the requests of the clients by priority, concurrency and rate.
+
+    Parameter
+    ---------
+    rate: Optional[float]
+        Maximum number of requests started per second, over all classes.
+        If not specified, the rate is not limited.
+
+    max_concurrency: Optional[int]
+        Maximum number of requests in flight at the same time, over all classes.
+
+    classes: Optional[Dict[str, PriorityClass]]
+        Priority classes by name, `DEFAULT_CLASSES` if not specified.
+
+    """
+
+    def __init__(self, rate=None, max_concurrency=8, classes=None):
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.classes = dict(classes or DEFAULT_CLASSES)
+
+        self._condition = threading.Condition()
+        self._states = {name: _ClassState(c) for name, c in self.classes.items()}
+        self._in_flight = 0
+        self._next_request_at = 0.0
+        # (priority, sequence number, class name) of the waiting requests
+        self._waiting = []
+        self._sequence = 0
+        # Number of requests started since the creation of the scheduler
+        self.requests_started = 0
+
+    def _is_eligible(self, name, now):
+        state = self._states[name]
+        if state.in_flight >= state.priority_class.max_concurrency:
+            return False
+
+        # Held to its share only if requests of other classes are waiting
+        contended = any(other != name for _, _, other in self._waiting)
+        return not contended or state.next_request_at <= now
+
+    def _can_start(self, entry, now):
+        if self._in_flight >= self.max_concurrency or self._next_request_at > now:
+            return False
+
+        eligible = [waiting for waiting in self._waiting if self._is_eligible(waiting[2], now)]
+        return len(eligible) > 0 and min(eligible) == entry
+
+    def _start(self, entry, now):
+        name = entry[2]
+        state = self._states[name]
+
+        self._waiting.remove(entry)
+        self._in_flight += 1
+        state.in_flight += 1
+        self.requests_started += 1
+
+        if self.rate is not None:
+            self._next_request_at = now + 1.0 / self.rate
+            state.next_request_at = now + 1.0 / (self.rate * state.priority_class.rate_share)
+
+    def _wait_time(self, now):
+        """Time until the next rate limit expires, `None` to wait for a release."""
+        times = [self._next_request_at] + [state.next_request_at for state in self._states.values()]
+        times = [t - now for t in times if t > now]
+        return min(times) if len(times) > 0 else None
+
+    def acquire(self, name, timeout=None):
+        """Wait until a request of class `name` can start.
+
+        Return `False` if it could not start within `timeout` seconds.
+        """
+        if name not in self._states:
+            raise KeyError(f"{name} is not a valid priority class, expected one of {list(self.classes)}")
+
+        expires_at = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            self._sequence += 1
+            entry = (self.classes[name].priority, self._sequence, name)
+            self._waiting.append(entry)
+
+            while True:
+                now = time.monotonic()
+                if self._can_start(entry, now):
+                    self._start(entry, now)
+                    # Another waiting request may be able to start as well
+                    self._condition.notify_all()
+                    return True
+
+                wait = self._wait_time(now)
+                if expires_at is not None:
+                    if now >= expires_at:
+                        self._waiting.remove(entry)
+                        self._condition.notify_all()
+                        return False
+                    wait = expires_at - now if wait is None else min(wait, expires_at - now)
+                self._condition.wait(wait)
+
+    def release(self, name):
+        with self._condition:
+            self._in_flight -= 1
+            self._states[name].in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, name, timeout=None):
+        """Context in which a request of class `name` is made.
+
+        Raise `TimeoutError` if it could not start within `timeout` seconds.
+        """
+        if not self.acquire(name, timeout):
+            raise TimeoutError(f"No slot for a {name} request within {timeout} seconds")
+        try:
+            yield
+        finally:
+            self.release(name)
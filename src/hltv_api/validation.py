@@ -0,0 +1,219 @@
+"""Checks of the records returned by the parsers, to detect changes of the HLTV layout.
+
+The parsers of `hltv_api.pages` read the pages by position (the second 'teamName',
+the third half of the economy history...). When the layout of HLTV changes, they
+either raise or return wrong records for every page. A `ParseMonitor` validates
+the records of a crawl and stops it once most of the recent pages fail, instead
+of fetching thousands of pages which cannot be parsed.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+
+from hltv_api.exceptions import HLTVParserDriftException
+
+logger = logging.getLogger(__name__)
+
+ROUNDS = 30
+
+
+def _is_id(value):
+    return str(value).isdigit()
+
+
+def validate_match(match):
+    """Return the problems found in a record of `parse_match_page`, empty if it is valid."""
+    if len(match) == 0:
+        return ["match page could not be parsed"]
+
+    problems = []
+    for field in ["match_id", "event_id", "team_1_id", "team_2_id"]:
+        if not _is_id(match.get(field)):
+            problems.append(f"{field} is not an ID: {match.get(field)!r}")
+    for field in ["date", "team_1", "team_2"]:
+        if not match.get(field):
+            problems.append(f"{field} is empty")
+
+    for map_played in match.get("maps", []):
+        if not map_played.get("map"):
+            problems.append("map name is empty")
+        if not _is_id(map_played.get("map_stats_id")):
+            problems.append(f"map_stats_id is not an ID: {map_played.get('map_stats_id')!r}")
+        if map_played.get("starting_ct") not in (1, 2):
+            problems.append(f"starting_ct is not 1 or 2: {map_played.get('starting_ct')!r}")
+        for field in ["team_1_ct", "team_1_t", "team_2_ct", "team_2_t"]:
+            if not isinstance(map_played.get(field), int) or map_played[field] < 0:
+                problems.append(f"{field} is not a score: {map_played.get(field)!r}")
+
+    return problems
+
+
+def validate_economy(economy):
+    """Return the problems found in a record of `parse_map_stat_economy_page`,
+    empty if it is valid."""
+    problems = []
+    played = True
+    for i in range(1, ROUNDS + 1):
+        values = (economy.get(f"{i}_team_1_value"), economy.get(f"{i}_team_2_value"))
+        winner = economy.get(f"{i}_winner")
+
+        if values == (None, None) and winner is None:
+            played = False
+            continue
+
+        if not played:
+            problems.append(f"round {i} is played after a round which is not")
+        if not all(isinstance(value, int) and value >= 0 for value in values):
+            problems.append(f"round {i} equipment values are invalid: {values!r}")
+        if winner not in (1, 2):
+            problems.append(f"round {i} winner is not 1 or 2: {winner!r}")
+
+    if economy.get("1_winner") is None:
+        problems.append("no round played")
+
+    return problems
+
+
+def validate_players(players):
+    """Return the problems found in the records of `parse_map_stat_players_page`,
+    empty if they are valid."""
+    if len(players) == 0:
+        return ["no players table found"]
+
+    problems = []
+    for player in players:
+        if not player.get("player"):
+            problems.append("player name is empty")
+        if player.get("team") not in (1, 2):
+            problems.append(f"team is not 1 or 2: {player.get('team')!r}")
+        if not isinstance(player.get("kills"), int):
+            problems.append(f"kills is not a number: {player.get('kills')!r}")
+
+    return problems
+
+
+class ParseMonitor:
+    """Parse failure rate of the recent pages of a crawl.
+
+    The crawl is stopped with `HLTVParserDriftException` once more than
+    `max_failure_rate` of the last `window` pages of a kind failed to parse.
+    Samples of the failing pages are saved for debugging.
+
+    Parameter
+    ---------
+    max_failure_rate: Optional[float]
+        Rate of failures above which the crawl is stopped. 1.0 to never stop it.
+
+    window: Optional[int]
+        Number of recent pages the failure rate is computed on.
+
+    samples_dir: Optional[str]
+        Directory where the failing pages are saved. A directory in the
+        temporary directory if not specified.
+
+    max_samples: Optional[int]
+        Number of failing pages saved.
+
+    pause_seconds: Optional[float]
+        If specified, the first time the rate is exceeded the crawl pauses this many
+        seconds and starts counting again, e.g. in case HLTV served error pages for
+        a while. The crawl is only stopped if the rate is exceeded again.
+
+    """
+
+    def __init__(self, max_failure_rate=0.5, window=20, samples_dir=None, max_samples=5,
+                 pause_seconds=None):
+        self.max_failure_rate = max_failure_rate
+        self.window = window
+        self.samples_dir = samples_dir or os.path.join(tempfile.gettempdir(), "hltv-api-samples")
+        self.max_samples = max_samples
+        self.pause_seconds = pause_seconds
+
+        self.observed = 0
+        self.failures = 0
+        # Path, URL and problems of the pages saved
+        self.samples = []
+
+        self._lock = threading.Lock()
+        # kind -> success of the last `window` pages
+        self._outcomes = {}
+        self._paused = False
+
+    def failure_rate(self, kind):
+        outcomes = self._outcomes.get(kind, ())
+        if len(outcomes) == 0:
+            return 0.0
+        return 1 - sum(outcomes) / len(outcomes)
+
+    def observe(self, kind, problems, url=None, text=None):
+        """Record the outcome of parsing a page of `kind`.
+
+        Parameter
+        ---------
+        kind: str
+            Kind of the page, e.g. 'match' or 'economy'.
+
+        problems: List[str]
+            Problems found by the validation of the record, empty if it is valid.
+
+        url, text: Optional[str]
+            URL and HTML of the page, saved as a sample if it failed.
+
+        """
+        with self._lock:
+            outcomes = self._outcomes.setdefault(kind, deque(maxlen=self.window))
+            outcomes.append(len(problems) == 0)
+            self.observed += 1
+
+            if len(problems) > 0:
+                self.failures += 1
+                logger.warning(f"Invalid {kind} page {url}: {'; '.join(problems)}")
+                if text is not None and len(self.samples) < self.max_samples:
+                    self._save_sample(kind, problems, url, text)
+
+        self.check(kind)
+
+    def _save_sample(self, kind, problems, url, text):
+        os.makedirs(self.samples_dir, exist_ok=True)
+        path = os.path.join(self.samples_dir, f"{kind}-{int(time.time())}-{len(self.samples)}.html")
+        # URL and problems are kept in a comment at the top of the page
+        header = "\n".join([str(url), *problems])
+        with open(path, "w") as f:
+            f.write(f"<!-- {header}\n-->\n{text}")
+
+        self.samples.append({"path": path, "url": url, "problems": problems})
+
+    def check(self, kind):
+        """Raise `HLTVParserDriftException` if too many recent pages of `kind` failed."""
+        with self._lock:
+            outcomes = self._outcomes.get(kind, ())
+            # Wait for a full window, a few failures alone do not mean the layout changed
+            if len(outcomes) < self.window:
+                return
+
+            failure_rate = self.failure_rate(kind)
+            if failure_rate <= self.max_failure_rate:
+                self._paused = False
+                return
+
+            pause = self.pause_seconds is not None and not self._paused
+            if pause:
+                self._paused = True
+                outcomes.clear()
+
+        if pause:
+            logger.warning(f"{failure_rate:.0%} of the last {kind} pages failed to parse, "
+                           f"pausing for {self.pause_seconds} seconds")
+            time.sleep(self.pause_seconds)
+            return
+
+        raise HLTVParserDriftException(
+            message=f"{failure_rate:.0%} of the last {self.window} {kind} pages failed to parse, "
+                    f"the layout of HLTV may have changed. Samples saved in {self.samples_dir}",
+            kind=kind,
+            failure_rate=failure_rate,
+            samples=list(self.samples),
+        )
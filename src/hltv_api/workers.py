@@ -0,0 +1,145 @@
+"""Thread pools running the requests of the synchronous crawls concurrently."""
+import math
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+
+def worker_pool(workers=None):
+    """Return a `ThreadPoolExecutor` with `workers` threads, to be used as a context manager.
+
+    If `workers` is `None` or 1, return a context of `None`, i.e. run sequentially.
+    """
+    if workers is None or workers <= 1:
+        return nullcontext()
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def pool_size(workers, config):
+    """Return the number of workers of a crawl, `workers` capped to `config.max_concurrency`.
+
+    Return `None` if `workers` is `None`, i.e. run sequentially.
+    """
+    if workers is None:
+        return None
+    return max(1, min(workers, config.max_concurrency))
+
+
+def ordered_map(fn, items, executor=None, window=None):
+    """Iterate over `fn(item)` for each of `items`, in the order of `items`.
+
+    The calls run on `executor` if specified, sequentially otherwise. If `window` is
+    specified, at most `window` calls are submitted ahead of the results consumed, so
+    `items` can be a lazy, unbounded iterator. If the iteration stops early, e.g.
+    because a call raised, the calls not started yet are cancelled.
+    """
+    if executor is None:
+        yield from map(fn, items)
+        return
+
+    futures = deque()
+    try:
+        for item in items:
+            futures.append(executor.submit(fn, item))
+            if window is not None and len(futures) >= window:
+                yield futures.popleft().result()
+
+        while len(futures) > 0:
+            yield futures.popleft().result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def items_needed(limit, rows, items):
+    """Estimate the number of items needed in total to get `limit` rows, e.g. matches
+    for a number of maps, given that the first `items` items gave `rows` rows.
+
+    Return `None` if there is no limit.
+    """
+    if limit is None:
+        return None
+    # Nothing is known of the number of rows per item before the first one
+    if items == 0:
+        return min(limit, 1)
+    rows_per_item = rows / items if rows > 0 else 1
+    return items + math.ceil(max(limit - rows, 0) / rows_per_item)
+
+
+def prefetch(items, buffer_size, demand=None):
+    """Iterate over `items` from a background thread, at most `buffer_size` items ahead.
+
+    The producer, e.g. the pagination of /results, runs while the consumer, e.g. the
+    requests for the matches, works on the previous items, and blocks once the buffer
+    is full so memory stays bounded. An exception raised by `items` is raised to the
+    consumer after the items produced before it.
+
+    If `demand` is specified, it returns the number of items the consumer is expected
+    to need in total, `None` if unknown, and the producer does not read ahead past
+    it. Items are still produced when the consumer waits for one, in case it was
+    underestimated.
+
+    If the consumer stops early, the producer stops before its next item, and the
+    consumer waits for the item being produced, so that no request is left running.
+    """
+    buffer = deque()
+    condition = threading.Condition()
+    state = {"consumed": 0, "waiting": False, "stopped": False}
+
+    def may_produce():
+        if state["stopped"]:
+            return True
+        if len(buffer) == 0 and state["waiting"]:
+            return True
+        if len(buffer) >= buffer_size:
+            return False
+        needed = None if demand is None else demand()
+        return needed is None or state["consumed"] + len(buffer) < needed
+
+    def put(entry):
+        with condition:
+            buffer.append(entry)
+            condition.notify_all()
+
+    def produce():
+        iterator = iter(items)
+        try:
+            while True:
+                with condition:
+                    condition.wait_for(may_produce)
+                    if state["stopped"]:
+                        return
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    put(("end", None))
+                    return
+                put(("item", item))
+        except BaseException as e:
+            put(("error", e))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            with condition:
+                if len(buffer) == 0:
+                    state["waiting"] = True
+                    condition.notify_all()
+                    condition.wait_for(lambda: len(buffer) > 0)
+                    state["waiting"] = False
+                kind, value = buffer.popleft()
+                state["consumed"] += 1
+                condition.notify_all()
+
+            if kind == "end":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        with condition:
+            state["stopped"] = True
+            condition.notify_all()
+        producer.join()
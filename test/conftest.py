@@ -0,0 +1,9 @@
+import pytest
+
+from fake_pages import economy_page as build_economy_page
+
+
+@pytest.fixture
+def economy_page():
+    """Build the economy page of a map with the given number of rounds."""
+    return build_economy_page
@@ -0,0 +1,88 @@
+"""Pages with the layout expected by the parsers, built for the tests."""
+
+PLAYERS_TABLE = """
+<table class="stats-table totalstats">
+  <thead><tr><th class="st-teamname">{team}</th></tr></thead>
+  <tbody>{rows}</tbody>
+</table>"""
+
+PLAYER_ROW = """
+<tr>
+  <td class="st-player"><a href="/stats/players/{player_id}/{player}">{player}</a></td>
+  <td class="st-kills">{kills}<span> (10)</span></td>
+  <td class="st-assists">3<span> (1)</span></td>
+  <td class="st-deaths">15</td>
+  <td class="st-kdratio">75.0%</td>
+  <td class="st-kddiff won">+{kd_diff}</td>
+  <td class="st-adr">95.2</td>
+  <td class="st-fkdiff lost">-2</td>
+  <td class="st-rating">{rating}</td>
+</tr>"""
+
+
+def players_table(team, players):
+    """Table of the overall statistics of `team`, `players` being `(player_id, player)`."""
+    return PLAYERS_TABLE.format(team=team, rows="".join(
+        PLAYER_ROW.format(player_id=player_id, player=player, kills=25, kd_diff=10, rating=1.45)
+        for player_id, player in players
+    ))
+
+
+def mapholder(map_name, map_stats_id=None):
+    stats = "" if map_stats_id is None else \
+        f'<a class="results-stats" href="/stats/matches/mapstatsid/{map_stats_id}/foo">Stats</a>'
+    return f"""
+    <div class="mapholder"><div class="mapname">{map_name}</div>{stats}
+      <div class="results-center-half-score">
+        (<span class="ct">9</span>:<span class="t">6</span>; <span class="t">7</span>:<span class="ct">4</span>)
+      </div>
+    </div>"""
+
+
+def match_page(match_id, team_1=(6651, "Gambit"), team_2=(5973, "Team Liquid"),
+               maps=("Ancient", "Inferno", "Nuke", "Overpass", "Vertigo", "Dust2", "Mirage"),
+               map_stats_ids=(123069, 123070), event_id=5553, broken=False, filler=0):
+    """Match page of a best of 3 won 2-0, the decider not played.
+
+    The first 2 of `maps` are picked, the 3rd is left over and the others removed.
+    Broken pages have no team names, as after a change of the layout. `filler` is
+    the number of sentences of commentary, to give the page a realistic size.
+    """
+    (team_1_id, team_1), (team_2_id, team_2) = team_1, team_2
+    slug = f"{team_1}-vs-{team_2}".lower().replace(" ", "-")
+
+    vetoes = [f"1. {team_1} removed {maps[3]}", f"2. {team_2} removed {maps[4]}",
+              f"3. {team_1} picked {maps[0]}", f"4. {team_2} picked {maps[1]}",
+              f"5. {team_1} removed {maps[5]}", f"6. {team_2} removed {maps[6]}",
+              f"7. {maps[2]} was left over"]
+    team_class = "team-name" if broken else "teamName"
+
+    return f"""<html>
+    <head><link rel="canonical" href="https://www.hltv.org/matches/{match_id}/{slug}"></head>
+    <body>
+      <div class="date">2nd of September 2021</div>
+      <div class="event"><a href="/events/{event_id}/event">Event</a></div>
+      <div class="team1-gradient"><a href="/team/{team_1_id}/x"><div class="{team_class}">{team_1}</div></a></div>
+      <div class="team2-gradient"><a href="/team/{team_2_id}/x"><div class="{team_class}">{team_2}</div></a></div>
+      <div class="standard-box veto-box"><div class="padding preformatted-text">Best of 3 (Online)</div></div>
+      <div class="standard-box veto-box"><div class="padding">
+        {"".join(f"<div>{veto}</div>" for veto in vetoes)}
+      </div></div>
+      {mapholder(maps[0], map_stats_ids[0])}{mapholder(maps[1], map_stats_ids[1])}{mapholder(maps[2])}
+      {"<p>" + "Match commentary. " * filler + "</p>" if filler > 0 else ""}
+    </body></html>"""
+
+
+def economy_page(rounds, map_stats_id=0, players=""):
+    """Economy page of a map with `rounds` rounds, followed by the `players` tables."""
+    def half(team, first, last):
+        cells = "".join(
+            f'<td class="equipment-category-td" title="Equipment value: {4000 + 100 * i + team}">'
+            f'<img class="equipment-category{" lost" if (i + team + map_stats_id) % 2 else ""}" src="x.svg"></td>'
+            for i in range(first, last)
+        )
+        return f'<tr class="team-categories">{cells}</tr>'
+
+    return ('<html><body><div class="lost">Header</div>'
+            f'<table>{half(1, 0, 15)}{half(2, 0, 15)}</table>'
+            f'<table>{half(1, 15, rounds)}{half(2, 15, rounds)}</table>{players}</body></html>')
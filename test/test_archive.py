@@ -0,0 +1,116 @@
+from hltv_api.archive import _HEADER, _MAGIC, PageArchive, page_id, page_kind
+from hltv_api.client import HLTVClient
+from hltv_api.pages.stats import parse_map_stat_economy_page
+
+MATCH_URL = "https://www.hltv.org/matches/2350368/foo"
+ECONOMY_URL = "https://www.hltv.org/stats/matches/economy/mapstatsid/123069/foo"
+MAP_STATS_URL = "https://www.hltv.org/stats/matches/mapstatsid/123069/foo"
+RESULTS_URL = "https://www.hltv.org/results?offset=100"
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakePool:
+    def get(self, url, params=None, **kwargs):
+        return FakeResponse(f"<html><body>{url}</body></html>")
+
+
+def test_page_id():
+    assert page_id(MATCH_URL) == 2350368
+    assert page_id(ECONOMY_URL) == 123069
+    assert page_id(RESULTS_URL) is None
+
+
+def test_page_kind():
+    assert page_kind(MATCH_URL) == "match"
+    assert page_kind(ECONOMY_URL) == "economy"
+    assert page_kind(MAP_STATS_URL) == "map_stats"
+    assert page_kind(RESULTS_URL) == "results"
+    assert page_kind("https://www.hltv.org/searchTeam?term=gambit") == "search"
+
+
+def test_archive_keeps_economy_and_overview_of_a_map(tmp_path, economy_page):
+    page = economy_page(16)
+    with PageArchive(str(tmp_path), compression="zlib") as archive:
+        archive.put(ECONOMY_URL, page)
+        archive.put(MAP_STATS_URL, "<html>overview</html>")
+
+        assert archive.get_by_id("economy", 123069) == page
+        assert archive.get_by_id("map_stats", 123069) == "<html>overview</html>"
+        assert [url for url, _ in archive.iter_pages("economy")] == [ECONOMY_URL]
+
+    archive = PageArchive(str(tmp_path))
+    assert archive.get_by_id("economy", 123069) == page
+    assert archive.get_by_id("map_stats", 123069) == "<html>overview</html>"
+    archive.close()
+
+
+def test_archive_random_access(tmp_path, economy_page):
+    page = economy_page(16)
+    with PageArchive(str(tmp_path), compression="zlib") as archive:
+        archive.put(MATCH_URL, "<html>match</html>")
+        archive.put(ECONOMY_URL, page)
+
+        assert archive.get(MATCH_URL) == "<html>match</html>"
+        assert archive.get_by_id("economy", 123069) == page
+        assert archive.get(RESULTS_URL) is None
+
+    # Reopened from the index
+    archive = PageArchive(str(tmp_path))
+    assert len(archive) == 2
+    assert archive.get_by_id("match", "2350368") == "<html>match</html>"
+    archive.close()
+
+
+def test_archive_iteration_across_segments(tmp_path, economy_page):
+    page = economy_page(16)
+    with PageArchive(str(tmp_path), compression="zlib", segment_size=1) as archive:
+        archive.put(RESULTS_URL, "<html>results</html>")
+        archive.put(ECONOMY_URL, page)
+        archive.put(MATCH_URL, "<html>match</html>")
+
+        assert archive.segments() == [0, 1, 2]
+        assert [url for url, _ in archive.iter_pages()] == [RESULTS_URL, ECONOMY_URL, MATCH_URL]
+
+        economies = [parse_map_stat_economy_page(tree)
+                     for _, tree in archive.iter_trees("economy")]
+        assert len(economies) == 1
+        assert economies[0]["1_team_1_value"] is not None
+
+
+def test_archive_resumes_after_killed_write(tmp_path):
+    with PageArchive(str(tmp_path), compression="zlib") as archive:
+        archive.put(RESULTS_URL, "<html>results</html>")
+
+    # Writer killed in the middle of the next record and of its index entry
+    record = _HEADER.pack(_MAGIC, 0, len(MATCH_URL), 100) + MATCH_URL.encode() + b"\x00" * 10
+    with open(tmp_path / "segment-00000.bin", "ab") as f:
+        f.write(record)
+    with open(tmp_path / "index.jsonl", "a") as f:
+        f.write('{"url": "https://www.hltv.org/matches/2350368/foo", "ki')
+
+    with PageArchive(str(tmp_path), compression="zlib") as archive:
+        archive.put(MATCH_URL, "<html>match</html>")
+        archive.put(ECONOMY_URL, "<html>economy</html>")
+
+        assert list(archive.iter_pages()) == [
+            (RESULTS_URL, "<html>results</html>"),
+            (MATCH_URL, "<html>match</html>"),
+            (ECONOMY_URL, "<html>economy</html>"),
+        ]
+
+    archive = PageArchive(str(tmp_path))
+    assert len(archive) == 3
+    assert archive.get(MATCH_URL) == "<html>match</html>"
+    archive.close()
+
+
+def test_client_stores_pages(tmp_path):
+    with PageArchive(str(tmp_path), compression="zlib") as archive:
+        client = HLTVClient(session_pool=FakePool(), archive=archive)
+        client.get("https://www.hltv.org/results", params={"offset": 100})
+
+        assert RESULTS_URL in archive
@@ -0,0 +1,208 @@
+import json
+
+import pandas as pd
+import pytest
+
+from hltv_api import cli
+from hltv_api.api import matches, results
+from hltv_api.exceptions import HLTVParserDriftException
+from hltv_api.index import EntityIndex
+
+
+def fake_crawl(total, interrupt_at=None, calls=None):
+    """Crawl of `total` results, one row each, interrupted when `skip` reaches `interrupt_at`."""
+
+    def crawl(limit=None, config=None, deadline=None, workers=None, client=None, cursor=None):
+        skip = cursor.position
+        if calls is not None:
+            calls.append((skip, limit))
+
+        end = min(skip + limit, total)
+        stopped_at = None
+        if interrupt_at is not None and skip <= interrupt_at < end:
+            end = interrupt_at
+            stopped_at = {"reason": "deadline", "skip": end}
+
+        cursor.seek(end)
+        df = pd.DataFrame({"match_id": range(skip, end)})
+        df.attrs["stopped_at"] = stopped_at
+        df.attrs["next_skip"] = end
+        return df
+
+    return crawl
+
+
+def test_crawl_in_chunks(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setitem(cli.CRAWLS, "matches", fake_crawl(250, calls=calls))
+    output = tmp_path / "matches.csv"
+    checkpoint = tmp_path / "checkpoint.json"
+
+    status = cli.main(["matches", "--output", str(output), "--checkpoint", str(checkpoint),
+                       "--team", "6651", "--team", "Liquid", "--progress-interval", "0"])
+
+    assert status == 0
+    assert calls == [(0, 100), (100, 100), (200, 100)]
+    assert pd.read_csv(output)["match_id"].tolist() == list(range(250))
+    assert json.loads(checkpoint.read_text())["complete"]
+
+    # Nothing left to crawl
+    assert cli.main(["matches", "--output", str(output), "--checkpoint", str(checkpoint),
+                     "--team", "6651", "--team", "Liquid", "--progress-interval", "0"]) == 0
+    assert len(calls) == 3
+
+
+def test_resume_from_checkpoint(tmp_path, monkeypatch):
+    output = tmp_path / "results.jsonl"
+    checkpoint = tmp_path / "checkpoint.json"
+    argv = ["results", "--output", str(output), "--format", "jsonl", "--checkpoint",
+            str(checkpoint), "--limit", "230", "--chunk-size", "50", "--progress-interval", "0"]
+
+    monkeypatch.setitem(cli.CRAWLS, "results", fake_crawl(1000, interrupt_at=120))
+    assert cli.main(argv) == cli.EXIT_INTERRUPTED
+    assert json.loads(checkpoint.read_text())["skip"] == 120
+
+    calls = []
+    monkeypatch.setitem(cli.CRAWLS, "results", fake_crawl(1000, calls=calls))
+    assert cli.main(argv) == 0
+    assert calls == [(120, 50), (170, 50), (220, 10)]
+    assert pd.read_json(output, lines=True)["match_id"].tolist() == list(range(230))
+
+
+def test_resume_drops_rows_written_after_checkpoint(tmp_path, monkeypatch):
+    output = tmp_path / "results.csv"
+    checkpoint = tmp_path / "checkpoint.json"
+    argv = ["results", "--output", str(output), "--checkpoint", str(checkpoint),
+            "--limit", "100", "--chunk-size", "50", "--progress-interval", "0"]
+
+    monkeypatch.setitem(cli.CRAWLS, "results", fake_crawl(1000, interrupt_at=50))
+    assert cli.main(argv) == cli.EXIT_INTERRUPTED
+
+    # Killed after writing the rows of the next chunk, before saving its checkpoint
+    with open(output, "a") as f:
+        f.write("".join(f"{i}\n" for i in range(50, 75)))
+
+    monkeypatch.setitem(cli.CRAWLS, "results", fake_crawl(1000))
+    assert cli.main(argv) == 0
+    assert pd.read_csv(output)["match_id"].tolist() == list(range(100))
+
+
+def test_chunks_share_the_results_cursor(tmp_path, monkeypatch):
+    offsets = []
+
+    def fake_get_page(self, offset):
+        offsets.append(offset)
+        return [{"match_id": str(offset + i)} for i in range(results.RESULTS_PAGE_SIZE)]
+
+    def fake_match(match_id, monitor=None, client=None):
+        maps = [{"map": name, "map_stats_id": i, "team_1_ct": 8, "team_1_t": 8, "team_2_ct": 7,
+                 "team_2_t": 7, "starting_ct": 1} for i, name in enumerate(["nuke", "inferno"])]
+        return {"match_id": match_id, "date": "2021-09-02", "event": "ESL Pro League",
+                "event_id": "5553", "team_1": "Gambit", "team_1_id": "6651", "team_2": "Liquid",
+                "team_2_id": "5973", "maps": maps}
+
+    monkeypatch.setattr(results.ResultsCursor, "_get_page", fake_get_page)
+    monkeypatch.setattr(matches, "get_match_stats_by_id", fake_match)
+    output = tmp_path / "matches.csv"
+    index = tmp_path / "index.json"
+
+    assert cli.main(["matches", "--output", str(output), "--match-type", "lan", "--limit", "400",
+                     "--chunk-size", "100", "--progress-interval", "0", "--index", str(index)]) == 0
+
+    assert offsets == [0, 100]
+    df = pd.read_csv(output)
+    assert len(df) == 400
+    assert df["match_id"].drop_duplicates().tolist() == list(range(200))
+
+    # Teams and events of the matches crawled are added to the index
+    assert EntityIndex(path=str(index)).exact("event", "esl pro league") == [5553]
+
+
+def test_drift_checkpoints_the_rows_collected(tmp_path, monkeypatch):
+    output = tmp_path / "results.csv"
+    checkpoint = tmp_path / "checkpoint.json"
+    partial_crawl = fake_crawl(1000, interrupt_at=30)
+
+    def drifting_crawl(**kwargs):
+        drift = HLTVParserDriftException(message="Layout changed", kind="match",
+                                         failure_rate=1.0, samples=[])
+        drift.partial = partial_crawl(**kwargs)
+        drift.stopped_at = drift.partial.attrs["stopped_at"]
+        raise drift
+
+    monkeypatch.setitem(cli.CRAWLS, "results", drifting_crawl)
+    assert cli.main(["results", "--output", str(output), "--checkpoint", str(checkpoint),
+                     "--progress-interval", "0"]) == 1
+
+    assert pd.read_csv(output)["match_id"].tolist() == list(range(30))
+    assert json.loads(checkpoint.read_text())["skip"] == 30
+
+
+def test_checkpoint_of_another_query(tmp_path, monkeypatch):
+    monkeypatch.setitem(cli.CRAWLS, "results", fake_crawl(10))
+    checkpoint = tmp_path / "checkpoint.json"
+    output = tmp_path / "results.csv"
+
+    assert cli.main(["results", "--stars", "1", "--checkpoint", str(checkpoint),
+                     "--output", str(output), "--progress-interval", "0"]) == 0
+    assert cli.main(["results", "--stars", "2", "--checkpoint", str(checkpoint),
+                     "--output", str(output), "--progress-interval", "0"]) == 1
+
+
+def test_cache_dir(tmp_path, monkeypatch):
+    configs = []
+
+    def crawl(config=None, cursor=None, **kwargs):
+        configs.append(config)
+        df = pd.DataFrame({"match_id": []})
+        df.attrs["stopped_at"] = None
+        df.attrs["next_skip"] = cursor.position
+        return df
+
+    monkeypatch.setitem(cli.CRAWLS, "matches", crawl)
+    cache_dir = str(tmp_path / "cache")
+
+    assert cli.main(["matches", "--cache-dir", cache_dir, "--output", str(tmp_path / "m.csv"),
+                     "--progress-interval", "0"]) == 0
+    assert configs[0].cache_dir == cache_dir
+
+    # The archive and the cache are separate sets of pages
+    assert cli.main(["matches", "--cache-dir", cache_dir, "--archive", cache_dir,
+                     "--progress-interval", "0"]) == 1
+    assert len(configs) == 1
+
+
+def test_resolve(tmp_path, capsys):
+    path = tmp_path / "index.json"
+    index = EntityIndex(path=str(path))
+    index.add("team", 4608, "Natus Vincere")
+    index.add("team", 6651, "Gambit")
+    index.save()
+
+    assert cli.main(["resolve", "team", "natus vincere", "Gambit", "--index", str(path)]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "kind,name,id,entity_name",
+        "team,natus vincere,4608,Natus Vincere",
+        "team,Gambit,6651,Gambit",
+    ]
+
+
+def test_progress_line():
+    class FakeScheduler:
+        requests_started = 0
+
+    scheduler = FakeScheduler()
+    progress = cli.Progress(scheduler, total=200, interval=0)
+    scheduler.requests_started = 30
+    progress.add_rows(100)
+
+    line = progress.line()
+    assert line.startswith("30 requests (")
+    assert "100 rows (" in line
+    assert "ETA" in line
+
+
+def test_invalid_arguments():
+    with pytest.raises(SystemExit) as e:
+        cli.main(["economy", "--map", "atlantis"])
+    assert e.value.code == 2
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+import requests
+
+from dataclasses import FrozenInstanceError
+
+from hltv_api.client import HLTVClient
+from hltv_api.common import ClientConfig, HLTVConfig
+
+
+def test_config_is_immutable():
+    config = ClientConfig()
+
+    with pytest.raises(FrozenInstanceError):
+        config.base_url = "http://localhost:8000"
+
+    mirror = config.replace(base_url="http://localhost:8000")
+    assert config.base_url == HLTVConfig["base_url"]
+    assert mirror.url("matches_uri", 2350368, "foo") == "http://localhost:8000/matches/2350368/foo"
+
+
+def test_config_from_file_and_env(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"base_url": "http://localhost:8000", "max_retry": 5}))
+
+    config = ClientConfig.from_file(str(path))
+    assert config.base_url == "http://localhost:8000"
+    assert config.max_retry == 5
+    assert config.results_uri == "results"
+
+    monkeypatch.setenv("HLTV_MAX_CONCURRENCY", "16")
+    config = ClientConfig.from_env(base=config)
+    assert config.max_concurrency == 16
+    assert config.max_retry == 5
+
+
+def test_config_rejects_unknown_fields():
+    with pytest.raises(KeyError):
+        ClientConfig.from_dict({"base_uri": "http://localhost:8000"})
+
+
+def test_clients_have_their_own_config():
+    mirror = HLTVClient(config=ClientConfig(base_url="http://localhost:8000", max_retry=1))
+    prod = HLTVClient()
+
+    assert mirror.config.url("results_uri") == "http://localhost:8000/results"
+    assert prod.config.url("results_uri") == "https://www.hltv.org/results"
+    assert mirror.max_retry == 1
+
+
+class CountingPool:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, params=None, **kwargs):
+        self.urls.append(url)
+        response = requests.Response()
+        response._content = f"<html>{url}</html>".encode()
+        response.status_code = 200
+        return response
+
+
+def test_pages_cached_across_clients(tmp_path):
+    config = ClientConfig(cache_dir=str(tmp_path))
+    match_url = config.url("matches_uri", 2350368, "foo")
+    results_url = config.url("results_uri")
+
+    pool = CountingPool()
+    for _ in range(2):
+        client = HLTVClient(config=config, session_pool=pool)
+        assert client.get(match_url).text == f"<html>{match_url}</html>"
+        client.get(results_url)
+
+    # The results change as matches are played, only the match page is cached
+    assert pool.urls == [match_url, results_url, results_url]
+    assert HLTVClient(session_pool=pool).get(match_url).status_code == 200
+    assert len(pool.urls) == 4
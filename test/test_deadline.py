@@ -0,0 +1,140 @@
+import time
+
+import pytest
+import requests
+
+from hltv_api.api import matches, results
+from hltv_api.client import HLTVClient
+from hltv_api.deadline import Deadline
+from hltv_api.exceptions import HLTVCrawlInterrupted, HLTVRequestException
+from hltv_api.sessions import HLTVSession, SessionPool
+
+
+class FailingPool:
+    def get(self, *args, **kwargs):
+        raise AssertionError("No request should be made past the deadline")
+
+
+class InterruptedCursor:
+    """Returns `pages` batches of IDs, then raises as if the deadline had passed."""
+
+    buffered = 0
+
+    def __init__(self, skip=0, query=None, config=None, deadline=None, **kwargs):
+        self.pages = 1
+        self.position = skip
+
+    def seek(self, position):
+        self.position = position
+
+    def next_ids(self, limit=None):
+        if self.pages == 0:
+            raise HLTVCrawlInterrupted(message="Crawl deadline exceeded", reason="deadline")
+        self.pages -= 1
+        return [str(2350000 + i) for i in range(limit)]
+
+
+def test_deadline_expires():
+    deadline = Deadline(0.05)
+    assert not deadline.expired()
+    deadline.check()
+
+    time.sleep(0.06)
+    assert deadline.expired()
+    with pytest.raises(HLTVCrawlInterrupted) as e:
+        deadline.check()
+    assert e.value.reason == "deadline"
+
+
+def test_deadline_cancel():
+    deadline = Deadline()
+    assert deadline.remaining() is None
+
+    deadline.cancel()
+    with pytest.raises(HLTVCrawlInterrupted) as e:
+        deadline.check()
+    assert e.value.reason == "cancelled"
+
+
+def test_deadline_clamps_timeout():
+    assert Deadline().clamp((10, 30)) == (10, 30)
+
+    connect, read = Deadline(5).clamp((10, 30))
+    assert 4 < connect <= 5
+    assert 4 < read <= 5
+
+
+def test_client_does_not_request_past_deadline():
+    deadline = Deadline()
+    deadline.cancel()
+
+    client = HLTVClient(session_pool=FailingPool(), deadline=deadline)
+    with pytest.raises(HLTVCrawlInterrupted):
+        client.get("https://www.hltv.org/results")
+
+
+def test_search_does_not_request_past_deadline(monkeypatch):
+    timeouts = []
+
+    def fake_make_request(self, url, params=None, timeout=None):
+        timeouts.append(timeout)
+        return '[{"id": 6651, "name": "Gambit"}]'
+
+    monkeypatch.setattr(HLTVClient, "_make_request", fake_make_request)
+
+    client = HLTVClient(deadline=Deadline(5))
+    assert client.search_team("Gambit") == [{"id": 6651, "name": "Gambit"}]
+    assert timeouts[0][1] <= 5
+
+    client.deadline.cancel()
+    with pytest.raises(HLTVCrawlInterrupted):
+        client.search_team("Gambit")
+    assert len(timeouts) == 1
+
+
+def test_pool_does_not_wait_past_deadline():
+    session = HLTVSession()
+    session.quarantined_until = time.monotonic() + 300
+    session.session.get = FailingPool().get
+
+    start = time.monotonic()
+    with pytest.raises(HLTVCrawlInterrupted):
+        SessionPool([session]).get("https://www.hltv.org/results", deadline=Deadline(1))
+    assert time.monotonic() - start < 1
+
+
+def test_pool_shortens_timeout_of_each_attempt():
+    timeouts = []
+
+    def get(url, params=None, timeout=None):
+        timeouts.append(timeout)
+        time.sleep(0.2)
+        raise requests.ConnectionError("timed out")
+
+    session = HLTVSession()
+    session.session.get = get
+
+    with pytest.raises(HLTVRequestException):
+        SessionPool([session]).get("https://www.hltv.org/results", max_retry=3,
+                                   deadline=Deadline(5), timeout=(10, 30))
+    assert [t[1] < 5 for t in timeouts] == [True, True, True]
+    assert timeouts[2][1] < timeouts[0][1] - 0.3
+
+
+def test_past_matches_ids_returns_partial_ids(monkeypatch):
+    monkeypatch.setattr(results, "ResultsCursor", InterruptedCursor)
+
+    ids = results.get_past_matches_ids(skip=50, limit=150, deadline=Deadline())
+    assert len(ids) == 100
+    assert ids.stopped_at == {"reason": "deadline", "skip": 150}
+    assert ids.next_skip == 150
+
+
+def test_matches_stats_records_where_it_stopped(monkeypatch):
+    cursor = InterruptedCursor(skip=200)
+    cursor.pages = 0
+    monkeypatch.setattr(matches, "ResultsCursor", lambda **kwargs: cursor)
+
+    df = matches.get_matches_stats(skip=200, limit=10, deadline=Deadline())
+    assert len(df) == 0
+    assert df.attrs["stopped_at"] == {"reason": "deadline", "skip": 200}
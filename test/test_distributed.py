@@ -0,0 +1,152 @@
+import time
+
+import pytest
+
+from hltv_api import distributed
+from hltv_api.distributed import RedisWorkQueue, SQLiteWorkQueue, WorkQueue, run_worker
+
+
+@pytest.fixture
+def redis_queue():
+    fakeredis = pytest.importorskip("fakeredis")
+    # Needed by fakeredis to run the Lua scripts
+    pytest.importorskip("lupa")
+    return RedisWorkQueue(fakeredis.FakeRedis(), name="test", max_attempts=2)
+
+
+def test_sqlite_queue_ignores_duplicates(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+
+    assert queue.put("match", [1, 2, 3]) == 3
+    assert queue.put("match", [2, 3, 4]) == 1
+    assert queue.remaining() == 4
+
+
+def test_sqlite_queue_completes_at_most_once(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    queue.put("match", [2350368])
+
+    lease = queue.lease(lease_seconds=0)
+    time.sleep(0.01)
+
+    # Lease expired, so the item is handed to another worker
+    new_lease = queue.lease(lease_seconds=60)
+    assert new_lease.item_id == lease.item_id
+
+    assert not queue.complete(lease, {"match_id": "2350368"})
+    assert queue.complete(new_lease, {"match_id": "2350368"})
+    assert not queue.complete(new_lease, {"match_id": "2350368"})
+
+    assert queue.lease() is None
+    assert list(queue.results()) == [("match", "2350368", {"match_id": "2350368"})]
+
+
+def test_sqlite_queue_counts_expired_leases_as_attempts(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    queue.put("match", [2350368])
+
+    queue.lease(lease_seconds=0)
+    time.sleep(0.01)
+    # Reclaimed once, the worker holding it being presumably dead
+    assert queue.lease(lease_seconds=0).item_id == "2350368"
+    time.sleep(0.01)
+
+    # Expired a second time, the item is given up
+    assert queue.lease() is None
+    assert queue.remaining() == 0
+
+
+def test_work_queue_is_abstract():
+    with pytest.raises(TypeError):
+        WorkQueue()
+
+
+def test_run_worker_retries_failed_items(tmp_path, monkeypatch):
+    calls = []
+
+    def flaky(match_id, client=None):
+        calls.append(match_id)
+        if len(calls) == 1:
+            raise ValueError("HLTV unavailable")
+        return {"match_id": match_id}
+
+    monkeypatch.setitem(distributed.TASKS, "match", flaky)
+
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    queue.put("match", ["1", "2"])
+
+    assert run_worker(queue) == 2
+    assert queue.remaining() == 0
+    assert sorted(item_id for _, item_id, _ in queue.results()) == ["1", "2"]
+
+
+def test_run_worker_fails_items_without_result(tmp_path, monkeypatch):
+    # get_match_stats_by_id returns an empty dict when the page cannot be parsed
+    monkeypatch.setitem(distributed.TASKS, "match", lambda match_id, client=None: {})
+
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    queue.put("match", ["1"])
+
+    assert run_worker(queue) == 0
+    assert queue.remaining() == 0
+    assert list(queue.results()) == []
+
+
+def test_redis_queue_ignores_duplicates(redis_queue):
+    assert redis_queue.put("match", [1, 2, 3]) == 3
+    assert redis_queue.put("match", [2, 3, 4]) == 1
+    assert redis_queue.put("economy", [1]) == 1
+    assert redis_queue.put("match", []) == 0
+    assert redis_queue.remaining() == 5
+
+
+def test_redis_queue_completes_at_most_once(redis_queue):
+    redis_queue.put("match", [2350368])
+
+    lease = redis_queue.lease(lease_seconds=0)
+    time.sleep(0.01)
+
+    # Lease expired, so the item is handed to another worker
+    new_lease = redis_queue.lease(lease_seconds=60)
+    assert new_lease.item_id == lease.item_id
+
+    assert not redis_queue.complete(lease, {"match_id": "2350368"})
+    assert redis_queue.complete(new_lease, {"match_id": "2350368"})
+    assert not redis_queue.complete(new_lease, {"match_id": "2350368"})
+
+    assert redis_queue.lease() is None
+    assert redis_queue.remaining() == 0
+    assert list(redis_queue.results()) == [("match", "2350368", {"match_id": "2350368"})]
+
+
+def test_redis_queue_gives_up_after_max_attempts(redis_queue):
+    redis_queue.put("match", [1])
+
+    redis_queue.release(redis_queue.lease(), error=ValueError("HLTV unavailable"))
+    lease = redis_queue.lease()
+    assert lease.item_id == "1"
+
+    redis_queue.release(lease)
+    assert redis_queue.lease() is None
+    assert redis_queue.remaining() == 0
+
+
+def test_redis_queue_counts_expired_leases_as_attempts(redis_queue):
+    redis_queue.put("match", [2350368])
+
+    redis_queue.lease(lease_seconds=0)
+    time.sleep(0.01)
+    assert redis_queue.lease(lease_seconds=0).item_id == "2350368"
+    time.sleep(0.01)
+
+    assert redis_queue.lease() is None
+    assert redis_queue.remaining() == 0
+
+
+def test_run_worker_with_redis_queue(redis_queue, monkeypatch):
+    monkeypatch.setitem(distributed.TASKS, "match",
+                        lambda match_id, client=None: {} if match_id == "2" else {"match_id": match_id})
+    redis_queue.put("match", ["1", "2"])
+
+    assert run_worker(redis_queue) == 1
+    assert [item_id for _, item_id, _ in redis_queue.results()] == ["1"]
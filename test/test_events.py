@@ -0,0 +1,95 @@
+import json
+
+from hltv_api.api import events
+from hltv_api.api.events import crawl_events
+from hltv_api.deadline import Deadline
+from hltv_api.models import ROUNDS
+
+
+class FakeCursor:
+    def __init__(self, query, client=None):
+        self.event_id = query.event_ids[0]
+
+    def next_results(self, limit=None):
+        return [{"match_id": "2350368", "date": "2021-09-02"},
+                {"match_id": "2350360", "date": "2021-09-01"}]
+
+
+def fake_economy(match_id, client=None):
+    rounds = {f"{i}_{field}": (4000 if i <= 16 else None)
+              for i in range(1, ROUNDS + 1) for field in ["team_1_value", "team_2_value"]}
+    winners = {f"{i}_winner": (2 if i <= 16 else None) for i in range(1, ROUNDS + 1)}
+    return {"match_id": match_id, "date": "2021-09-02", "event_id": "5553",
+            "team_1": "Gambit", "team_1_id": "6651", "team_2": "Liquid", "team_2_id": "5973",
+            "maps": [{"map": "inferno", "map_stats_id": 1, "team_1_ct": 9, "team_1_t": 6,
+                      "team_2_ct": 6, "team_2_t": 9, "starting_ct": 1, **rounds, **winners}]}
+
+
+def test_crawl_events_only_fetches_incomplete_events(tmp_path, monkeypatch):
+    fetched = []
+
+    def economy(match_id, client=None):
+        fetched.append(match_id)
+        return fake_economy(match_id)
+
+    monkeypatch.setattr(events, "ResultsCursor", FakeCursor)
+    monkeypatch.setattr(events, "get_economy_by_match_id", economy)
+
+    state_path = str(tmp_path / "events.json")
+    df = crawl_events([5553], state_path=state_path)
+
+    assert len(df) == 2
+    assert set(df["event_id"]) == {5553}
+    assert sorted(fetched) == ["2350360", "2350368"]
+
+    with open(state_path) as f:
+        state = json.load(f)
+    assert state["5553"]["complete"]
+    assert state["5553"]["last_date"] == "2021-09-02"
+
+    # Event is complete, nothing is requested again
+    assert len(crawl_events([5553], state_path=state_path)) == 0
+    assert len(fetched) == 2
+
+
+def test_crawl_events_stops_at_deadline_and_resumes(tmp_path, monkeypatch):
+    fetched = []
+    deadline = Deadline()
+
+    def economy(match_id, client=None):
+        # Cancelled, as by Ctrl+C, after the 1st match
+        if len(fetched) == 1:
+            deadline.cancel()
+        client.deadline.check()
+        fetched.append(match_id)
+        return fake_economy(match_id)
+
+    monkeypatch.setattr(events, "ResultsCursor", FakeCursor)
+    monkeypatch.setattr(events, "get_economy_by_match_id", economy)
+
+    state_path = str(tmp_path / "events.json")
+    df = crawl_events([5553], state_path=state_path, deadline=deadline)
+
+    assert len(df) == 1
+    assert df.attrs["stopped_at"] == {"reason": "cancelled", "event_ids": [5553]}
+    with open(state_path) as f:
+        state = json.load(f)
+    assert state["5553"]["fetched"] == ["2350368"]
+    assert state["5553"]["stopped_at"] == {"reason": "cancelled"}
+
+    df = crawl_events([5553], state_path=state_path, deadline=Deadline())
+    assert len(df) == 1
+    assert df.attrs["stopped_at"] is None
+    assert fetched == ["2350368", "2350360"]
+
+
+def test_crawl_events_fetches_matches_concurrently(monkeypatch):
+    monkeypatch.setattr(events, "ResultsCursor", FakeCursor)
+    monkeypatch.setattr(events, "get_economy_by_match_id", fake_economy)
+
+    df = crawl_events([5553], match_workers=2)
+
+    # In the order of the results whatever the number of workers
+    assert list(df["match_id"]) == [2350368, 2350360]
+    assert list(df["1_winner"]) == [2, 2]
+    assert df["17_winner"].isna().all()
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from hltv_api.frames import FrameBuilder, column_dtype
+from hltv_api.pages.results import RESULTS_COLUMNS
+
+
+def test_column_dtypes():
+    assert column_dtype("team_1") == "category"
+    assert column_dtype("date") == "datetime64[ns]"
+    assert column_dtype("match_id") == "Int64"
+    assert column_dtype("12_team_2_value") == "Int64"
+    assert column_dtype("30_winner") == "Int64"
+    assert column_dtype("rating") == "Float64"
+
+
+def test_frame_builder():
+    frame = FrameBuilder(RESULTS_COLUMNS)
+    frame.append([
+        {"match_id": "2350368", "date": "2021-09-02", "event": "ESL Pro League Season 14",
+         "team_1": "Gambit", "team_2": "Liquid", "map": "bo3", "score_1": 2, "score_2": 1,
+         "stars": 2},
+        {"match_id": "2350360", "date": "2021-09-01", "event": "ESL Pro League Season 14",
+         "team_1": "Liquid", "team_2": "FaZe", "map": "bo3", "score_1": 0, "score_2": 2,
+         "stars": None},
+    ])
+    assert len(frame) == 2
+
+    df = frame.to_frame()
+    assert list(df.columns) == RESULTS_COLUMNS
+    assert df["team_1"].dtype == "category"
+    assert df["event"].cat.categories.tolist() == ["ESL Pro League Season 14"]
+    assert df["match_id"].dtype == "Int64"
+    assert df["stars"].isna().tolist() == [False, True]
+    assert df["date"].tolist() == [pd.Timestamp("2021-09-02"), pd.Timestamp("2021-09-01")]
+
+
+def test_empty_frame_keeps_dtypes():
+    df = FrameBuilder(RESULTS_COLUMNS).to_frame()
+    assert len(df) == 0
+    assert df["score_1"].dtype == "Int64"
+    assert df["map"].dtype == "category"
@@ -0,0 +1,57 @@
+from hltv_api.index import EntityIndex
+from hltv_api.query import HLTVQuery
+
+
+class FakeSearchClient:
+    def __init__(self):
+        self.searches = []
+
+    def search_team(self, search_term):
+        self.searches.append(search_term)
+        return [{"id": 4608, "name": "Natus Vincere"}, {"id": 10371, "name": "Natus Vincere Junior"}]
+
+
+def test_prefix_and_fuzzy_lookup():
+    index = EntityIndex()
+    index.add("team", 4608, "Natus Vincere")
+    index.add("team", 10371, "Natus Vincere Junior")
+    index.add("team", 6651, "Gambit")
+
+    assert index.prefix("team", "natus") == [("Natus Vincere", 4608),
+                                             ("Natus Vincere Junior", 10371)]
+    assert index.exact("team", "NATUS VINCERE") == [4608]
+    assert index.fuzzy("team", "gambt") == [("Gambit", 6651)]
+
+    # Names added after a lookup are found
+    index.add("team", 9565, "Vitality")
+    assert index.fuzzy("team", "vitalty") == [("Vitality", 9565)]
+
+
+def test_ingest_match_adds_teams_and_event():
+    index = EntityIndex()
+    index.ingest_match({"match_id": "2350368", "event": "ESL Pro League Season 14", "event_id": "5553",
+                        "team_1": "Gambit", "team_1_id": "6651", "team_2": "Team Liquid",
+                        "team_2_id": "5973", "maps": []})
+
+    assert index.exact("team", "team liquid") == [5973]
+    assert index.prefix("event", "ESL") == [("ESL Pro League Season 14", 5553)]
+
+
+def test_resolve_prefers_exact_matches_and_caches(tmp_path):
+    client = FakeSearchClient()
+    path = str(tmp_path / "index.json")
+    index = EntityIndex(path=path, client=client)
+
+    assert index.resolve("team", "Natus Vincere") == [4608]
+    assert index.resolve("team", "natus vincere") == [4608]
+    assert client.searches == ["Natus Vincere"]
+
+    # Persisted to disk
+    assert EntityIndex(path=path).exact("team", "Natus Vincere Junior") == [10371]
+
+
+def test_query_uses_index():
+    index = EntityIndex(client=FakeSearchClient())
+    query = HLTVQuery(team_ids=[6651], team_names=["Natus Vincere"], index=index)
+
+    assert query.to_params()["team"] == [6651, 4608]
@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+
+from hltv_api.api.matches import MATCHES_COLUMNS
+from hltv_api.frames import FrameBuilder
+from hltv_api.match_index import MATCH_INDEX_COLUMNS, MatchIndex
+from hltv_api.models import match_rows
+
+
+def match(match_id, date, team_1_id, team_2_id, maps, event_id=5553):
+    return {
+        "match_id": str(match_id), "date": date, "event_id": str(event_id),
+        "team_1": f"team {team_1_id}", "team_1_id": str(team_1_id),
+        "team_2": f"team {team_2_id}", "team_2_id": str(team_2_id),
+        "maps": [{"map": map_name, "map_stats_id": match_id * 10 + i, "team_1_ct": 8,
+                  "team_1_t": 8, "team_2_ct": 7, "team_2_t": 5, "starting_ct": 1}
+                 for i, map_name in enumerate(maps)],
+    }
+
+
+def build_index(path=None):
+    index = MatchIndex(path)
+    index.ingest_match(match(3, "2021-09-03", 6651, 4608, ["inferno", "mirage"]))
+    index.ingest_match(match(1, "2021-09-01", 4608, 6651, ["inferno"]))
+    index.ingest_match(match(2, "2021-09-02", 6651, 7175, ["nuke"], event_id=6000))
+    return index
+
+
+def test_find_by_date_range():
+    index = build_index()
+    assert len(index) == 4
+
+    df = index.find(start_date="2021-09-02", end_date="2021-09-03")
+    assert list(df.columns) == MATCH_INDEX_COLUMNS
+    assert list(df["match_id"]) == [2, 3, 3]
+
+    assert list(index.find(end_date="2021-09-01")["match_id"]) == [1]
+    assert list(index.find(event_id=6000)["map"]) == ["nuke"]
+    assert list(index.find(map="inferno")["match_id"]) == [1, 3]
+
+
+def test_head_to_head():
+    index = build_index()
+
+    # Order of the teams does not matter
+    df = index.head_to_head(4608, 6651)
+    assert list(df["match_id"]) == [1, 3, 3]
+    assert list(index.head_to_head(6651, 4608, map="mirage")["match_id"]) == [3]
+    assert len(index.head_to_head(6651, 1)) == 0
+
+
+def test_incremental_ingest_and_persistence(tmp_path):
+    path = str(tmp_path / "matches.json")
+    index = build_index(path)
+
+    # Rows of get_matches_stats, one of them already indexed
+    index.ingest_frame(pd.DataFrame([
+        {"match_id": "3", "date": "2021-09-03", "event_id": "5553", "team_1": "team 6651",
+         "team_2": "team 4608", "team_1_id": "6651", "team_2_id": "4608", "map": "inferno",
+         "map_stats_id": "30", "team_1_ct": 8,
+         "team_2_t": 5, "team_1_t": 8, "team_2_ct": 7, "starting_ct": 1},
+        {"match_id": "4", "date": "2021-09-04", "event_id": "5553", "team_1": "team 6651",
+         "team_2": "team 4608", "team_1_id": "6651", "team_2_id": "4608", "map": "ancient",
+         "map_stats_id": "40", "team_1_ct": 3,
+         "team_2_t": 12, "team_1_t": 5, "team_2_ct": 4, "starting_ct": 2},
+    ]))
+    assert len(index) == 5
+    index.save()
+
+    index = MatchIndex(path)
+    assert list(index.head_to_head(6651, 4608)["match_id"]) == [1, 3, 3, 4]
+
+
+def test_ingest_crawl_frame():
+    frame = FrameBuilder(MATCHES_COLUMNS)
+    for match_id, day, event_id in [(7, 5, 6000), (5, 3, 5553), (6, 4, 6000)]:
+        frame.append_records(match_rows(match(match_id, f"2021-09-0{day}", 6651, 4608,
+                                              ["nuke"], event_id=event_id)))
+
+    index = build_index()
+    index.ingest_frame(frame.to_frame())
+
+    assert list(index.find(event_id=6000)["match_id"]) == [2, 6, 7]
+    assert list(index.find(map="nuke")["match_id"]) == [2, 5, 6, 7]
+    assert list(index.head_to_head(4608, 6651)["match_id"]) == [1, 3, 3, 5, 6, 7]
+
+
+def test_rejects_frames_without_event():
+    df = pd.DataFrame([{"match_id": 5, "date": "2021-09-05", "team_1_id": 6651, "team_2_id": 4608,
+                        "map": "nuke"}])
+    with pytest.raises(ValueError):
+        MatchIndex().ingest_frame(df)
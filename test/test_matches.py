@@ -1,5 +1,74 @@
+import pandas as pd
+from lxml import html
+
+from hltv_api.api import matches
 from hltv_api.query import HLTVQuery
 from hltv_api.api.matches import get_matches_stats, get_match_stats_by_id
+from hltv_api.pages.matches import parse_match_page
+
+from fake_pages import match_page
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeCursor:
+    position = 0
+    buffered = 0
+
+    def __init__(self, **kwargs):
+        self.ids = ["2350368", "2350369"]
+
+    def seek(self, position):
+        self.position = position
+
+    def next_ids(self, limit=None):
+        ids, self.ids = self.ids[:limit], self.ids[limit:]
+        return ids
+
+
+def test_parse_vetoes():
+    match = parse_match_page(html.fromstring(match_page(2350368)))
+
+    assert (match["event"], match["event_id"]) == ("Event", "5553")
+    assert [m["map"] for m in match["maps"]] == ["ancient", "inferno"]
+    assert [(v["step"], v["team"], v["action"], v["map"]) for v in match["vetoes"]] == [
+        (1, 1, "ban", "overpass"),
+        (2, 2, "ban", "vertigo"),
+        (3, 1, "pick", "ancient"),
+        (4, 2, "pick", "inferno"),
+        (5, 1, "ban", "dust2"),
+        (6, 2, "ban", "mirage"),
+        (7, None, "decider", "nuke"),
+    ]
+    assert [v["map"] for v in match["vetoes"] if v["played"]] == ["ancient", "inferno"]
+
+
+def test_parse_match_without_veto():
+    page = match_page(2350368).replace("veto-box", "other-box")
+    assert parse_match_page(html.fromstring(page))["vetoes"] == []
+
+
+def test_matches_stats_include_vetoes(monkeypatch):
+    requests = []
+
+    def fake_get(self, url, params=None):
+        requests.append(url)
+        return FakeResponse(match_page(url.split("/")[-2]))
+
+    monkeypatch.setattr(matches, "ResultsCursor", FakeCursor)
+    monkeypatch.setattr(matches.HLTVClient, "get", fake_get)
+
+    df, vetoes = get_matches_stats(limit=None, include_vetoes=True)
+
+    # No extra request for the vetoes
+    assert len(requests) == 2
+    assert len(df) == 4
+    assert list(vetoes.columns) == ["match_id", "step", "team", "action", "map", "played"]
+    assert vetoes["match_id"].tolist() == [2350368] * 7 + [2350369] * 7
+    assert vetoes["played"].sum() == 4
 
 
 def test_matches_stats_limit_zero():
@@ -28,13 +97,15 @@ def test_matches_stats_simple_query():
     # 2nd map
     game = df.iloc[1, :].to_dict()
     assert game == {
-       "match_id": "2350368",
-       "date": "2021-09-02",
+       "match_id": 2350368,
+       "date": pd.Timestamp("2021-09-02"),
+       "event_id": 5553,
        "team_1": "Gambit",
        "team_2": "Liquid",
-       "team_1_id": "6651",
-       "team_2_id": "5973",
+       "team_1_id": 6651,
+       "team_2_id": 5973,
        "map": "vertigo",
+       "map_stats_id": 125814,
        "team_1_ct": 9,
        "team_2_t": 6,
        "team_1_t": 6,
@@ -59,3 +130,22 @@ def test_match_stats_by_match_id():
         "team_2_ct": 9,
         "starting_ct": 2
     }
+
+
+def test_matches_stats_logs_errors_without_exceptions(monkeypatch, caplog):
+    def fake_get(self, url, params=None):
+        match_id = url.split("/")[-2]
+        page = match_page(match_id)
+        # Layout change on the 2nd match
+        return FakeResponse(page.replace("teamName", "team-name") if match_id == "2350369" else page)
+
+    monkeypatch.setattr(matches, "ResultsCursor", FakeCursor)
+    monkeypatch.setattr(matches.HLTVClient, "get", fake_get)
+
+    df = get_matches_stats(limit=None)
+
+    assert df["match_id"].tolist() == [2350368, 2350368]
+    # Records holding the exceptions would keep the pages of their tracebacks alive
+    assert len(caplog.records) > 0
+    assert all(isinstance(record.msg, str) and record.exc_info is None
+               for record in caplog.records)
@@ -0,0 +1,83 @@
+import pickle
+
+import pandas as pd
+import pytest
+
+from dataclasses import FrozenInstanceError
+
+from hltv_api.api.matches import MATCHES_COLUMNS
+from hltv_api.frames import FrameBuilder
+from hltv_api.models import MapEconomy, MatchDetail, ResultRow, match_rows, records_to_frame
+
+MATCH = {
+    "date": "2021-09-02",
+    "match_id": "2350368",
+    "event_id": "5553",
+    "team_1": "Gambit",
+    "team_1_id": "6651",
+    "team_2": "Liquid",
+    "team_2_id": "5973",
+    "maps": [{
+        "map": "vertigo",
+        "map_stats_id": 125814,
+        "team_1_ct": 9,
+        "team_2_t": 6,
+        "team_1_t": 6,
+        "team_2_ct": 9,
+        "starting_ct": 2
+    }]
+}
+
+
+def test_match_detail_ids_are_integers():
+    match = MatchDetail.from_dict(MATCH)
+
+    assert match.match_id == 2350368
+    assert match.team_1_id == 6651
+    assert match.event_id == 5553
+    assert match.maps[0].match_id == 2350368
+    assert match.maps[0].team_1_ct == 9
+
+
+def test_records_are_immutable_and_picklable():
+    match = MatchDetail.from_dict(MATCH)
+
+    with pytest.raises(FrozenInstanceError):
+        match.match_id = 1
+
+    assert not hasattr(match, "__dict__")
+    assert pickle.loads(pickle.dumps(match)) == match
+
+
+def test_records_to_frame():
+    results = [ResultRow.from_dict({
+        "match_id": str(match_id), "date": "2021-09-02", "event": "ESL Pro League Season 14",
+        "team_1": "Gambit", "team_2": "Liquid", "map": "bo3",
+        "score_1": 2, "score_2": 1, "stars": 2
+    }) for match_id in [2350368, 2351027]]
+
+    df = records_to_frame(results)
+
+    assert list(df.columns) == list(ResultRow.COLUMNS)
+    assert list(df["match_id"]) == [2350368, 2351027]
+
+
+def test_map_economy_columns_match_economy_page():
+    economy = {f"{i}_{field}": (i if i < 24 else None)
+               for i in range(1, 31) for field in ["team_1_value", "team_2_value", "winner"]}
+    record = MapEconomy.from_dict(economy, map_stats_id=125815)
+
+    assert record.to_dict() == {"map_stats_id": 125815, **economy}
+
+
+def test_match_rows_build_crawl_frames():
+    frame = FrameBuilder(MATCHES_COLUMNS)
+    frame.append_records(match_rows(MATCH))
+
+    df = frame.to_frame()
+    assert df.to_dict("records") == [{
+        "match_id": 2350368, "date": pd.Timestamp("2021-09-02"), "event_id": 5553,
+        "team_1": "Gambit", "team_2": "Liquid", "team_1_id": 6651, "team_2_id": 5973,
+        "map": "vertigo", "map_stats_id": 125814, "team_1_ct": 9, "team_2_t": 6, "team_1_t": 6, "team_2_ct": 9, "starting_ct": 2,
+    }]
+    assert df["team_1"].dtype == "category"
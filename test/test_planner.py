@@ -0,0 +1,97 @@
+from hltv_api import planner as planner_module
+from hltv_api.planner import BatchQueryPlanner, CachedSearchClient
+from hltv_api.query import HLTVQuery
+
+
+class FakeSearchClient:
+    def __init__(self):
+        self.searches = []
+
+    def search_team(self, search_term):
+        self.searches.append(search_term)
+        return [{"id": 6651}]
+
+    def search_player(self, search_term):
+        return []
+
+    def search_event(self, search_term):
+        return []
+
+
+def test_cached_search_client_searches_each_name_once():
+    client = FakeSearchClient()
+    queries = [HLTVQuery(team_names=["Gambit"]), HLTVQuery(team_names=["gambit"])]
+
+    planner = BatchQueryPlanner(queries, client=client)
+
+    assert client.searches == ["Gambit"]
+    assert [params["team"] for params in planner.params] == [[6651], [6651]]
+
+
+def test_planner_merges_overlapping_dates():
+    queries = [
+        HLTVQuery(team_ids=[6651], start_date="2021-01-01", end_date="2021-03-01"),
+        HLTVQuery(team_ids=[6651], start_date="2021-02-01", end_date="2021-06-01"),
+        HLTVQuery(team_ids=[6651], start_date="2021-09-01", end_date="2021-10-01"),
+        HLTVQuery(team_ids=[4608], start_date="2021-02-01", end_date="2021-06-01"),
+        HLTVQuery(start_date="2021-01-01"),
+    ]
+    planner = BatchQueryPlanner(queries, client=FakeSearchClient())
+
+    assert sorted(crawl.members for crawl in planner.crawls) == [[0, 1], [2], [3], [4]]
+
+    merged = next(crawl for crawl in planner.crawls if crawl.members == [0, 1])
+    assert merged.params["startDate"] == "2021-01-01"
+    assert merged.params["endDate"] == "2021-06-01"
+    assert merged.params["team"] == [6651]
+
+    match = {"date": "2021-02-15", "team_1_id": "6651", "team_2_id": "5973", "event_id": "5000"}
+    assert merged.route(match) == [0, 1]
+    assert merged.route({**match, "date": "2021-05-01"}) == [1]
+
+
+# (match ID, date, team ID) of the matches listed on /results
+RESULTS = [(1, "2021-01-15", 6651), (2, "2021-02-15", 6651), (3, "2021-05-15", 6651),
+           (4, "2021-01-15", 4608), (5, "2021-02-15", 4608), (6, "2021-05-15", 4608)]
+
+
+class FakeResultsCursor:
+    def __init__(self, params=None, config=None):
+        self.params = params
+
+    def next_ids(self, limit=None):
+        return [match_id for match_id, date, team_id in RESULTS
+                if (len(self.params["team"]) == 0 or team_id in self.params["team"])
+                and self.params["startDate"] <= date <= self.params["endDate"]]
+
+
+def test_planner_only_fetches_matches_of_the_queries(monkeypatch):
+    monkeypatch.setattr(planner_module, "ResultsCursor", FakeResultsCursor)
+    queries = [
+        HLTVQuery(team_ids=[6651], start_date="2021-01-01", end_date="2021-03-01"),
+        HLTVQuery(team_ids=[4608], start_date="2021-02-01", end_date="2021-06-01"),
+    ]
+    planner = BatchQueryPlanner(queries, client=FakeSearchClient())
+
+    fetched = []
+
+    def fetch(match_id):
+        fetched.append(match_id)
+        _, date, team_id = RESULTS[match_id - 1]
+        return {"match_id": match_id, "date": date, "team_1_id": team_id, "team_2_id": 1,
+                "event_id": 5000}
+
+    routed = planner.fetch(fetch)
+
+    assert sorted(fetched) == [1, 2, 5, 6]
+    assert [[match["match_id"] for match in matches] for matches in routed] == [[1, 2], [5, 6]]
+
+
+def test_planner_keeps_require_all_teams_separate():
+    queries = [
+        HLTVQuery(team_ids=[6651, 4608], require_all_teams=True),
+        HLTVQuery(team_ids=[6651, 5973], require_all_teams=True),
+    ]
+    planner = BatchQueryPlanner(queries, client=FakeSearchClient())
+
+    assert len(planner.crawls) == 2
@@ -0,0 +1,136 @@
+import pytest
+from lxml import html
+
+from hltv_api.api import players
+from hltv_api.api.players import (get_economy_and_players_by_match_id,
+                                  get_map_stats_by_map_stats_id)
+from hltv_api.common import ClientConfig
+from hltv_api.exceptions import HLTVRequestException
+from hltv_api.pages.players import parse_map_stat_players_page
+
+from fake_pages import players_table
+
+
+def test_parse_map_stat_players_page():
+    page = "<html><body>{}{}{}</body></html>".format(
+        players_table("Natus Vincere", [(7998, "s1mple")]),
+        players_table("Gambit", [(9816, "Ax1Le")]),
+        # Side breakdown, must be ignored
+        players_table("Natus Vincere", [(7998, "s1mple")]).replace("totalstats", "ctstats hidden"),
+    )
+
+    players = parse_map_stat_players_page(html.fromstring(page))
+
+    assert len(players) == 2
+    assert players[0] == {
+        "team": 1,
+        "player_id": 7998,
+        "player": "s1mple",
+        "kills": 25,
+        "headshots": 10,
+        "assists": 3,
+        "flash_assists": 1,
+        "deaths": 15,
+        "kast": 75.0,
+        "kd_diff": 10,
+        "adr": 95.2,
+        "fk_diff": -2,
+        "rating": 1.45,
+    }
+    assert players[1]["team"] == 2
+    assert players[1]["player_id"] == 9816
+
+
+def test_get_economy_and_players_by_match_id():
+    res = get_economy_and_players_by_match_id(2350360)
+
+    # Correct number of maps
+    assert len(res["maps"]) == 2
+
+    # 5 players per team on each map
+    inferno = res["maps"][0]
+    assert len(inferno["players"]) == 10
+    assert inferno["1_team_1_value"] == 4400
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeClient:
+    config = ClientConfig()
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def get(self, url):
+        return FakeResponse(self.pages[url])
+
+
+class RecordingMonitor:
+    def __init__(self):
+        self.observed = []
+
+    def observe(self, kind, problems, url=None, text=None):
+        self.observed.append((kind, problems, url))
+
+
+def test_map_stats_reports_players_parse_failure(economy_page):
+    config = ClientConfig()
+    overview_url = config.url("map_stats_uri", 123069, "foo")
+    # The overview page lost the kills column
+    broken_table = players_table("Gambit", [(9816, "Ax1Le")]).replace("st-kills", "st-frags")
+    client = FakeClient({
+        config.url("economy_uri", 123069, "foo"): economy_page(16),
+        overview_url: f"<html><body>{broken_table}</body></html>",
+    })
+    monitor = RecordingMonitor()
+
+    with pytest.raises(IndexError):
+        get_map_stats_by_map_stats_id(123069, monitor=monitor, client=client)
+
+    kind, problems, url = monitor.observed[-1]
+    assert kind == "players"
+    assert problems[0].startswith("parse_map_stat_players_page failed")
+    assert url == overview_url
+
+
+class FakeCursor:
+    position = 0
+    buffered = 0
+
+    def __init__(self, **kwargs):
+        self.ids = ["2350368", "2350369", "2350370"]
+
+    def next_ids(self, limit=None):
+        ids, self.ids = self.ids[:limit], self.ids[limit:]
+        return ids
+
+    def seek(self, position):
+        self.position = position
+
+
+def test_players_stats_skips_failed_matches(monkeypatch, caplog):
+    def fake_match(match_id, monitor=None, client=None):
+        if match_id == "2350369":
+            raise HLTVRequestException(message="GET failed with status 503", status_code=503,
+                                       response=None)
+        economy = {f"{i}_{field}": None
+                   for i in range(1, 31) for field in ["team_1_value", "team_2_value", "winner"]}
+        return {"match_id": match_id, "date": "2021-09-02", "event_id": "5553",
+                "team_1": "Gambit", "team_1_id": "6651", "team_2": "Liquid", "team_2_id": "5973",
+                "maps": [{"map": "nuke", "map_stats_id": 1, "team_1_ct": 8, "team_1_t": 8,
+                          "team_2_ct": 7, "team_2_t": 7, "starting_ct": 1, **economy,
+                          "players": [{"player_id": 7998, "player": "s1mple"}]}]}
+
+    monkeypatch.setattr(players, "ResultsCursor", FakeCursor)
+    monkeypatch.setattr(players, "get_economy_and_players_by_match_id", fake_match)
+
+    players_df, economy_df = players.get_players_stats(include_economy=True, workers=2)
+
+    assert players_df["match_id"].tolist() == [2350368, 2350370]
+    assert len(economy_df) == 2
+    assert players_df.attrs["next_skip"] == 3
+    assert players_df.attrs["stopped_at"] is None
+    assert "Error parsing players statistics for 2350369" in caplog.text
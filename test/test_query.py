@@ -2,12 +2,14 @@ import pytest
 
 from datetime import datetime
 
+from hltv_api.common import ClientConfig
 from hltv_api.query import HLTVQuery
 from hltv_api.exceptions import HLTVInvalidInputException
 
 def test_query_correct_default_values():
     hltv_query = HLTVQuery()
     assert hltv_query.to_params() == {
+            "matchType" : None,
             "startDate" : None,
             "endDate" : None,
             "map" : [],
@@ -37,6 +39,21 @@ def test_query_parse_dates_from_datetime():
     assert param["startDate"] == "2020-01-15"
     assert param["endDate"] == "2020-01-15"
 
+def test_query_dates_use_config_format():
+    config = ClientConfig(date_format="%d/%m/%Y")
+
+    hltv_query = HLTVQuery(start_date="2020-01-15", end_date=datetime(2020, 2, 1), config=config)
+    param = hltv_query.to_params()
+    assert param["startDate"] == "15/01/2020"
+    assert param["endDate"] == "01/02/2020"
+
+def test_query_match_type():
+    assert HLTVQuery(match_type="LAN").to_params()["matchType"] == "Lan"
+    assert HLTVQuery(match_type="online").to_params()["matchType"] == "Online"
+
+    with pytest.raises(HLTVInvalidInputException):
+        HLTVQuery(match_type="lan, online")
+
 def test_query_invalid_maps_throw_error():
     with pytest.raises(HLTVInvalidInputException) as e:
         hltv_query = HLTVQuery(maps=["invalid_map"])
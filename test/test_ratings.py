@@ -0,0 +1,162 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hltv_api.ratings import TeamRatings
+
+
+def random_maps(n, teams=30, seed=0, start="2021-01-01"):
+    """Frame of `n` maps in the format of `get_matches_stats`, newest first as on HLTV."""
+    rng = np.random.default_rng(seed)
+    team_1 = rng.integers(0, teams, n)
+    team_2 = (team_1 + rng.integers(1, teams, n)) % teams
+    rounds_1 = rng.integers(0, 17, n)
+    rounds_2 = np.where(rounds_1 == 16, rng.integers(0, 15, n), 16)
+
+    df = pd.DataFrame({
+        "match_id": np.arange(2300000, 2300000 + n),
+        "date": pd.Timestamp(start) + pd.to_timedelta(np.arange(n) // 20, unit="D"),
+        "team_1_id": pd.array(team_1 + 4000, dtype="Int64"),
+        "team_2_id": pd.array(team_2 + 4000, dtype="Int64"),
+        "map": pd.Categorical(rng.choice(["inferno", "mirage", "nuke"], n)),
+        "team_1_ct": pd.array(rounds_1 // 2, dtype="Int64"),
+        "team_1_t": pd.array(rounds_1 - rounds_1 // 2, dtype="Int64"),
+        "team_2_ct": pd.array(rounds_2 // 2, dtype="Int64"),
+        "team_2_t": pd.array(rounds_2 - rounds_2 // 2, dtype="Int64"),
+    })
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def sequential_elo(df, k=32.0, initial=1500.0):
+    ratings = {}
+    for row in df.sort_values(["date", "match_id"]).itertuples():
+        r_1, r_2 = ratings.get(row.team_1_id, initial), ratings.get(row.team_2_id, initial)
+        score_1 = row.team_1_ct + row.team_1_t
+        score_2 = row.team_2_ct + row.team_2_t
+        s = 1.0 if score_1 > score_2 else 0.0 if score_1 < score_2 else 0.5
+        e = 1.0 / (1.0 + 10.0 ** ((r_2 - r_1) / 400.0))
+        ratings[row.team_1_id] = r_1 + k * (s - e)
+        ratings[row.team_2_id] = r_2 - k * (s - e)
+    return ratings
+
+
+def test_matches_sequential_elo():
+    df = random_maps(2000)
+    ratings = TeamRatings()
+    ratings.update(df)
+
+    expected = sequential_elo(df)
+    assert len(ratings) == len(expected)
+    for team, rating in expected.items():
+        assert ratings.rating(team) == pytest.approx(rating)
+
+
+def test_incremental_updates_match_full_recompute():
+    df = random_maps(1000)
+    by_date = df.sort_values("date")
+
+    incremental = TeamRatings()
+    for _, day in by_date.groupby("date"):
+        incremental.update(day)
+
+    full = TeamRatings()
+    full.update(df)
+
+    pd.testing.assert_frame_equal(incremental.to_frame(), full.to_frame())
+
+
+def test_update_returns_ratings_before_the_game():
+    df = pd.DataFrame({
+        "match_id": [2, 1],
+        "date": ["2021-09-02", "2021-09-01"],
+        "team_1": ["Gambit", "Gambit"],
+        "team_2": ["Liquid", "Liquid"],
+        "score_1": [2, 0],
+        "score_2": [1, 2],
+    })
+    ratings = TeamRatings(k=32)
+    result = ratings.update(df)
+
+    # 1st game, on the 2nd row, is played at the initial ratings
+    assert result.loc[1].tolist() == [1500.0, 1500.0, 0.5]
+    assert result.loc[0, "rating_1"] == 1484.0
+    assert ratings.form("Gambit") == 0.5
+    assert np.isnan(ratings.form("Natus Vincere"))
+
+
+def test_rejects_games_before_last_date():
+    df = random_maps(100)
+    ratings = TeamRatings()
+    ratings.update(df[df["date"] > "2021-01-02"])
+
+    with pytest.raises(ValueError):
+        ratings.update(df[df["date"] == "2021-01-01"])
+
+
+def test_skips_matches_already_rated():
+    df = random_maps(300)
+    full = TeamRatings()
+    full.update(df)
+
+    ratings = TeamRatings()
+    ratings.update(df[df["date"] <= "2021-01-08"])
+    result = ratings.update(df)
+    ratings.update(df)
+
+    pd.testing.assert_frame_equal(ratings.to_frame(), full.to_frame())
+    assert result["rating_1"].notna().sum() == (df["date"] > "2021-01-08").sum()
+
+
+def test_accepts_same_day_games_out_of_id_order():
+    df = pd.DataFrame({
+        "match_id": [2350400, 2350300],
+        "date": ["2021-09-02", "2021-09-02"],
+        "team_1": ["Gambit", "Liquid"],
+        "team_2": ["Liquid", "Gambit"],
+        "score_1": [2, 2],
+        "score_2": [0, 1],
+    })
+    ratings = TeamRatings(k=32)
+    ratings.update(df.iloc[:1])
+    result = ratings.update(df.iloc[1:])
+
+    # Played after the first game, with the ratings it gave
+    assert result.loc[1].tolist() == [1484.0, 1516.0, pytest.approx(0.454, abs=1e-3)]
+    assert ratings.update(df)["rating_1"].isna().all()
+
+
+def test_ratings_by_map_and_persistence(tmp_path):
+    df = random_maps(500)
+    path = str(tmp_path / "ratings.json")
+
+    ratings = TeamRatings(by_map=True, path=path)
+    ratings.update(df)
+    ratings.save()
+
+    expected = sequential_elo(df[df["map"] == "inferno"])
+    assert ratings.rating(4000, map="inferno") == pytest.approx(expected[4000])
+    assert set(ratings.to_frame()["map"]) == {"inferno", "mirage", "nuke"}
+
+    loaded = TeamRatings(path=path)
+    assert loaded.by_map
+    assert loaded.update(df)["rating_1"].isna().all()
+    pd.testing.assert_frame_equal(loaded.to_frame(), ratings.to_frame())
+
+
+def test_ignores_incomplete_rows():
+    df = random_maps(10)
+    df.loc[0, "team_1_ct"] = pd.NA
+    df.loc[1, "team_2_id"] = pd.NA
+
+    result = TeamRatings().update(df)
+    assert result["rating_1"].isna().tolist() == [True, True] + [False] * 8
+
+
+def test_full_recompute_is_fast():
+    df = random_maps(100000, teams=500)
+
+    start = time.perf_counter()
+    TeamRatings().update(df)
+    assert time.perf_counter() - start < 10
@@ -1,5 +1,7 @@
 from datetime import datetime
 
+import pandas as pd
+
 from hltv_api.api.results import get_past_matches_ids, get_results
 from hltv_api.query import HLTVQuery
 
@@ -33,8 +35,8 @@ def test_get_result_with_simple_query():
 
     res = df.iloc[0, :].to_dict()
     assert res == {
-        "match_id": "2350368",
-        "date": "2021-09-02",
+        "match_id": 2350368,
+        "date": pd.Timestamp("2021-09-02"),
         "event": "ESL Pro League Season 14",
         "team_1": "Gambit",
         "team_2": "Liquid",
@@ -56,8 +58,8 @@ def test_get_result_complex_filter():
     # Comparing 2nd result 
     game = df.iloc[1, :].to_dict()
     assert game == {
-        "match_id": "2349630",
-        "date": "2021-07-03",
+        "match_id": 2349630,
+        "date": pd.Timestamp("2021-07-03"),
         "event": "StarLadder CIS RMR 2021",
         "team_1": "Gambit",
         "team_2": "Natus Vincere",
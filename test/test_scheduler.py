@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from hltv_api.client import HLTVClient
+from hltv_api.deadline import Deadline
+from hltv_api.exceptions import HLTVCrawlInterrupted
+from hltv_api.scheduler import PriorityClass, RequestScheduler
+
+
+def start_waiting(scheduler, name, started):
+    def run():
+        with scheduler.slot(name):
+            started.append(name)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    # Lets the thread queue up before the next one
+    time.sleep(0.05)
+    return thread
+
+
+def test_interactive_requests_go_first():
+    scheduler = RequestScheduler(max_concurrency=1)
+    started = []
+
+    scheduler.acquire("batch")
+    threads = [start_waiting(scheduler, "batch", started),
+               start_waiting(scheduler, "batch", started),
+               start_waiting(scheduler, "interactive", started)]
+    scheduler.release("batch")
+
+    for thread in threads:
+        thread.join(timeout=5)
+    assert started == ["interactive", "batch", "batch"]
+
+
+def test_concurrency_per_class():
+    scheduler = RequestScheduler(max_concurrency=4, classes={
+        "interactive": PriorityClass(priority=0, max_concurrency=2, rate_share=0.5),
+        "batch": PriorityClass(priority=1, max_concurrency=1, rate_share=0.5),
+    })
+
+    assert scheduler.acquire("batch")
+    assert not scheduler.acquire("batch", timeout=0.05)
+    # Other classes are not blocked by the batch limit
+    assert scheduler.acquire("interactive", timeout=0.05)
+
+    scheduler.release("batch")
+    assert scheduler.acquire("batch", timeout=0.05)
+
+
+def test_class_alone_uses_the_whole_rate():
+    scheduler = RequestScheduler(rate=50)
+
+    start = time.monotonic()
+    for _ in range(5):
+        with scheduler.slot("batch"):
+            pass
+
+    # 4 intervals of the whole rate, instead of its share of 30%
+    assert time.monotonic() - start < 0.2
+
+
+def test_client_waits_for_scheduler_until_deadline():
+    scheduler = RequestScheduler(max_concurrency=1)
+    scheduler.acquire("batch")
+
+    client = HLTVClient(scheduler=scheduler, deadline=Deadline(0.1), priority="batch")
+    with pytest.raises(HLTVCrawlInterrupted):
+        client.get("https://www.hltv.org/results")
@@ -0,0 +1,74 @@
+import pytest
+
+from hltv_api.common import ClientConfig
+from hltv_api.exceptions import HLTVRequestException
+from hltv_api.sessions import HLTVSession, SessionPool, endpoint_class
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def fake_session(status_codes):
+    session = HLTVSession()
+    session.calls = 0
+
+    def get(url, params=None, **kwargs):
+        session.calls += 1
+        return FakeResponse(status_codes[min(session.calls, len(status_codes)) - 1])
+
+    session.session.get = get
+    return session
+
+
+def test_endpoint_class():
+    assert endpoint_class("https://www.hltv.org/results") == "results"
+    assert endpoint_class("https://www.hltv.org/matches/2350368/foo") == "matches"
+    assert endpoint_class("https://www.hltv.org/stats/matches/economy/mapstatsid/125815/foo") == "economy"
+    assert endpoint_class("https://www.hltv.org/searchTeam") == "search"
+
+    config = ClientConfig(search_events_uri="api/events")
+    assert endpoint_class("http://mirror/api/events", config) == "search"
+    assert endpoint_class("http://mirror/searching", config) == "other"
+
+
+def test_pool_rotates_between_healthy_sessions():
+    sessions = [fake_session([200]), fake_session([200])]
+    pool = SessionPool(sessions)
+
+    for _ in range(4):
+        pool.get("https://www.hltv.org/results")
+
+    assert [s.calls for s in sessions] == [2, 2]
+
+
+def test_pool_quarantines_throttled_sessions():
+    throttled, healthy = fake_session([429]), fake_session([200])
+    pool = SessionPool([throttled, healthy])
+
+    for _ in range(3):
+        assert pool.get("https://www.hltv.org/results").status_code == 200
+
+    # Retried on the healthy session, then never used again
+    assert throttled.calls == 1
+    assert healthy.calls == 3
+    assert throttled.endpoint_health("results").success_rate == 0.0
+
+
+def test_pool_waits_for_short_quarantine():
+    session = fake_session([429, 200])
+    pool = SessionPool([session], quarantine_seconds=0.05)
+
+    assert pool.get("https://www.hltv.org/results").status_code == 200
+    assert session.calls == 2
+
+
+def test_pool_fails_rather_than_wait_for_long_quarantine():
+    session = fake_session([429, 200])
+    pool = SessionPool([session], quarantine_seconds=300, max_quarantine_wait=1)
+
+    with pytest.raises(HLTVRequestException) as e:
+        pool.get("https://www.hltv.org/results")
+    assert e.value.status_code == 429
+    assert session.calls == 1
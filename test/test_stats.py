@@ -1,4 +1,7 @@
+from lxml import html
+
 from hltv_api.api.stats import get_economy_by_match_id, get_matches_with_economy
+from hltv_api.pages.stats import parse_map_stat_economy_html, parse_map_stat_economy_page
 
 
 def test_matches_stats_limit_zero():
@@ -47,3 +50,20 @@ def test_get_economy_by_match_id():
     assert inferno["24_team_1_value"] is None
     assert inferno["24_team_2_value"] is None
     assert inferno["24_winner"] is None
+
+
+def test_economy_scanner_matches_dom_parser(economy_page):
+    for rounds in [16, 23, 30]:
+        page = economy_page(rounds)
+        assert parse_map_stat_economy_html(page) == \
+            parse_map_stat_economy_page(html.fromstring(page))
+
+
+def test_economy_scanner_falls_back_to_dom_parser(economy_page):
+    # Attributes in single quotes are not handled by the scanner
+    page = economy_page(23).replace('"', "'")
+    economy = parse_map_stat_economy_html(page)
+
+    assert economy["1_team_1_value"] == 4001
+    assert economy["1_winner"] == 2
+    assert economy["24_winner"] is None
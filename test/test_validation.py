@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+from hltv_api.api import matches
+from hltv_api.exceptions import HLTVParserDriftException
+from hltv_api.validation import ParseMonitor, validate_economy, validate_match
+
+MATCH = {
+    "date": "2021-09-02", "match_id": "2350368", "event_id": "5553",
+    "team_1": "Gambit", "team_1_id": "6651", "team_2": "Heroic", "team_2_id": "7175",
+    "maps": [{"map": "inferno", "map_stats_id": 123069, "team_1_t": 4, "team_1_ct": 12,
+              "team_2_t": 3, "team_2_ct": 8, "starting_ct": 1}],
+}
+
+
+class FakeResponse:
+    text = "<html><body><div class='redesigned-layout'></div></body></html>"
+
+
+class FakeCursor:
+    position = 0
+    buffered = 0
+
+    def __init__(self, **kwargs):
+        pass
+
+    def seek(self, position):
+        self.position = position
+
+    def next_ids(self, limit=None):
+        return [str(2350000 + i) for i in range(limit)]
+
+
+def economy(rounds):
+    return {
+        **{f"{i}_team_1_value": 4000 for i in range(1, rounds + 1)},
+        **{f"{i}_team_2_value": 4200 for i in range(1, rounds + 1)},
+        **{f"{i}_winner": 1 + i % 2 for i in range(1, rounds + 1)},
+        **{f"{i}_{field}": None for i in range(rounds + 1, 31)
+           for field in ["team_1_value", "team_2_value", "winner"]},
+    }
+
+
+def test_validate_match():
+    assert validate_match(MATCH) == []
+    assert validate_match({}) == ["match page could not be parsed"]
+
+    broken = {**MATCH, "team_2_id": "", "maps": [{**MATCH["maps"][0], "starting_ct": None}]}
+    assert len(validate_match(broken)) == 2
+
+
+def test_validate_economy():
+    assert validate_economy(economy(16)) == []
+    assert validate_economy(economy(0)) == ["no round played"]
+    assert len(validate_economy({**economy(16), "3_winner": None, "3_team_1_value": None,
+                                 "3_team_2_value": None})) == 13
+
+
+def test_monitor_raises_after_window(tmp_path):
+    monitor = ParseMonitor(max_failure_rate=0.5, window=4, samples_dir=str(tmp_path), max_samples=2)
+
+    monitor.observe("match", [], url="ok", text="<html></html>")
+    for i in range(2):
+        monitor.observe("match", ["team_1 is empty"], url=f"broken-{i}", text="<html></html>")
+
+    with pytest.raises(HLTVParserDriftException) as e:
+        monitor.observe("match", ["team_1 is empty"], url="broken-2", text="<html></html>")
+
+    assert e.value.failure_rate == 0.75
+    assert [sample["url"] for sample in e.value.samples] == ["broken-0", "broken-1"]
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_monitor_pauses_before_raising(tmp_path, monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    monitor = ParseMonitor(window=2, samples_dir=str(tmp_path), pause_seconds=60)
+
+    monitor.observe("economy", ["no round played"])
+    monitor.observe("economy", ["no round played"])
+
+    monitor.observe("economy", ["no round played"])
+    with pytest.raises(HLTVParserDriftException):
+        monitor.observe("economy", ["no round played"])
+
+
+def test_matches_stats_stops_on_layout_change(tmp_path, monkeypatch):
+    requests = []
+
+    def fake_get(self, url, params=None):
+        requests.append(url)
+        return FakeResponse()
+
+    monkeypatch.setattr(matches, "ResultsCursor", FakeCursor)
+    monkeypatch.setattr(matches.HLTVClient, "get", fake_get)
+
+    monitor = ParseMonitor(window=5, samples_dir=str(tmp_path))
+    with pytest.raises(HLTVParserDriftException) as e:
+        matches.get_matches_stats(limit=100, monitor=monitor)
+
+    assert len(requests) == 5
+    assert len(e.value.partial) == 0
+    assert e.value.stopped_at == {"reason": "drift", "skip": 4}
+
+
+def test_drift_keeps_the_rows_collected(monkeypatch):
+    def fake_match(match_id, monitor=None, client=None):
+        if match_id == "2350003":
+            raise HLTVParserDriftException(message="Layout changed", kind="match",
+                                           failure_rate=1.0, samples=[])
+        return {"match_id": match_id, "date": "2021-09-02", "event_id": "5553",
+                "team_1": "Gambit", "team_1_id": "6651", "team_2": "Liquid", "team_2_id": "5973",
+                "maps": [{"map": "nuke", "map_stats_id": 1, "team_1_ct": 8, "team_1_t": 8,
+                          "team_2_ct": 7, "team_2_t": 7, "starting_ct": 1}],
+                "vetoes": []}
+
+    monkeypatch.setattr(matches, "ResultsCursor", FakeCursor)
+    monkeypatch.setattr(matches, "get_match_stats_by_id", fake_match)
+
+    with pytest.raises(HLTVParserDriftException) as e:
+        matches.get_matches_stats(limit=100, include_vetoes=True)
+
+    df, vetoes = e.value.partial
+    assert df["match_id"].tolist() == [2350000, 2350001, 2350002]
+    assert df.attrs["stopped_at"] == e.value.stopped_at == {"reason": "drift", "skip": 3}
@@ -0,0 +1,155 @@
+import itertools
+import time
+
+import pytest
+
+from hltv_api.api import results
+from hltv_api.common import ClientConfig
+from hltv_api.workers import items_needed, ordered_map, pool_size, prefetch, worker_pool
+
+
+def test_ordered_map_keeps_order():
+    def slow_square(x):
+        # Later items finish first
+        time.sleep(0.01 * (5 - x))
+        return x * x
+
+    with worker_pool(5) as executor:
+        assert list(ordered_map(slow_square, range(5), executor)) == [0, 1, 4, 9, 16]
+
+    with worker_pool(None) as executor:
+        assert executor is None
+        assert list(ordered_map(slow_square, range(5), executor)) == [0, 1, 4, 9, 16]
+
+
+def test_ordered_map_cancels_on_error():
+    calls = []
+
+    def fail_first(x):
+        calls.append(x)
+        if x == 0:
+            raise ValueError(x)
+        time.sleep(0.05)
+        return x
+
+    with worker_pool(2) as executor:
+        with pytest.raises(ValueError):
+            list(ordered_map(fail_first, range(20), executor))
+
+    assert len(calls) < 20
+
+
+def test_ordered_map_window_bounds_calls_ahead():
+    calls = []
+
+    def record(x):
+        calls.append(x)
+        return x
+
+    with worker_pool(4) as executor:
+        # `itertools.count` never ends, only `window` calls may run ahead
+        squares = ordered_map(record, itertools.count(), executor, window=8)
+        assert [next(squares) for _ in range(3)] == [0, 1, 2]
+        squares.close()
+
+    assert len(calls) <= 3 + 8
+
+
+def test_prefetch_is_bounded():
+    produced = []
+
+    def items():
+        for i in itertools.count():
+            produced.append(i)
+            yield i
+
+    buffered = prefetch(items(), 5)
+    assert next(buffered) == 0
+    time.sleep(0.1)
+
+    # The item being put in the full buffer, and the one consumed
+    assert len(produced) <= 5 + 2
+    buffered.close()
+
+
+def test_prefetch_raises_after_previous_items():
+    def items():
+        yield 1
+        yield 2
+        raise ValueError("page failed")
+
+    buffered = prefetch(items(), 10)
+    assert next(buffered) == 1
+    assert next(buffered) == 2
+    with pytest.raises(ValueError, match="page failed"):
+        next(buffered)
+
+
+def test_cursor_fetches_pages_concurrently(monkeypatch):
+    offsets = []
+
+    def fake_get_page(self, offset):
+        offsets.append(offset)
+        # Last page is not full
+        size = results.RESULTS_PAGE_SIZE if offset < 300 else 40
+        return [{"match_id": str(offset + i)} for i in range(size)]
+
+    monkeypatch.setattr(results.ResultsCursor, "_get_page", fake_get_page)
+
+    cursor = results.ResultsCursor(params={}, workers=3)
+    ids = cursor.next_ids()
+
+    assert ids == [str(i) for i in range(340)]
+    assert sorted(offsets) == [0, 100, 200, 300, 400, 500]
+
+
+def test_workers_capped_to_max_concurrency():
+    config = ClientConfig(max_concurrency=2)
+
+    assert pool_size(None, config) is None
+    assert pool_size(1, config) == 1
+    assert pool_size(8, config) == 2
+    assert results.ResultsCursor(params={}, workers=8, config=config).workers == 2
+
+
+def test_prefetch_does_not_read_past_demand():
+    produced = []
+
+    def items():
+        for i in itertools.count():
+            produced.append(i)
+            yield i
+
+    buffered = prefetch(items(), 100, demand=lambda: 10)
+    assert [next(buffered) for _ in range(5)] == list(range(5))
+    time.sleep(0.1)
+    assert len(produced) == 10
+
+    # Still produced when the consumer needs more than expected
+    assert [next(buffered) for _ in range(10)] == list(range(5, 15))
+    buffered.close()
+
+
+def test_prefetch_joins_producer_on_close():
+    running = []
+
+    def items():
+        yield 0
+        running.append(True)
+        time.sleep(0.1)
+        running.pop()
+        yield 1
+
+    buffered = prefetch(items(), 10)
+    assert next(buffered) == 0
+    time.sleep(0.02)
+    buffered.close()
+    assert running == []
+
+
+def test_items_needed():
+    assert items_needed(None, 10, 5) is None
+    assert items_needed(400, 0, 0) == 1
+    assert items_needed(400, 0, 10) == 410
+    # 2 maps per match
+    assert items_needed(400, 200, 100) == 200